@@ -3,6 +3,8 @@ from pathlib import Path
 
 import yaml
 
+from kilibs.util import yaml_cache
+
 
 def load_parameters(module_dir_name):
     """
@@ -12,10 +14,10 @@ def load_parameters(module_dir_name):
         this_dir = os.path.dirname(os.path.abspath(__file__))
         modules_dir = Path(this_dir).parent
 
-        with open(
-            os.path.join(modules_dir, module_dir_name, "cq_parameters.yaml"), "r"
-        ) as f:
-            all_params = yaml.load(f, Loader=yaml.FullLoader)
+        all_params = yaml_cache.load_yaml(
+            os.path.join(modules_dir, module_dir_name, "cq_parameters.yaml"),
+            loader=yaml.FullLoader,
+        )
     except yaml.YAMLError as exc:
         print(exc)
 
@@ -31,8 +33,9 @@ def load_aux_parameters(file, yaml_name):
     try:
         this_dir = os.path.dirname(os.path.abspath(file))
 
-        with open(os.path.join(this_dir, yaml_name), "r") as f:
-            all_params = yaml.load(f, Loader=yaml.FullLoader)
+        all_params = yaml_cache.load_yaml(
+            os.path.join(this_dir, yaml_name), loader=yaml.FullLoader
+        )
     except yaml.YAMLError as exc:
         print(exc)
 
@@ -19,6 +19,26 @@ from __future__ import annotations
 import abc
 import io
 from pathlib import Path
+from typing import Callable, Protocol
+
+from typing_extensions import TypeIs
+
+
+class TextStream(Protocol):
+    """A writable text stream."""
+
+    def write(self, s: str, /) -> object: ...
+
+
+class BinaryStream(Protocol):
+    """A writable binary stream."""
+
+    def write(self, b: bytes, /) -> object: ...
+
+
+def _is_text_stream(stream: TextStream | BinaryStream) -> TypeIs[TextStream]:
+    """Return whether a stream is a text stream (rather than a binary stream)."""
+    return isinstance(stream, io.TextIOBase)
 
 
 class FileHandler(abc.ABC):
@@ -35,9 +55,29 @@ class FileHandler(abc.ABC):
             filename: The path of the output file.
         """
         with io.open(filename, "w", encoding="utf-8") as f:
-            output = self.serialize()
-            f.write(output)
-            f.close()
+            self.write_to_stream(f)
+
+    def write_to_stream(self, stream: TextStream | BinaryStream) -> None:
+        """Write the output of FileHandler.serialize to a stream.
+
+        Args:
+            stream: A text stream, or a binary stream (which the output is written to
+                in UTF-8).
+        """
+        self._get_text_writer(stream)(self.serialize())
+
+    @staticmethod
+    def _get_text_writer(stream: TextStream | BinaryStream) -> Callable[[str], object]:
+        """Return a function which writes text to a stream.
+
+        Args:
+            stream: A text stream, or a binary stream (which the text is written to in
+                UTF-8).
+        """
+        if _is_text_stream(stream):
+            return stream.write
+        binary_stream = stream
+        return lambda text: binary_stream.write(text.encode("utf-8"))
 
     @abc.abstractmethod
     def serialize(self) -> str:
@@ -17,10 +17,23 @@
 from __future__ import annotations
 
 import abc
+import atexit
+import contextlib
+import enum
+import hashlib
+import io
+import multiprocessing.util
+import os
+import queue
+import socket
+import tarfile
+import threading
+import time
+import zipfile
 from pathlib import Path
-from typing import Any, Callable
+from typing import IO, Any, Callable, Generator, Iterator, NamedTuple
 
-from KicadModTree.FileHandler import FileHandler
+from KicadModTree.FileHandler import BinaryStream, FileHandler, TextStream
 from KicadModTree.nodes.base.Arc import Arc
 from KicadModTree.nodes.base.Circle import Circle
 from KicadModTree.nodes.base.CompoundPolygon import CompoundPolygon
@@ -36,7 +49,8 @@ from KicadModTree.nodes.base.Zone import Zone
 from KicadModTree.nodes.Footprint import Footprint, FootprintType
 from KicadModTree.nodes.Node import Node
 from KicadModTree.nodes.specialized.ChamferedPad import ChamferedPad
-from KicadModTree.serializer import Serializer, SerializerPriority
+from KicadModTree.serializer import FastSerializer, Serializer, SerializerPriority
+from KicadModTree.util import generation_stats
 
 # This is the version of the .kicad_mod format that this serialiser produces
 # It is used to set the version field in the .kicad_mod file
@@ -55,7 +69,7 @@ _GENERATOR_NAME: str = "kicad-footprint-generator"
 class KicadFileHandler(FileHandler):
     """Implementation of the `FileHandler` for `.kicad_mod` files."""
 
-    _NODE_SORT_KEY_MAP: dict[type[Node], Callable[[Any], list[Any]]] = {
+    _NODE_SORT_KEY_MAP: dict[type[Node], Callable[[Any], tuple[Any, ...]]] = {
         Text: SerializerPriority.get_sort_key_text,
         Line: SerializerPriority.get_sort_key_line,
         Arc: SerializerPriority.get_sort_key_arc,
@@ -72,28 +86,46 @@ class KicadFileHandler(FileHandler):
         Group: SerializerPriority.get_sort_key_group,
     }
 
-    _NODE_SERIALIZER_MAP: dict[type[Node], Callable[[Serializer, Any], None]] = {
-        Text: Serializer.add_text,
-        Line: Serializer.add_line,
-        Arc: Serializer.add_arc,
-        Circle: Serializer.add_circle,
-        Rectangle: Serializer.add_rectangle,
-        Polygon: Serializer.add_polygon,
-        CompoundPolygon: Serializer.add_compound_polygon,
-        Zone: Serializer.add_zone,
-        Pad: Serializer.add_pad,
-        ChamferedPad: Serializer.add_pad,
-        ReferencedPad: Serializer.add_referenced_pad,
-        EmbeddedFonts: Serializer.add_embedded_fonts,
-        Model: Serializer.add_model,
-        Group: Serializer.add_group,
+    SERIALIZER_ENV_VAR: str = "KICAD_FP_GENERATOR_SERIALIZER"
+    """The environment variable selecting the default serializer engine: "fast"
+    (`FastSerializer`, the default) or "reference" (`Serializer`)."""
+
+    _SERIALIZER_ENGINES: dict[str, type[Serializer]] = {
+        "fast": FastSerializer,
+        "reference": Serializer,
+    }
+
+    # The names of the serializer methods, so that engines can override them
+    _NODE_SERIALIZER_MAP: dict[type[Node], str] = {
+        Text: "add_text",
+        Line: "add_line",
+        Arc: "add_arc",
+        Circle: "add_circle",
+        Rectangle: "add_rectangle",
+        Polygon: "add_polygon",
+        CompoundPolygon: "add_compound_polygon",
+        Zone: "add_zone",
+        Pad: "add_pad",
+        ChamferedPad: "add_pad",
+        ReferencedPad: "add_referenced_pad",
+        EmbeddedFonts: "add_embedded_fonts",
+        Model: "add_model",
+        Group: "add_group",
     }
 
-    def __init__(self, kicad_mod: Footprint) -> None:
+    _CHUNK_SIZE: int = 1024
+    """The number of serialized fragments after which `iter_serialize` yields."""
+
+    def __init__(
+        self, kicad_mod: Footprint, serializer_class: type[Serializer] | None = None
+    ) -> None:
         """Create an instance of the KiCad file handler.
 
         Args:
             kicad_mod: The footprint node (contianing all other nodes as child nodes).
+            serializer_class: The serializer engine. All engines produce the same
+                output. If `None`, it is selected by the
+                `KICAD_FP_GENERATOR_SERIALIZER` environment variable.
 
         Example:
             >>> from KicadModTree import *
@@ -105,7 +137,7 @@ class KicadFileHandler(FileHandler):
         # Instance attributes:
         self.kicad_mod: Footprint
         """The footprint node."""
-        self.properties: list[Property]
+        self.property_nodes: list[Property]
         """The property nodes."""
         self.nodes: list[Node]
         """The non-property nodes."""
@@ -113,10 +145,28 @@ class KicadFileHandler(FileHandler):
         """The serializer."""
 
         super().__init__()
-        self.serializer = Serializer()
+        if serializer_class is None:
+            serializer_class = self.serializer_engine()
+        self.serializer = serializer_class()
         self.kicad_mod = kicad_mod
         self._create_flattened_tree()
 
+    @classmethod
+    def serializer_engine(cls) -> type[Serializer]:
+        """Return the serializer engine selected by the environment.
+
+        Raises:
+            ValueError: If the environment variable names an unknown engine.
+        """
+        name = os.getenv(cls.SERIALIZER_ENV_VAR, "") or "fast"
+        try:
+            return cls._SERIALIZER_ENGINES[name]
+        except KeyError:
+            raise ValueError(
+                f"Unknown serializer engine '{name}' in {cls.SERIALIZER_ENV_VAR} "
+                f"(expected one of: {', '.join(cls._SERIALIZER_ENGINES)})"
+            ) from None
+
     def _create_flattened_tree(self) -> None:
         """Make a flattened tree.
 
@@ -124,8 +174,15 @@ class KicadFileHandler(FileHandler):
         transformations need to be applied, it creates a copy of the nodes and applies
         then the transforms on them.
         """
-        nodes = self.kicad_mod.get_flattened_nodes()
-
+        self.property_nodes, self.nodes = self._sort_nodes(
+            self.kicad_mod.get_flattened_nodes()
+        )
+
+    @classmethod
+    def _sort_nodes(cls, nodes: list[Node]) -> tuple[list[Property], list[Node]]:
+        """Split flattened nodes into the property nodes and the other nodes, in the
+        KiCad native order.
+        """
         property_nodes: list[Property] = []
         other_nodes: list[Node] = []
         for node in nodes:
@@ -135,14 +192,78 @@ class KicadFileHandler(FileHandler):
                 other_nodes.append(node)
 
         # Reorder the nodes to the KiCad native order:
-        other_nodes.sort(key=lambda item: self._NODE_SORT_KEY_MAP[type(item)](item))
-        self.property_nodes = property_nodes
-        self.nodes = other_nodes
+        other_nodes.sort(key=lambda item: cls._NODE_SORT_KEY_MAP[type(item)](item))
+        return property_nodes, other_nodes
+
+    def fingerprint(self) -> str:
+        """Return a digest of the content of the `*.kicad_mod` file, computed while
+        the footprint is serialized (so that the whole file is never held in memory).
+
+        See `Footprint.fingerprint`.
+        """
+        return _fingerprint(self.iter_serialize())
+
+    @classmethod
+    def fingerprint_nodes(cls, nodes: list[Node]) -> str:
+        """Return a digest of the serialized content of flattened nodes, in the KiCad
+        native order.
+
+        See `Node.fingerprint`.
+
+        Args:
+            nodes: The flattened nodes (see `Node.get_flattened_nodes`).
+        """
+        property_nodes, other_nodes = cls._sort_nodes(nodes)
+        serializer = cls.serializer_engine()()
+
+        def iter_serialize() -> Iterator[str]:
+            content = serializer.content
+            for property in property_nodes:
+                serializer.add_property(property)
+            for node in other_nodes:
+                getattr(serializer, cls._NODE_SERIALIZER_MAP[type(node)])(node)
+                if len(content) >= cls._CHUNK_SIZE:
+                    yield serializer.pop_string()
+            yield serializer.pop_string()
+
+        return _fingerprint(iter_serialize())
 
     def serialize(self) -> str:
         """Transform the footprint and its child nodes into a string (to save as a
         `*.kicad_mod` file).
         """
+        return "".join(self.iter_serialize())
+
+    def serialize_node(self, node: Node) -> str:
+        """Serialize a single (flattened) node of the footprint, as it appears in the
+        `*.kicad_mod` file, but without the indentation of the footprint block.
+
+        Args:
+            node: One of the property nodes or the other nodes.
+        """
+        serializer = type(self.serializer)()
+        if isinstance(node, Property):
+            serializer.add_property(node)
+        else:
+            getattr(serializer, self._NODE_SERIALIZER_MAP[type(node)])(node)
+        return serializer.to_string()
+
+    def write_to_stream(self, stream: TextStream | BinaryStream) -> None:
+        """Write the footprint to a stream while it is serialized, so that the whole
+        file is never held in memory.
+
+        Args:
+            stream: A text stream, or a binary stream (which the output is written to
+                in UTF-8).
+        """
+        write = self._get_text_writer(stream)
+        for chunk in self.iter_serialize():
+            write(chunk)
+
+    def iter_serialize(self) -> Iterator[str]:
+        """Transform the footprint and its child nodes into a sequence of strings
+        which, joined, are the content of the `*.kicad_mod` file.
+        """
         kicad_mod = self.kicad_mod
         self.serializer.start_block(f'footprint "{kicad_mod.name}"')
         self.serializer.add_int("version", _FORMAT_VERSION)
@@ -190,10 +311,34 @@ class KicadFileHandler(FileHandler):
         if attributes:
             self.serializer.add_symbols("attr", attributes)
         # Serialize the ordered nodes:
+        content = self.serializer.content
         for node in self.nodes:
-            self._NODE_SERIALIZER_MAP[type(node)](self.serializer, node)
+            getattr(self.serializer, self._NODE_SERIALIZER_MAP[type(node)])(node)
+            if len(content) >= self._CHUNK_SIZE:
+                yield self.serializer.pop_string()
         self.serializer.end_block()
-        return self.serializer.to_string()
+        yield self.serializer.pop_string()
+
+
+def _fingerprint(chunks: Iterator[str]) -> str:
+    """Return the SHA-256 digest (in hexadecimal) of serialized content, chunk by
+    chunk.
+    """
+    h = hashlib.sha256()
+    for chunk in chunks:
+        h.update(chunk.encode("utf-8"))
+    return h.hexdigest()
+
+
+class WriteStatus(enum.Enum):
+    """What happened to a footprint file when it was saved."""
+
+    NEW = "new"
+    """The file didn't exist before."""
+    WRITTEN = "written"
+    """The file existed and was overwritten."""
+    UNCHANGED = "unchanged"
+    """The file already had the same content, so it wasn't written."""
 
 
 class KicadModLibrary(abc.ABC):
@@ -206,27 +351,274 @@ class KicadModLibrary(abc.ABC):
         """Save the footprint to the path."""
         pass
 
+    @staticmethod
+    def _serialize(fp: Footprint) -> tuple[str, float]:
+        """Serialize a footprint.
+
+        Args:
+            fp: The footprint.
+
+        Returns:
+            The content of the .kicad_mod file, and the time in seconds it took to
+            serialize it.
+        """
+        start = time.perf_counter()
+        output = KicadFileHandler(fp).serialize()
+        return output, time.perf_counter() - start
+
+    @staticmethod
+    def _record_stats(
+        fp: Footprint,
+        library: str,
+        serialize_time: float,
+        num_bytes: int,
+        status: WriteStatus | None = None,
+    ) -> None:
+        """Record the statistics of a saved footprint (if they are being recorded).
+
+        Args:
+            fp: The footprint.
+            library: The name of the library.
+            serialize_time: The time in seconds it took to serialize the footprint.
+            num_bytes: The size of the footprint file in bytes.
+            status: What happened to the file, if known.
+        """
+        if generation_stats.enabled():
+            generation_stats.record_footprint(
+                name=fp.name,
+                library=library,
+                serialize_time=serialize_time,
+                num_bytes=num_bytes,
+                num_nodes=generation_stats.count_nodes(fp),
+                status=status.value if status is not None else None,
+            )
+
+
+def _write_footprint_file(
+    file_path: Path, data: bytes, write_if_changed: bool, fsync: bool = False
+) -> WriteStatus:
+    """Write the data to a file, unless it is unchanged and `write_if_changed` is set.
+
+    Args:
+        file_path: The path of the file.
+        data: The content of the file.
+        write_if_changed: Don't write the file if it already has the same content.
+        fsync: Flush the file to the disk before returning.
+
+    Returns:
+        What happened to the file.
+    """
+    try:
+        size = file_path.stat().st_size
+    except FileNotFoundError:
+        status = WriteStatus.NEW
+    else:
+        status = WriteStatus.WRITTEN
+
+        # Only read the file if it can be the same
+        if write_if_changed and size == len(data):
+            with io.open(file_path, "rb") as f:
+                if f.read() == data:
+                    return WriteStatus.UNCHANGED
+
+    with io.open(file_path, "wb") as f:
+        f.write(data)
+        if fsync:
+            f.flush()
+            os.fsync(f.fileno())
+
+    return status
+
+
+class _WriteRequest(NamedTuple):
+    """A queued write of a `FootprintWriter`."""
+
+    file_path: Path
+    """The path of the file."""
+    data: bytes
+    """The content of the file."""
+    write_if_changed: bool
+    """Don't write the file if it already has the same content."""
+    on_done: Callable[[WriteStatus], None] | None
+    """Called (on the writer thread) with what happened to the file."""
+
+
+class FootprintWriter:
+    """Writes footprint files on a background thread, so that the next footprint can
+    be built while the previous one is written.
+
+    Writes are queued (up to a limit, after which queueing blocks), and done in the
+    order they were queued. Errors are raised by the next `flush`, which waits for
+    all the queued writes: callers must flush before relying on the files (and
+    before exiting) so that errors propagate.
+    """
+
+    _process_writer: FootprintWriter | None = None
+    """The writer of this process (see `for_process`)."""
+
+    def __init__(self, max_pending: int = 64, fsync: bool = False) -> None:
+        """Create a writer (and start its thread).
+
+        Args:
+            max_pending: The maximum number of queued writes.
+            fsync: Flush every file to the disk after writing it.
+        """
+
+        # Instance attributes:
+        self.fsync: bool
+        """Flush every file to the disk after writing it."""
+        self._queue: queue.Queue[_WriteRequest]
+        """The queued writes."""
+        self._errors: list[BaseException]
+        """The errors of the writes since the last flush."""
+        self._errors_lock: threading.Lock
+        """The lock of `_errors` (which the writer thread appends to)."""
+        self._pid: int = os.getpid()
+        """The process that the thread runs in."""
+
+        self.fsync = fsync
+        self._queue = queue.Queue(maxsize=max_pending)
+        self._errors = []
+        self._errors_lock = threading.Lock()
+
+        self._thread = threading.Thread(
+            target=self._run, name="FootprintWriter", daemon=True
+        )
+        self._thread.start()
+
+    @classmethod
+    def for_process(cls) -> FootprintWriter:
+        """Return the writer of this process, starting it if needed."""
+        writer = cls._process_writer
+
+        # The thread of the parent process doesn't exist in forked processes
+        if writer is None or writer._pid != os.getpid():
+            if writer is None:
+                # A last flush, for anything written outside of a flush barrier (pool
+                # workers don't run atexit handlers, but they do run these)
+                multiprocessing.util.Finalize(None, cls._flush_process_writer, exitpriority=10)
+                atexit.register(cls._flush_process_writer)
+
+            writer = cls()
+            cls._process_writer = writer
+
+        return writer
+
+    @classmethod
+    def _flush_process_writer(cls) -> None:
+        writer = cls._process_writer
+        if writer is not None and writer._pid == os.getpid():
+            writer.flush()
+
+    def write(
+        self,
+        file_path: Path,
+        data: bytes,
+        write_if_changed: bool = False,
+        on_done: Callable[[WriteStatus], None] | None = None,
+    ) -> None:
+        """Queue writing a file.
+
+        Args:
+            file_path: The path of the file (its directory must exist).
+            data: The content of the file.
+            write_if_changed: Don't write the file if it already has the same content.
+            on_done: Called (on the writer thread) with what happened to the file.
+        """
+        self._queue.put(_WriteRequest(file_path, data, write_if_changed, on_done))
+
+    def flush(self) -> None:
+        """Wait for all the queued writes to be done.
+
+        Raises:
+            The first error of the writes since the last flush (if any).
+        """
+        self._queue.join()
+
+        with self._errors_lock:
+            errors = self._errors
+            self._errors = []
+        if errors:
+            raise errors[0]
+
+    def _run(self) -> None:
+        while True:
+            request = self._queue.get()
+            try:
+                status = _write_footprint_file(
+                    request.file_path, request.data, request.write_if_changed, self.fsync
+                )
+                if request.on_done is not None:
+                    request.on_done(status)
+            except BaseException as e:
+                with self._errors_lock:
+                    self._errors.append(e)
+            finally:
+                self._queue.task_done()
+
 
 class KicadPrettyLibrary(KicadModLibrary):
     """Implementation of the KicadModLibrary for .pretty directories (i.e. direct file
     write).
     """
 
-    def __init__(self, lib_name: str, output_dir: Path | None) -> None:
+    WRITE_IF_CHANGED_ENV_VAR: str = "KICAD_FP_GENERATOR_WRITE_IF_CHANGED"
+    """Environment variable to enable the write-if-changed mode by default."""
+
+    def __init__(
+        self,
+        lib_name: str,
+        output_dir: Path | None,
+        write_if_changed: bool | None = None,
+        writer: FootprintWriter | None = None,
+    ) -> None:
         """Create a footprint library.
 
         Args:
             lib_name: The name of the library.
             output_dir: The output directory.
+            write_if_changed: Only write footprint files if their content changed, so
+                that unchanged files keep their modification times. If `None`, this is
+                enabled by the `KICAD_FP_GENERATOR_WRITE_IF_CHANGED` environment
+                variable.
+            writer: Write the files in the background with this writer (which has to
+                be flushed to be sure they are written). If `None`, the files are
+                written before `save` returns.
         """
 
         # Instance attributes:
         self.path: Path
         """The path to which the footprints are saved."""
+        self.write_if_changed: bool
+        """Only write footprint files if their content changed."""
+        self.writer: FootprintWriter | None
+        """The background writer of the files, if any."""
+        self._dir_created: bool
+        """Whether the library directory was created (so it is only created once per
+        library, and again by a new library if it was deleted since)."""
 
         if not lib_name.endswith(".pretty"):
             lib_name += ".pretty"
 
+        self.path = self.resolve_output_dir(output_dir) / lib_name
+
+        if write_if_changed is None:
+            write_if_changed = os.getenv(self.WRITE_IF_CHANGED_ENV_VAR, "") not in ("", "0")
+        self.write_if_changed = write_if_changed
+        self.writer = writer
+        self._dir_created = False
+
+    @staticmethod
+    def resolve_output_dir(output_dir: Path | None) -> Path:
+        """Return the directory that the .pretty directories are written to.
+
+        Args:
+            output_dir: The output directory given to the library (if any).
+
+        Returns:
+            The resolved output directory.
+        """
+
         # If the environment variable is set, it will be the output
         # prefix to any non-absolute paths.
         #
@@ -237,8 +629,6 @@ class KicadPrettyLibrary(KicadModLibrary):
         # The correct thing to do is inject this path properly, but
         # that requires all the generators to be updated to be
         # fully-Python.
-        import os
-
         env_var = os.getenv("KICAD_FP_GENERATOR_OUTPUT_DIR")
 
         # In these cases, apply the prefix
@@ -253,13 +643,266 @@ class KicadPrettyLibrary(KicadModLibrary):
         if not output_dir:
             output_dir = Path.cwd()
 
-        self.path = output_dir / lib_name
+        return output_dir
 
     def save(self, fp: Footprint) -> None:
         """Save the footprint to the file."""
 
-        self.path.mkdir(parents=True, exist_ok=True)
+        if not self._dir_created:
+            self.path.mkdir(parents=True, exist_ok=True)
+            self._dir_created = True
 
         # Delegate to the s-expression serialiser
-        file_handler = KicadFileHandler(fp)
-        file_handler.writeFile(self.path / (fp.name + ".kicad_mod"))
+        output, serialize_time = self._serialize(fp)
+        file_path = self.path / (fp.name + ".kicad_mod")
+
+        # The same bytes as writing in text mode
+        if os.linesep != "\n":
+            output = output.replace("\n", os.linesep)
+        data = output.encode("utf-8")
+
+        if self.writer is None:
+            status = _write_footprint_file(file_path, data, self.write_if_changed)
+            self._record_stats(fp, self.path.stem, serialize_time, len(data), status)
+            return
+
+        on_done: Callable[[WriteStatus], None] | None = None
+        if generation_stats.enabled():
+            # Count now: the tree is not ours once save returns
+            num_nodes = generation_stats.count_nodes(fp)
+
+            def record_stats(status: WriteStatus) -> None:
+                generation_stats.record_footprint(
+                    name=fp.name,
+                    library=self.path.stem,
+                    serialize_time=serialize_time,
+                    num_bytes=len(data),
+                    num_nodes=num_nodes,
+                    status=status.value,
+                )
+
+            on_done = record_stats
+
+        self.writer.write(file_path, data, self.write_if_changed, on_done)
+
+
+class FootprintArchive:
+    """A zip or tar archive that footprints of any library are streamed into.
+
+    Writing one archive sequentially is much cheaper than creating a file for every
+    footprint (especially on network filesystems), and the archive can be unpacked in
+    one step. Every process writes its own archive (see `for_process`), which is
+    closed when the process exits.
+    """
+
+    FORMATS: dict[str, str] = {"zip": ".zip", "tar": ".tar"}
+    """The supported archive formats and their file extensions."""
+
+    _process_archives: dict[tuple[Path, str], FootprintArchive] = {}
+    """The open archives of this process."""
+
+    def __init__(self, path: Path, archive_format: str = "zip") -> None:
+        """Create (or overwrite) an archive.
+
+        Args:
+            path: The path of the archive.
+            archive_format: The format of the archive: "zip" or "tar".
+        """
+
+        # Instance attributes:
+        self.path: Path
+        """The path of the archive."""
+        self._zip: zipfile.ZipFile | None = None
+        self._tar: tarfile.TarFile | None = None
+        self._pid: int = os.getpid()
+        """The process that writes the archive."""
+
+        if archive_format not in self.FORMATS:
+            raise ValueError(f"Unsupported archive format: {archive_format}")
+
+        self.path = path
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+
+        if archive_format == "zip":
+            self._zip = zipfile.ZipFile(path, "w", compression=zipfile.ZIP_DEFLATED)
+        else:
+            self._tar = tarfile.open(path, "w")
+
+    @classmethod
+    def for_process(cls, output_dir: Path, archive_format: str = "zip") -> FootprintArchive:
+        """Return the archive of this process in the given directory, opening it if
+        needed.
+
+        Args:
+            output_dir: The directory of the archive.
+            archive_format: The format of the archive: "zip" or "tar".
+        """
+        key = (output_dir.absolute(), archive_format)
+        archive = cls._process_archives.get(key)
+
+        # Archives of the parent process are not ours to write to
+        if archive is not None and archive._pid != os.getpid():
+            archive = None
+
+        if archive is None:
+            if not cls._process_archives:
+                # Pool workers don't run atexit handlers, but they do run these
+                # (when the pool is closed rather than terminated)
+                multiprocessing.util.Finalize(None, cls.close_all, exitpriority=10)
+                atexit.register(cls.close_all)
+
+            name = f"footprints-{socket.gethostname()}-{os.getpid()}"
+            archive = cls(key[0] / (name + cls.FORMATS[archive_format]), archive_format)
+            cls._process_archives[key] = archive
+
+        return archive
+
+    def add(self, name: str, data: bytes) -> None:
+        """Add a file to the archive.
+
+        Args:
+            name: The path of the file in the archive.
+            data: The content of the file.
+        """
+        if self._zip is not None:
+            self._zip.writestr(name, data)
+        elif self._tar is not None:
+            info = tarfile.TarInfo(name)
+            info.size = len(data)
+            info.mtime = int(time.time())
+            info.mode = 0o644
+            self._tar.addfile(info, io.BytesIO(data))
+        else:
+            raise ValueError(f"Archive {self.path} is closed")
+
+    @contextlib.contextmanager
+    def open_member(self, name: str) -> Generator[IO[bytes], None, None]:
+        """Add a file to the archive, whose content is written to the yielded binary
+        stream.
+
+        Zip members are compressed into the archive as they are written. Tar
+        members are buffered, as the header (written first) has the size of the file.
+
+        Args:
+            name: The path of the file in the archive.
+        """
+        if self._zip is not None:
+            info = zipfile.ZipInfo(name, date_time=time.localtime(time.time())[:6])
+            info.compress_type = self._zip.compression
+            # As writestr does
+            info.external_attr = 0o600 << 16
+            with self._zip.open(info, "w") as f:
+                yield f
+        elif self._tar is not None:
+            buffer = io.BytesIO()
+            yield buffer
+            self.add(name, buffer.getvalue())
+        else:
+            raise ValueError(f"Archive {self.path} is closed")
+
+    def close(self) -> None:
+        """Finish writing the archive."""
+        if self._zip is not None:
+            self._zip.close()
+            self._zip = None
+        if self._tar is not None:
+            self._tar.close()
+            self._tar = None
+
+    @classmethod
+    def close_all(cls) -> None:
+        """Close all the open archives of this process."""
+        for archive in cls._process_archives.values():
+            if archive._pid == os.getpid():
+                archive.close()
+        cls._process_archives.clear()
+
+
+class _CountingStream(io.RawIOBase):
+    """A binary stream wrapper that counts the bytes written through it, and the time
+    spent writing them.
+    """
+
+    def __init__(self, stream: BinaryStream) -> None:
+        super().__init__()
+        self.stream = stream
+        self.num_bytes = 0
+        self.write_time = 0.0
+
+    def write(self, data: bytes) -> int:
+        start = time.perf_counter()
+        self.stream.write(data)
+        self.write_time += time.perf_counter() - start
+        self.num_bytes += len(data)
+        return len(data)
+
+    def writable(self) -> bool:
+        return True
+
+
+class KicadArchiveLibrary(KicadModLibrary):
+    """Implementation of the KicadModLibrary that writes the footprints of a library
+    into a `FootprintArchive` (as `<library>.pretty/<footprint>.kicad_mod`).
+    """
+
+    def __init__(self, lib_name: str, archive: FootprintArchive) -> None:
+        """Create a footprint library.
+
+        Args:
+            lib_name: The name of the library.
+            archive: The archive to write to (which can be shared with other
+                libraries).
+        """
+
+        # Instance attributes:
+        self.lib_name: str
+        """The name of the library (without the .pretty extension)."""
+        self.archive: FootprintArchive
+        """The archive to which the footprints are written."""
+
+        self.lib_name = lib_name.removesuffix(".pretty")
+        self.archive = archive
+
+    def save(self, fp: Footprint) -> None:
+        """Save the footprint to the archive (streaming it in while it is serialized)."""
+        start = time.perf_counter()
+        name = f"{self.lib_name}.pretty/{fp.name}.kicad_mod"
+        with self.archive.open_member(name) as member:
+            stream = _CountingStream(member)
+            KicadFileHandler(fp).write_to_stream(stream)
+        serialize_time = time.perf_counter() - start - stream.write_time
+
+        self._record_stats(fp, self.lib_name, serialize_time, stream.num_bytes)
+
+
+class KicadMemoryLibrary(KicadModLibrary):
+    """Implementation of the KicadModLibrary that keeps the serialized footprints in
+    memory (e.g. for tests, or to hand them to another tool directly).
+    """
+
+    def __init__(self, lib_name: str, files: dict[str, str] | None = None) -> None:
+        """Create a footprint library.
+
+        Args:
+            lib_name: The name of the library.
+            files: The dictionary to store the footprints in (which can be shared with
+                other libraries), by `<library>.pretty/<footprint>.kicad_mod` path.
+                If `None`, the library has its own.
+        """
+
+        # Instance attributes:
+        self.lib_name: str
+        """The name of the library (without the .pretty extension)."""
+        self.files: dict[str, str]
+        """The content of the footprint files by path."""
+
+        self.lib_name = lib_name.removesuffix(".pretty")
+        self.files = files if files is not None else {}
+
+    def save(self, fp: Footprint) -> None:
+        """Save the footprint to memory."""
+        output, serialize_time = self._serialize(fp)
+
+        self.files[f"{self.lib_name}.pretty/{fp.name}.kicad_mod"] = output
+
+        self._record_stats(fp, self.lib_name, serialize_time, len(output.encode("utf-8")))
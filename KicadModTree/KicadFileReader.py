@@ -0,0 +1,705 @@
+# kilibs is free software: you can redistribute it and/or modify it under the terms of
+# the GNU General Public License as published by the Free Software Foundation, either
+# version 3 of the License, or (at your option) any later version.
+#
+# kilibs is distributed in the hope that it will be useful, but WITHOUT ANY WARRANTY;
+# without even the implied warranty of MERCHANTABILITY or FITNESS FOR A PARTICULAR
+# PURPOSE. See the GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License along with kilibs.
+# If not, see < http://www.gnu.org/licenses/ >.
+#
+# (C) The KiCad Librarian Team
+
+"""Class definitions for the KiCad file reader, which loads `.kicad_mod` files back
+into footprint nodes."""
+
+from __future__ import annotations
+
+import logging
+import mmap
+import multiprocessing
+import os
+import re
+from pathlib import Path
+from typing import Any, Callable, Iterator, Union
+
+from kilibs.geom import GeomArc, Vec2DCompatible, Vector2D
+from KicadModTree.nodes.base.Arc import Arc
+from KicadModTree.nodes.base.Circle import Circle
+from KicadModTree.nodes.base.CompoundPolygon import CompoundPolygon
+from KicadModTree.nodes.base.Line import Line
+from KicadModTree.nodes.base.Model import Model
+from KicadModTree.nodes.base.Pad import Pad
+from KicadModTree.nodes.base.Polygon import Polygon
+from KicadModTree.nodes.base.Rectangle import Rectangle
+from KicadModTree.nodes.base.Text import Property, Text
+from KicadModTree.nodes.base.Zone import Hatch, Keepouts, PadConnection, Zone, ZoneFill
+from KicadModTree.nodes.Footprint import Footprint, FootprintType
+from KicadModTree.nodes.Node import Node
+from KicadModTree.nodes.NodeShape import NodeShape
+from KicadModTree.serializer import PAD_FAB_PROPERTY_SYMBOLS
+from KicadModTree.util.corner_handling import ChamferSizeHandler, RoundRadiusHandler
+from KicadModTree.util.line_style import LineStyle
+
+SExpr = list[Union[str, "SExpr"]]
+"""A parsed s-expression: a list of symbols, strings and nested s-expressions."""
+
+_TOKEN_RE = re.compile(r'\s*(?:(\()|(\))|("(?:[^"\\]|\\.)*")|([^\s()"]+))')
+"""The tokens of an s-expression: '(', ')', a quoted string or a symbol."""
+_TOKEN_RE_BYTES = re.compile(_TOKEN_RE.pattern.encode())
+"""The tokens of an s-expression, for bytes-like content."""
+_END_RE = re.compile(r"\s*\Z")
+"""The end of an s-expression (only whitespace left after the last token)."""
+_END_RE_BYTES = re.compile(_END_RE.pattern.encode())
+"""The end of an s-expression, for bytes-like content."""
+
+_FAB_PROPERTIES: dict[str, Pad.FabProperty] = {
+    symbol: prop for prop, symbol in PAD_FAB_PROPERTY_SYMBOLS.items()
+}
+"""The pad fabrication properties by their symbols."""
+# The symbol KiCad uses
+_FAB_PROPERTIES["pad_prop_fiducial_glob"] = Pad.FabProperty.FIDUCIAL_GLOBAL
+
+_ISLAND_REMOVAL_MODES: dict[str, str] = {
+    "0": ZoneFill.ISLAND_REMOVAL_REMOVE,
+    "1": ZoneFill.ISLAND_REMOVAL_FILL,
+    "2": ZoneFill.ISLAND_REMOVAL_MINIMUM_AREA,
+}
+"""The zone island removal modes by their numbers in the file format."""
+
+_IGNORED_ELEMENTS: set[str] = {"version", "generator", "generator_version", "layer"}
+"""The footprint elements that are not part of the node tree."""
+
+
+def iter_tokens(content: str | bytes | mmap.mmap) -> Iterator[str | None]:
+    """Tokenize an s-expression.
+
+    Args:
+        content: The s-expression. Bytes-like content (e.g. a memory-mapped file) is
+            scanned in place, and only its tokens are decoded (as UTF-8).
+
+    Yields:
+        `"("` for the start of a list, `None` for the end of a list, the content of
+        quoted strings (unescaped and with a leading `"`, to tell them from symbols)
+        and symbols.
+
+    Raises:
+        ValueError: If the content has something else than tokens and whitespace
+            (e.g. an unterminated string).
+    """
+    # The tokens must follow each other, `finditer` would skip what isn't a token
+    pos = 0
+    if isinstance(content, str):
+        for m in _TOKEN_RE.finditer(content):
+            if m.start() != pos:
+                raise _invalid_content_error(pos)
+            pos = m.end()
+            kind = m.lastindex
+            if kind == 1:
+                yield "("
+            elif kind == 2:
+                yield None
+            elif kind == 3:
+                yield m.group(3)[:-1].replace('\\"', '"')
+            else:
+                yield m.group(4)
+        if not _END_RE.match(content, pos):
+            raise _invalid_content_error(pos)
+    else:
+        for m in _TOKEN_RE_BYTES.finditer(content):
+            if m.start() != pos:
+                raise _invalid_content_error(pos)
+            pos = m.end()
+            kind = m.lastindex
+            if kind == 1:
+                yield "("
+            elif kind == 2:
+                yield None
+            elif kind == 3:
+                yield m.group(3)[:-1].decode("utf-8").replace('\\"', '"')
+            else:
+                yield m.group(4).decode("utf-8")
+        if not _END_RE_BYTES.match(content, pos):
+            raise _invalid_content_error(pos)
+
+
+def _invalid_content_error(pos: int) -> ValueError:
+    """Return the error for content that is not a token, after a given offset."""
+    return ValueError(f"Invalid s-expression content after offset {pos}")
+
+
+def parse_sexpr(content: str | bytes | mmap.mmap) -> SExpr:
+    """Parse an s-expression (e.g. the content of a `.kicad_mod` file).
+
+    Quoted strings keep a leading `"` in the result, so that `"no"` can be told from
+    the symbol `no` (`_value` strips it).
+
+    Args:
+        content: The s-expression (see `iter_tokens`).
+
+    Raises:
+        ValueError: If the content is not a single s-expression list.
+    """
+    stack: list[SExpr] = []
+    current: SExpr = []
+    for token in iter_tokens(content):
+        if token == "(":
+            new: SExpr = []
+            current.append(new)
+            stack.append(current)
+            current = new
+        elif token is None:
+            if not stack:
+                raise ValueError("Unbalanced ')' in s-expression")
+            current = stack.pop()
+        else:
+            current.append(token)
+
+    if stack:
+        raise ValueError("Unterminated s-expression")
+    if len(current) != 1 or not isinstance(current[0], list):
+        raise ValueError("Expected a single s-expression list")
+    return current[0]
+
+
+def _value(token: str | SExpr) -> str:
+    """Return a symbol, or the content of a quoted string."""
+    if not isinstance(token, str):
+        raise ValueError(f"Expected a value, got a list: {token}")
+    return token[1:] if token.startswith('"') else token
+
+
+def _children(expr: SExpr) -> Iterator[tuple[str, SExpr]]:
+    """Yield the nested lists of an s-expression, with their designators."""
+    for item in expr:
+        if isinstance(item, list) and item:
+            yield _value(item[0]), item
+
+
+def _find(expr: SExpr, name: str) -> SExpr | None:
+    """Return the first nested list with the given designator, if any."""
+    for item in expr:
+        if isinstance(item, list) and item and item[0] == name:
+            return item
+    return None
+
+
+def _number(expr: SExpr, index: int = 1) -> float:
+    """Return a number of a nested list."""
+    return float(_value(expr[index]))
+
+
+def _float(expr: SExpr | None, index: int = 1) -> float | None:
+    """Return a number of a nested list, if the list exists."""
+    if expr is None:
+        return None
+    return _number(expr, index)
+
+
+def _vector(expr: SExpr | None) -> Vector2D:
+    """Return the 2D vector of a nested list (such as `(start x y)`)."""
+    if expr is None:
+        raise ValueError("Missing coordinates")
+    return Vector2D.from_floats(float(_value(expr[1])), float(_value(expr[2])))
+
+
+def _bool(expr: SExpr | None) -> bool:
+    """Return the boolean of a nested list (such as `(hide yes)`).
+
+    A list without a value (such as `(hide)`) is true, a missing list is false.
+    """
+    if expr is None:
+        return False
+    return len(expr) < 2 or _value(expr[1]) in ("yes", "solid")
+
+
+class KicadFileReader:
+    """Reads the content of a `.kicad_mod` file back into a footprint node tree.
+
+    All the nodes that the KicadFileHandler serializes are supported except for
+    groups, and the content that the KicadFileHandler generates is read back so that
+    it serializes to the same content again.
+    """
+
+    def __init__(self, content: str | bytes | mmap.mmap, strict: bool = True) -> None:
+        """Create a reader.
+
+        Args:
+            content: The content of the `.kicad_mod` file.
+            strict: Raise an error on elements that can't be read into nodes, rather
+                than skipping them (with a debug log message, see
+                `skipped_elements`).
+
+        Example:
+            >>> from KicadModTree import *
+            >>> kicad_mod = KicadFileReader(content).read()
+        """
+
+        # Instance attributes:
+        self.content: str | bytes | mmap.mmap
+        """The content of the file."""
+        self.strict: bool
+        """Raise an error on elements that can't be read into nodes."""
+        self.skipped_elements: list[SExpr]
+        """The elements that the last `read()` skipped as they can't be read into
+        nodes (if not strict)."""
+
+        self.content = content
+        self.strict = strict
+        self.skipped_elements = []
+
+        self._element_readers: dict[str, Callable[[SExpr], Node | None]] = {
+            "property": self._read_property,
+            "fp_text": self._read_text,
+            "fp_line": self._read_line,
+            "fp_arc": self._read_arc,
+            "fp_circle": self._read_circle,
+            "fp_rect": self._read_rectangle,
+            "fp_poly": self._read_polygon,
+            "pad": self._read_pad,
+            "zone": self._read_zone,
+            "model": self._read_model,
+        }
+
+    @classmethod
+    def read_file(
+        cls, path: str | os.PathLike[str], use_mmap: bool = False, strict: bool = True
+    ) -> Footprint:
+        """Read a `.kicad_mod` file.
+
+        Args:
+            path: The path of the file.
+            use_mmap: Memory-map the file instead of reading it.
+            strict: See `__init__`.
+        """
+        with open(path, "rb") as f:
+            if use_mmap and os.fstat(f.fileno()).st_size:
+                with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+                    return cls(mm, strict).read()
+            return cls(f.read(), strict).read()
+
+    @classmethod
+    def read_library(
+        cls,
+        path: str | os.PathLike[str],
+        jobs: int = 1,
+        use_mmap: bool = False,
+        strict: bool = True,
+    ) -> dict[str, Footprint]:
+        """Read all the footprints of a `.pretty` directory.
+
+        Args:
+            path: The path of the directory.
+            jobs: The number of processes to read the files in (0 for one per CPU).
+            use_mmap: Memory-map the files instead of reading them.
+            strict: See `__init__`.
+
+        Returns:
+            The footprints by file name (without the `.kicad_mod` extension), in the
+            order of the names.
+        """
+        files = sorted(Path(path).glob("*.kicad_mod"))
+        if jobs == 0:
+            jobs = os.cpu_count() or 1
+        jobs = min(jobs, len(files))
+
+        args = [(f, use_mmap, strict) for f in files]
+        if jobs <= 1:
+            footprints = [_read_file_task(a) for a in args]
+        else:
+            with multiprocessing.Pool(jobs) as pool:
+                footprints = pool.map(_read_file_task, args, chunksize=8)
+
+        return {f.stem: fp for f, fp in zip(files, footprints)}
+
+    def read(self) -> Footprint:
+        """Read the footprint.
+
+        Raises:
+            ValueError: If the content is not a valid footprint, or (if strict) has
+                elements that can't be read.
+        """
+        self.skipped_elements = []
+        expr = parse_sexpr(self.content)
+        if not expr or expr[0] != "footprint" or len(expr) < 2:
+            raise ValueError("Not a footprint s-expression")
+
+        attr = _find(expr, "attr")
+        attributes: set[str] = {_value(a) for a in attr[1:]} if attr else set()
+        if "smd" in attributes:
+            footprint_type = FootprintType.SMD
+        elif "through_hole" in attributes:
+            footprint_type = FootprintType.THT
+        else:
+            footprint_type = FootprintType.UNSPECIFIED
+
+        fp = Footprint(_value(expr[1]), footprint_type)
+        fp.not_in_schematic = "board_only" in attributes
+        fp.excludeFromPositionFiles = "exclude_from_pos_files" in attributes
+        fp.excludeFromBOM = "exclude_from_bom" in attributes
+        fp.allow_soldermask_bridges = "allow_soldermask_bridges" in attributes
+        fp.allow_missing_courtyard = "allow_missing_courtyard" in attributes
+        fp.dnp = "dnp" in attributes
+
+        for name, item in _children(expr[2:]):
+            if name in self._element_readers:
+                node = self._element_readers[name](item)
+                if node is not None:
+                    fp.append(node)
+            elif name == "descr":
+                fp.description = _value(item[1])
+            elif name == "tags":
+                fp.tags = _value(item[1]).split(" ")
+            elif name == "solder_mask_margin":
+                fp.maskMargin = _float(item)
+            elif name == "solder_paste_margin":
+                fp.pasteMargin = _float(item)
+            elif name == "solder_paste_ratio":
+                fp.pasteMarginRatio = _float(item)
+            elif name == "clearance":
+                fp.clearance = _float(item)
+            elif name == "zone_connect":
+                fp.zone_connection = Pad.ZoneConnection(int(_value(item[1])))
+            elif name == "embedded_fonts":
+                if _bool(item):
+                    self._unsupported("enabled embedded fonts", item)
+            elif name not in _IGNORED_ELEMENTS and name != "attr":
+                self._unsupported(f"'{name}' element", item)
+
+        return fp
+
+    def _unsupported(self, what: str, expr: SExpr) -> None:
+        """Handle an element that can't be read into nodes."""
+        if self.strict:
+            raise ValueError(f"Unsupported {what} in footprint file")
+        logging.debug(f"Skipping unsupported {what} in footprint file")
+        self.skipped_elements.append(expr)
+
+    def _read_text_base(self, expr: SExpr) -> dict[str, Any]:
+        """Return the arguments of a text or property."""
+        at = _find(expr, "at")
+        effects = _find(expr, "effects") or []
+        font = _find(effects, "font") or []
+        size = _find(font, "size")
+        thickness = _find(font, "thickness")
+        justify = _find(effects, "justify")
+
+        kwargs: dict[str, Any] = {
+            "at": _vector(at),
+            "rotation": float(_value(at[3])) if at is not None and len(at) > 3 else 0.0,
+            "layer": (
+                _value(layer[1]) if (layer := _find(expr, "layer")) else "F.SilkS"
+            ),
+            "hide": _bool(_find(expr, "hide")) or _bool(_find(effects, "hide")),
+        }
+        if size is not None:
+            kwargs["size"] = _vector(size)
+        if thickness is not None:
+            kwargs["thickness"] = _float(thickness)
+        if justify is not None:
+            just = [_value(j) for j in justify[1:]]
+            kwargs["mirror"] = "mirror" in just
+            just = [j for j in just if j != "mirror"]
+            if len(just) == 1:
+                kwargs["justify"] = just[0]
+            elif just:
+                kwargs["justify"] = just
+        return kwargs
+
+    def _read_property(self, expr: SExpr) -> Property:
+        """Read a `(property "name" "text" ...)` element."""
+        return Property(
+            name=_value(expr[1]), text=_value(expr[2]), **self._read_text_base(expr)
+        )
+
+    def _read_text(self, expr: SExpr) -> Text | None:
+        """Read an `(fp_text user "text" ...)` element."""
+        if _value(expr[1]) != "user":
+            self._unsupported(f"'{_value(expr[1])}' text", expr)
+            return None
+        return Text(text=_value(expr[2]), **self._read_text_base(expr))
+
+    @staticmethod
+    def _read_stroke(expr: SExpr) -> dict[str, Any]:
+        """Return the layer, width and style arguments of a graphical shape."""
+        kwargs: dict[str, Any] = {}
+        if (layer := _find(expr, "layer")) is not None:
+            kwargs["layer"] = _value(layer[1])
+        if (stroke := _find(expr, "stroke")) is not None:
+            kwargs["width"] = _float(_find(stroke, "width"))
+            if (style := _find(stroke, "type")) is not None:
+                kwargs["style"] = LineStyle(_value(style[1]))
+        elif (width := _find(expr, "width")) is not None:
+            # Pad primitives, and the older formats
+            kwargs["width"] = _float(width)
+        return kwargs
+
+    @staticmethod
+    def _read_fill(expr: SExpr) -> bool:
+        """Return whether a graphical shape is filled."""
+        return _bool(_find(expr, "fill"))
+
+    def _read_line(self, expr: SExpr) -> Line:
+        """Read an `(fp_line ...)` or `(gr_line ...)` element."""
+        return Line(
+            start=_vector(_find(expr, "start")),
+            end=_vector(_find(expr, "end")),
+            **self._read_stroke(expr),
+        )
+
+    @staticmethod
+    def _read_arc_points(expr: SExpr) -> tuple[Vector2D, Vector2D, Vector2D]:
+        """Return the start, mid and end points of an arc."""
+        return (
+            _vector(_find(expr, "start")),
+            _vector(_find(expr, "mid")),
+            _vector(_find(expr, "end")),
+        )
+
+    def _read_arc(self, expr: SExpr) -> Arc:
+        """Read an `(fp_arc ...)` or `(gr_arc ...)` element."""
+        start, mid, end = self._read_arc_points(expr)
+        return Arc(start=start, mid=mid, end=end, **self._read_stroke(expr))
+
+    def _read_circle(self, expr: SExpr) -> Circle:
+        """Read an `(fp_circle ...)` or `(gr_circle ...)` element."""
+        center = _vector(_find(expr, "center"))
+        end = _vector(_find(expr, "end"))
+        return Circle(
+            center=center,
+            radius=(end - center).norm(),
+            fill=self._read_fill(expr),
+            **self._read_stroke(expr),
+        )
+
+    def _read_rectangle(self, expr: SExpr) -> Rectangle:
+        """Read an `(fp_rect ...)` or `(gr_rect ...)` element."""
+        return Rectangle(
+            start=_vector(_find(expr, "start")),
+            end=_vector(_find(expr, "end")),
+            fill=self._read_fill(expr),
+            **self._read_stroke(expr),
+        )
+
+    def _read_polygon(self, expr: SExpr) -> Polygon | CompoundPolygon:
+        """Read an `(fp_poly ...)` or `(gr_poly ...)` element.
+
+        Polygons with arcs are read into compound polygons.
+        """
+        pts = _find(expr, "pts") or []
+        elements: list[Vec2DCompatible | GeomArc] = []
+        points: list[Vec2DCompatible] = []
+        has_arcs = False
+        for name, item in _children(pts):
+            if name == "xy":
+                point = _vector(item)
+                elements.append(point)
+                points.append(point)
+            elif name == "arc":
+                start, mid, end = self._read_arc_points(item)
+                arc = GeomArc(start=start, mid=mid, end=end)
+                # The line to the start of the arc (if it doesn't follow a point there)
+                elements.append(arc.start)
+                elements.append(arc)
+                has_arcs = True
+            else:
+                raise ValueError(f"Unsupported '{name}' in polygon points")
+
+        if has_arcs:
+            return CompoundPolygon(
+                shape=elements, fill=self._read_fill(expr), **self._read_stroke(expr)
+            )
+        return Polygon(
+            shape=points, fill=self._read_fill(expr), **self._read_stroke(expr)
+        )
+
+    _PRIMITIVE_READERS: dict[str, str] = {
+        "gr_line": "_read_line",
+        "gr_arc": "_read_arc",
+        "gr_circle": "_read_circle",
+        "gr_rect": "_read_rectangle",
+        "gr_poly": "_read_polygon",
+    }
+    """The readers of the custom pad primitives, by designator."""
+
+    def _read_pad(self, expr: SExpr) -> Pad:
+        """Read a `(pad "number" type shape ...)` element."""
+        at = _find(expr, "at")
+        kwargs: dict[str, Any] = {
+            "number": _value(expr[1]),
+            "type": _value(expr[2]),
+            "shape": _value(expr[3]),
+            "at": _vector(at),
+            "rotation": float(_value(at[3])) if at is not None and len(at) > 3 else 0.0,
+            "size": _vector(_find(expr, "size")),
+            "layers": [_value(layer) for layer in (_find(expr, "layers") or [])[1:]],
+        }
+
+        if (drill := _find(expr, "drill")) is not None:
+            if _value(drill[1]) == "oval":
+                kwargs["drill"] = _vector(drill[1:])
+            else:
+                kwargs["drill"] = _float(drill)
+        if (offset := _find(expr, "offset")) is not None:
+            kwargs["offset"] = _vector(offset)
+        if (prop := _find(expr, "property")) is not None:
+            kwargs["fab_property"] = _FAB_PROPERTIES[_value(prop[1])]
+
+        if _bool(_find(expr, "remove_unused_layers")):
+            if _bool(_find(expr, "keep_end_layers")):
+                mode = Pad.UnconnectedLayerMode.REMOVE_EXCEPT_START_AND_END
+            else:
+                mode = Pad.UnconnectedLayerMode.REMOVE_ALL
+            kwargs["unconnected_layer_mode"] = mode
+
+        if (rratio := _find(expr, "roundrect_rratio")) is not None:
+            kwargs["round_radius_handler"] = RoundRadiusHandler(
+                radius_ratio=_number(rratio)
+            )
+        if (chamfer := _find(expr, "chamfer")) is not None:
+            corners = {_value(c) for c in chamfer[1:]}
+            kwargs["chamfer_corners"] = [
+                corner in corners
+                for corner in ["top_left", "top_right", "bottom_right", "bottom_left"]
+            ]
+            kwargs["chamfer_size_handler"] = ChamferSizeHandler(
+                chamfer_ratio=_float(_find(expr, "chamfer_ratio"))
+            )
+
+        if (options := _find(expr, "options")) is not None:
+            if (clearance := _find(options, "clearance")) is not None:
+                kwargs["shape_in_zone"] = _value(clearance[1])
+            if (anchor := _find(options, "anchor")) is not None:
+                kwargs["anchor_shape"] = _value(anchor[1])
+        if (primitives := _find(expr, "primitives")) is not None:
+            kwargs["primitives"] = [
+                self._read_primitive(name, item) for name, item in _children(primitives)
+            ]
+
+        if (die_length := _find(expr, "die_length")) is not None:
+            kwargs["tuning_properties"] = Pad.TuningProperties(
+                die_length=_number(die_length)
+            )
+        if (zone_connect := _find(expr, "zone_connect")) is not None:
+            kwargs["zone_connection"] = Pad.ZoneConnection(int(_value(zone_connect[1])))
+        for name, arg in [
+            ("solder_mask_margin", "solder_mask_margin"),
+            ("solder_paste_margin_ratio", "solder_paste_margin_ratio"),
+            ("solder_paste_margin", "solder_paste_margin"),
+            ("clearance", "clearance"),
+            ("thermal_bridge_width", "thermal_bridge_width"),
+            ("thermal_bridge_angle", "thermal_bridge_angle"),
+            ("thermal_gap", "thermal_gap"),
+        ]:
+            if (item := _find(expr, name)) is not None:
+                kwargs[arg] = _float(item)
+
+        return Pad(**kwargs)
+
+    def _read_primitive(self, name: str, expr: SExpr) -> NodeShape:
+        """Read a custom pad primitive."""
+        if name not in self._PRIMITIVE_READERS:
+            raise ValueError(f"Unsupported '{name}' custom pad primitive")
+        return getattr(self, self._PRIMITIVE_READERS[name])(expr)
+
+    def _read_zone(self, expr: SExpr) -> Zone:
+        """Read a `(zone ...)` element."""
+        hatch = _find(expr, "hatch")
+        if hatch is None:
+            raise ValueError("Zone without a hatch")
+
+        connect = _find(expr, "connect_pads") or ["connect_pads"]
+        connect_type = PadConnection.THERMAL_RELIEF
+        if len(connect) > 1 and isinstance(connect[1], str):
+            connect_type = _value(connect[1])
+
+        keepouts = None
+        if (keepout := _find(expr, "keepout")) is not None:
+            rules = {n: _value(i[1]) == "not_allowed" for n, i in _children(keepout)}
+            keepouts = Keepouts(**rules)
+
+        fill = None
+        if (fill_expr := _find(expr, "fill")) is not None:
+            fill = self._read_zone_fill(fill_expr)
+
+        polygon = _find(expr, "polygon") or []
+        pts = _find(polygon, "pts") or []
+        priority = _find(expr, "priority")
+        layers = _find(expr, "layers") or []
+
+        return Zone(
+            shape=[_vector(item) for _, item in _children(pts)],
+            hatch=Hatch(_value(hatch[1]), float(_value(hatch[2]))),  # type: ignore
+            keepouts=keepouts,
+            fill=fill,
+            connect_pads=PadConnection(
+                clearance=_float(_find(connect, "clearance")) or 0.0,
+                type=connect_type,
+            ),
+            layers=[_value(layer) for layer in layers[1:]],
+            net=int(_value(n[1])) if (n := _find(expr, "net")) else 0,
+            net_name=_value(n[1]) if (n := _find(expr, "net_name")) else "",
+            name=_value(n[1]) if (n := _find(expr, "name")) else "",
+            filled_areas_thickness=_bool(_find(expr, "filled_areas_thickness")),
+            min_thickness=_float(_find(expr, "min_thickness")) or 0.25,
+            priority=int(_value(priority[1])) if priority is not None else None,
+        )
+
+    @staticmethod
+    def _read_zone_fill(expr: SExpr) -> ZoneFill:
+        """Read the `(fill ...)` element of a zone."""
+        if len(expr) > 1 and expr[1] == "yes":
+            mode = _find(expr, "mode")
+            fill = _value(mode[1]) if mode is not None else ZoneFill.FILL_SOLID
+        else:
+            fill = ZoneFill.FILL_NONE
+
+        kwargs: dict[str, Any] = {"fill": fill}
+        for name in [
+            "thermal_gap",
+            "thermal_bridge_width",
+            "island_area_min",
+            "hatch_thickness",
+            "hatch_gap",
+            "hatch_orientation",
+            "hatch_smoothing_value",
+            "hatch_min_hole_area",
+        ]:
+            if (item := _find(expr, name)) is not None:
+                kwargs[name] = _float(item)
+        for name in ["smoothing", "hatch_smoothing_level", "hatch_border_algorithm"]:
+            if (item := _find(expr, name)) is not None:
+                kwargs[name] = _value(item[1])
+        if (radius := _find(expr, "radius")) is not None:
+            kwargs["smoothing_radius"] = _float(radius)
+        if (mode := _find(expr, "island_removal_mode")) is not None:
+            kwargs["island_removal_mode"] = _ISLAND_REMOVAL_MODES[_value(mode[1])]
+        return ZoneFill(**kwargs)
+
+    @staticmethod
+    def _read_model(expr: SExpr) -> Model:
+        """Read a `(model "file" ...)` element."""
+
+        def xyz(name: str, default: list[float]) -> list[float]:
+            item = _find(expr, name)
+            xyz = _find(item, "xyz") if item is not None else None
+            if xyz is None:
+                return default
+            return [float(_value(v)) for v in xyz[1:4]]
+
+        return Model(
+            filename=_value(expr[1]),
+            at=xyz("offset", [0, 0, 0]),
+            scale=xyz("scale", [1, 1, 1]),
+            rotate=xyz("rotate", [0, 0, 0]),
+        )
+
+
+def _read_file_task(args: tuple[Path, bool, bool]) -> Footprint:
+    """Read a footprint file in a pool worker."""
+    path, use_mmap, strict = args
+    try:
+        return KicadFileReader.read_file(path, use_mmap=use_mmap, strict=strict)
+    except Exception as e:
+        raise ValueError(f"Failed to read {path}: {e}") from e
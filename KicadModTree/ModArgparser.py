@@ -27,6 +27,8 @@ except ImportError:
     print("pyyaml not available!")
     sys.exit(1)
 
+from kilibs.util import yaml_cache
+
 
 class ParserException(Exception):
     def __itruediv__(self, *args: Any, **kwargs: Any) -> None:
@@ -204,27 +206,27 @@ class ModArgparser(object):
         Raises:
             yaml.YAMLError: If there is an error parsing the YAML file.
         """
-        with open(filepath, "r") as stream:
-            try:
-                parsed = yaml.safe_load(stream)  # parse file
-
-                if parsed is None:
-                    print("empty file!")
-                    return
+        try:
+            # parse file (or get it from the cache of parsed files)
+            parsed = yaml_cache.load_yaml(filepath, loader=yaml.SafeLoader)
+        except yaml.YAMLError as exc:
+            print(exc)
+            return
 
-                for footprint in parsed:
-                    kwargs = parsed.get(footprint)
+        if parsed is None:
+            print("empty file!")
+            return
 
-                    # name is a reserved key
-                    if "name" in kwargs:
-                        print("ERROR: name is already used for root name!")
-                        continue
-                    kwargs["name"] = footprint
+        for footprint in parsed:
+            kwargs = parsed.get(footprint)
 
-                    self._execute_script(**kwargs)  # now we can execute the script
+            # name is a reserved key
+            if "name" in kwargs:
+                print("ERROR: name is already used for root name!")
+                continue
+            kwargs["name"] = footprint
 
-            except yaml.YAMLError as exc:
-                print(exc)
+            self._execute_script(**kwargs)  # now we can execute the script
 
     def _create_example_data_required(self, **kwargs: Any) -> dict[str, Any]:
         """Create a dictionary of example data containing only required parameters.
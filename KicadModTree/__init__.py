@@ -15,7 +15,16 @@
 
 """The 'node' library."""
 
-from KicadModTree.KicadFileHandler import KicadFileHandler, KicadPrettyLibrary
+from KicadModTree.KicadFileHandler import (
+    FootprintArchive,
+    FootprintWriter,
+    KicadArchiveLibrary,
+    KicadFileHandler,
+    KicadMemoryLibrary,
+    KicadModLibrary,
+    KicadPrettyLibrary,
+)
+from KicadModTree.KicadFileReader import KicadFileReader
 from KicadModTree.ModArgparser import ModArgparser
 from KicadModTree.nodes import (
     Arc,
@@ -39,6 +48,7 @@ from KicadModTree.nodes import (
     Model,
     MultipleParentsError,
     Node,
+    NodeIndex,
     NodeShape,
     Pad,
     PadArray,
@@ -55,6 +65,7 @@ from KicadModTree.nodes import (
     RoundRectangle,
     Stadium,
     Text,
+    TransformNode,
     Translation,
     Trapezoid,
     Zone,
@@ -79,11 +90,17 @@ __all__ = [
     "EmbeddedFonts",
     "ExposedPad",
     "Footprint",
+    "FootprintArchive",
+    "FootprintWriter",
     "FootprintType",
     "Group",
     "Hatch",
     "Keepouts",
+    "KicadArchiveLibrary",
     "KicadFileHandler",
+    "KicadFileReader",
+    "KicadMemoryLibrary",
+    "KicadModLibrary",
     "KicadPrettyLibrary",
     "Line",
     "LineStyle",
@@ -91,6 +108,7 @@ __all__ = [
     "Model",
     "MultipleParentsError",
     "Node",
+    "NodeIndex",
     "NodeShape",
     "Pad",
     "PadArray",
@@ -108,6 +126,7 @@ __all__ = [
     "RoundRectangle",
     "Stadium",
     "Text",
+    "TransformNode",
     "Translation",
     "Trapezoid",
     "Vector2D",
@@ -15,13 +15,16 @@
 """Class definition for the footprint node."""
 
 
+import copy
 import re
 import uuid
 from enum import Enum
+from typing import Any, Self
 
 from KicadModTree.nodes.base.EmbeddedFonts import EmbeddedFonts
 from KicadModTree.nodes.base.Pad import Pad
 from KicadModTree.nodes.Node import Node
+from KicadModTree.nodes.NodeIndex import NodeIndex
 
 
 class FootprintType(Enum):
@@ -91,6 +94,7 @@ class Footprint(Node):
         """If `True` the component is not populated."""
 
         Node.__init__(self)
+        self._node_index = NodeIndex(self)
         self.name = name
         self._description = None
         self._tags = []
@@ -118,6 +122,25 @@ class Footprint(Node):
         self._embedded_fonts = EmbeddedFonts()
         self.append(self._embedded_fonts)
 
+    def __copy__(self) -> Self:
+        """Create a shallow copy of the footprint, with its own index."""
+        copied = type(self).__new__(type(self))
+        vars(copied).update(vars(self))
+        copied._node_index = NodeIndex(copied)
+        return copied
+
+    def __deepcopy__(self, memo: dict[int, Any]) -> Self:
+        """Create a deep copy of the footprint, with its own index of the copied
+        nodes."""
+        copied = type(self).__new__(type(self))
+        memo[id(self)] = copied
+        for k, v in vars(self).items():
+            if k != "_node_index":
+                v = copy.deepcopy(v, memo)
+            setattr(copied, k, v)
+        copied._node_index = NodeIndex(copied)
+        return copied
+
     def get_flattened_nodes(self) -> list[Node]:
         """Return a flattened list of all the child nodes. The child nodes that are
         child of a transform node (Rotation or Translation) are copied and transformed
@@ -127,6 +150,17 @@ class Footprint(Node):
             nodes.extend(child.get_flattened_nodes())
         return nodes
 
+    def fingerprint(self) -> str:
+        """Return a stable digest of the content of the footprint file.
+
+        The digest is the SHA-256 (in hexadecimal) of the `*.kicad_mod` file content,
+        computed while the footprint is serialized, without writing or building the
+        file. Footprints with the same digest have the same file content.
+        """
+        from KicadModTree.KicadFileHandler import KicadFileHandler
+
+        return KicadFileHandler(self).fingerprint()
+
     @property
     def description(self) -> str | None:
         """The optional description of the footprint."""
@@ -177,6 +211,12 @@ class Footprint(Node):
         """The footprint type."""
         self._footprintType = footprintType
 
+    @property
+    def index(self) -> NodeIndex:
+        """The index of the nodes of the footprint, by type, layer and pad number."""
+        assert self._node_index is not None
+        return self._node_index
+
     @property
     def embeddedFonts(self) -> EmbeddedFonts:
         """The embedded font."""
@@ -20,16 +20,19 @@ from __future__ import annotations
 import copy
 import uuid
 from abc import ABC
-from collections.abc import Iterator, Sequence
+from collections.abc import Callable, Iterable, Iterator, Sequence
 from enum import Enum
 from hashlib import sha1
 from traceback import print_stack
-from typing import Any, Protocol, Self, runtime_checkable
+from typing import TYPE_CHECKING, Any, NamedTuple, Self, cast
 
 from _hashlib import HASH
 
 from kilibs.geom import BoundingBox, Vector2D, Vector3D
 
+if TYPE_CHECKING:
+    from KicadModTree.nodes.NodeIndex import NodeIndex
+
 
 class MultipleParentsError(RuntimeError):
     def __init__(self, message: str) -> None:
@@ -43,14 +46,17 @@ class RecursionDetectedError(RuntimeError):
         super(RecursionDetectedError, self).__init__(message)
 
 
-@runtime_checkable
-class _HasCallableHashDict(Protocol):
-    def hashdict(self) -> str: ...
-
-
 class TStamp(object):
     """A timestamp."""
 
+    __slots__ = (
+        "_tstamp",
+        "_tstamp_seed",
+        "_unique_id",
+        "_isTStampManualFixed",
+        "_parentNode",
+    )
+
     def __init__(
         self,
         tstamp: uuid.UUID | str | None = None,
@@ -207,8 +213,11 @@ class TStamp(object):
         if use_obj_hash:
             if obj is not None:
                 d: str | dict[str, Any]
-                if isinstance(obj, _HasCallableHashDict):
-                    d = obj.hashdict()
+                hashdict: Callable[[], dict[str, Any]] | None = getattr(
+                    obj, "hashdict", None
+                )
+                if hashdict is not None:
+                    d = hashdict()
                 else:
                     # consider using hash_str = sha1( str(obj.__hash__()).encode('utf-8') ).hexdigest()
                     d = Node.cleanup_to_hash_dict(obj.__dict__)
@@ -288,9 +297,81 @@ class TStamp(object):
         )
 
 
+class _HashCache(NamedTuple):
+    """The memoized deterministic hash of a node (see `Node._deterministic_hash`)."""
+
+    state: tuple[Any, ...]
+    """The snapshot of the hashed attribute values of the node when it was hashed."""
+    hash: HASH
+    """The hash."""
+
+
+_UNHASHED_ATTRIBUTES = ("_parent", "_tstamp", "_hash_cache", "_node_index")
+"""The attributes of a node which are not part of its hash."""
+
+
+def _number_key(value: float) -> object:
+    """Return a key of a number which is equal for two numbers only if their string
+    representations are equal.
+
+    Equal numbers of the same type have the same string representation, except for the
+    sign of zero (and NaN, which is not equal to itself).
+    """
+    return (type(value), value) if value else str(value)
+
+
+def _hash_key(value: Any) -> object:
+    """Return a cheap snapshot of an attribute value which is equal for two values only
+    if they are hashed the same way by `Node.cleanup_to_hash_dict`."""
+    # Fast path for the exact built-in types, which can't have any hash methods
+    cls = cast(type[object], type(value))
+    if cls is str:
+        return (str, value)
+    elif cls is float or cls is int or cls is bool:
+        return _number_key(value)
+    elif cls is Vector2D:
+        return (Vector2D, _number_key(value.x), _number_key(value.y))
+    elif value is None or cls is list or cls is dict or cls is tuple:
+        # Not hashed (see `Node.cleanup_to_hash_dict`)
+        return None
+    elif hasattr(value, "_deterministic_hash"):
+        return value._deterministic_hash().digest()
+    elif hasattr(value, "hashdict"):
+        return value.hashdict()
+    elif isinstance(value, Enum):
+        return value
+    elif isinstance(value, str):
+        return (str, value)
+    elif isinstance(value, int | float):
+        return _number_key(value)
+    elif isinstance(value, Vector2D):
+        return (Vector2D, _number_key(value.x), _number_key(value.y))
+    elif isinstance(value, Vector3D):
+        return (
+            Vector3D,
+            _number_key(value.x),
+            _number_key(value.y),
+            _number_key(value.z),
+        )
+    elif isinstance(value, TStamp):
+        return str(value)
+    else:
+        return None
+
+
 class Node(ABC):
     """The abstract base node."""
 
+    # Most nodes never get a timestamp, so it is only created when it is needed (which
+    # also saves a reference cycle between every node and its timestamp).
+    _tstamp: TStamp | None = None
+    """The timestamp, or `None` if it wasn't created yet."""
+    _hash_cache: _HashCache | None = None
+    """The memoized deterministic hash, or `None` if it wasn't computed yet."""
+    _node_index: NodeIndex | None = None
+    """The index of the nodes below this node, if it is the root node of an indexed
+    tree (e.g. a footprint)."""
+
     def __init__(self) -> None:
         """Create a node."""
 
@@ -299,32 +380,33 @@ class Node(ABC):
         """The parent node."""
         self._children: list[Node]
         """"The child nodes."""
-        self._tstamp: TStamp
-        """The timestamp."""
 
         self._parent = None
         self._children = []
-        self._tstamp = TStamp(parent=self)
 
     def has_valid_timestamp(self) -> bool:
         """Return whether the node has a valid timestamp or not."""
-        return self._tstamp.is_timestamp_valid()
+        return self._tstamp is not None and self._tstamp.is_timestamp_valid()
 
     def has_valid_seed_for_timestamp(self) -> bool:
         """Return whether the node has a valid timestamp seed or not."""
-        return self._tstamp.is_timestamp_seed_valid()
+        return self._tstamp is not None and self._tstamp.is_timestamp_seed_valid()
+
+    def _get_timestamp_seed(self) -> uuid.UUID | None:
+        """Return the seed of the timestamp, without creating the timestamp."""
+        return None if self._tstamp is None else self._tstamp.get_timestamp_seed()
 
     def set_timestamp_seed_from_node(self, node: Node) -> None:
         """Sets the timestamp by using the nodes' timestamps' seed."""
-        if node.get_timestamp_class().get_timestamp_seed() is not None:
-            return self._tstamp.set_timestamp_seed(
-                node.get_timestamp_class().get_timestamp_seed()
-            )
+        if (seed := node._get_timestamp_seed()) is not None:
+            return self.get_timestamp_class().set_timestamp_seed(seed)
         else:
             return None
 
     def get_timestamp_class(self) -> TStamp:
         """Return the timestamp object (class) of the node."""
+        if self._tstamp is None:
+            self._tstamp = TStamp(parent=self)
         return self._tstamp
 
     def set_timestamp(self, tstamp: uuid.UUID | str | TStamp) -> None:
@@ -332,11 +414,11 @@ class Node(ABC):
         if isinstance(tstamp, TStamp):
             self._tstamp = tstamp
         else:
-            self._tstamp.set_timestamp(tstamp)
+            self.get_timestamp_class().set_timestamp(tstamp)
 
     def get_timestamp(self) -> uuid.UUID | str | None:
         """Return the timestamp of the node."""
-        return self._tstamp.get_timestamp()
+        return None if self._tstamp is None else self._tstamp.get_timestamp()
 
     @staticmethod
     def cleanup_to_hash_dict(obj_dict: dict[str, Any]) -> dict[str, Any]:
@@ -353,11 +435,11 @@ class Node(ABC):
         if "polygon_nodes_raw" in obj_dict.keys():
             pass
         for k, v in obj_dict.items():
-            if k in ["_parent", "_tstamp"]:
+            if k in _UNHASHED_ATTRIBUTES:
                 continue
             if hasattr(v, "_deterministic_hash"):
-                v = v._deterministic_hash()
-            elif isinstance(v, _HasCallableHashDict):
+                v = v._deterministic_hash().hexdigest()
+            elif hasattr(v, "hashdict"):
                 v = v.hashdict()
             elif (
                 isinstance(v, str)
@@ -378,17 +460,44 @@ class Node(ABC):
 
     def hashdict(self) -> dict[str, Any]:
         """Clean up this node's dictionary for the purpose of hashing it and return it."""
-        hash_dict = self.cleanup_to_hash_dict(self.__dict__)
+        hash_dict = self.cleanup_to_hash_dict(vars(self))
         return hash_dict
 
     def _deterministic_hash(self) -> HASH:
-        """Return a deterministic SHA1 hash of this object."""
-        return sha1(repr(self.hashdict()).encode("utf-8"))
+        """Return a deterministic SHA1 hash of this object.
+
+        The hash is memoized together with a cheap snapshot of the hashed attribute
+        values (see `_hash_key`). It is computed again only if the snapshot changed,
+        whether an attribute was assigned or changed in place (e.g. a vector moved by
+        `self.at += vector`). The child nodes are not part of the hash.
+        """
+        state = tuple(
+            (k, _hash_key(v))
+            for k, v in vars(self).items()
+            if k not in _UNHASHED_ATTRIBUTES
+        )
+        cache = self._hash_cache
+        if cache is None or cache.state != state:
+            cache = _HashCache(state, sha1(repr(self.hashdict()).encode("utf-8")))
+            self._hash_cache = cache
+        return cache.hash.copy()
 
     def __hash__(self) -> int:
         """Return this object's SHA1 hash as an integer."""
         return int.from_bytes(self._deterministic_hash().digest(), byteorder="little")
 
+    def fingerprint(self) -> str:
+        """Return a stable digest of the serialized content of the node.
+
+        The digest is the SHA-256 (in hexadecimal) of the serialization of the
+        flattened nodes (see `get_flattened_nodes`) in the KiCad native order, hashed
+        chunk by chunk without building the whole string. Nodes with the same digest
+        serialize to the same content.
+        """
+        from KicadModTree.KicadFileHandler import KicadFileHandler
+
+        return KicadFileHandler.fingerprint_nodes(self.get_flattened_nodes())
+
     def __iter__(self) -> Iterator[Node]:
         """Return an iterator to iterate through all child nodes of this object."""
         return iter(self.get_child_nodes())
@@ -409,11 +518,15 @@ class Node(ABC):
         self._children.append(node)
 
         node._parent = self
-        if (node.get_timestamp_class().get_timestamp_seed() is None) and (
-            self.get_timestamp_class().get_timestamp_seed() is not None
+        if (node._get_timestamp_seed() is None) and (
+            self._get_timestamp_seed() is not None
         ):
             node.set_timestamp_seed_from_node(self)
 
+        index = self._get_tree_index()
+        if index is not None:
+            index.add(node)
+
     def extend(self, nodes: Sequence[Node]) -> None:
         """Add a list of nodes as child nodes."""
         new_nodes: list[Node] = []
@@ -426,13 +539,18 @@ class Node(ABC):
         # when all went smooth by now, we can set the parent nodes to ourself
         for node in new_nodes:
             node._parent = self
-            if (node.get_timestamp_class().get_timestamp_seed() is None) and (
-                self.get_timestamp_class().get_timestamp_seed() is not None
+            if (node._get_timestamp_seed() is None) and (
+                self._get_timestamp_seed() is not None
             ):
                 node.set_timestamp_seed_from_node(self)
 
         self._children.extend(new_nodes)
 
+        index = self._get_tree_index()
+        if index is not None:
+            for node in new_nodes:
+                index.add(node)
+
     def __add__(self, nodes: Node | Sequence[Node]) -> Self:
         """Convenience function to allow simple append/extend to a Node."""
         if isinstance(nodes, Node):
@@ -451,9 +569,15 @@ class Node(ABC):
             node: The node to remove.
         """
         child_nodes = parent.get_child_nodes()
-        while node in child_nodes:
-            child_nodes.remove(node)
-            node._parent = None
+        # Compare the nodes by identity (a node is a child of its parent only once)
+        for i, child in enumerate(child_nodes):
+            if child is node:
+                del child_nodes[i]
+                node._parent = None
+                index = parent._get_tree_index()
+                if index is not None:
+                    index.discard(node)
+                break
 
     def remove(self, node: Node, traverse: bool = False) -> None:
         """Remove a node from this node's list of child nodes.
@@ -473,6 +597,33 @@ class Node(ABC):
                 for child in self.get_child_nodes():
                     child.remove(node, traverse=traverse)
 
+    def remove_many(self, nodes: Iterable[Node]) -> None:
+        """Remove nodes from the tree below this node, wherever they are.
+
+        This is the same as removing each of the nodes with `remove(node,
+        traverse=True)`, but the tree is walked only once, rather than once per node.
+
+        Args:
+            nodes: The nodes to remove. The nodes which aren't in the tree are ignored.
+        """
+        removed = {id(node): node for node in nodes}
+        if not removed:
+            return
+        index = self._get_tree_index()
+        todo: list[Node] = [self]
+        while todo:
+            parent = todo.pop()
+            child_nodes = parent.get_child_nodes()
+            kept = [child for child in child_nodes if id(child) not in removed]
+            if len(kept) != len(child_nodes):
+                for child in child_nodes:
+                    if id(child) in removed:
+                        child._parent = None
+                        if index is not None:
+                            index.discard(child)
+                child_nodes[:] = kept
+            todo.extend(kept)
+
     def insert(self, node: Node) -> None:
         """Move all child nodes from this node into the given node and append the given
         node to this node.
@@ -489,6 +640,11 @@ class Node(ABC):
         """Create a copy of itself."""
         copied_node = copy.copy(self)
         copied_node._parent = None
+        # The vectors are changed in place by some transforms (e.g. `self.at += vector`),
+        # so they must not be shared with the original node
+        for k, v in vars(copied_node).items():
+            if isinstance(v, Vector2D | Vector3D):
+                setattr(copied_node, k, copy.copy(v))
         return copied_node
 
     def translate(self, vector: Vector2D) -> Self:
@@ -561,6 +717,13 @@ class Node(ABC):
         """Return the parent node of this node."""
         return self._parent
 
+    def _get_tree_index(self) -> NodeIndex | None:
+        """Return the index of the tree this node is in, if it has one."""
+        node = self
+        while node._parent is not None:
+            node = node._parent
+        return node._node_index
+
     def get_root_node(self) -> Node:
         """Return the root node of this node."""
 
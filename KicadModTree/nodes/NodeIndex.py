@@ -0,0 +1,322 @@
+# kilibs is free software: you can redistribute it and/or modify it under the terms of
+# the GNU General Public License as published by the Free Software Foundation, either
+# version 3 of the License, or (at your option) any later version.
+#
+# kilibs is distributed in the hope that it will be useful, but WITHOUT ANY WARRANTY;
+# without even the implied warranty of MERCHANTABILITY or FITNESS FOR A PARTICULAR
+# PURPOSE. See the GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License along with kilibs.
+# If not, see < http://www.gnu.org/licenses/ >.
+#
+# (C) The KiCad Librarian Team
+
+"""Class definition for the index of the nodes of a tree."""
+
+from __future__ import annotations
+
+from collections.abc import Sequence
+from typing import Any, NamedTuple, TypeVar, cast
+
+from KicadModTree.nodes.base.Pad import Pad, ReferencedPad
+from KicadModTree.nodes.Node import Node
+from KicadModTree.nodes.NodeShape import NodeShape
+
+_T = TypeVar("_T")
+
+_PAD_TYPES = (Pad, ReferencedPad)
+"""The types of the nodes which are indexed by number."""
+
+
+class _IndexEntry(NamedTuple):
+    """How a node is indexed."""
+
+    order: tuple[int, ...]
+    """The order in which the node was added (the nodes below a node with generated
+    children are ordered after it, see `NodeIndex._expand`)."""
+    layers: list[str]
+    """The layers under which the node is indexed."""
+    number: str | None
+    """The number under which the node is indexed (for the pads)."""
+    parent_key: int | None
+    """The ID of the indexed parent node, or `None` for the top nodes."""
+
+
+class _TypeInfo(NamedTuple):
+    """What the index needs to know about a node type."""
+
+    is_pad: bool
+    """Whether the nodes are pads."""
+    is_shape: bool
+    """Whether the nodes are shapes (whose children are not indexed)."""
+    has_generated_children: bool
+    """Whether the child nodes are generated by `get_child_nodes()` rather than
+    appended."""
+
+
+class NodeIndex:
+    """An index of the nodes of a tree by type, by layer and (for the pads) by number.
+
+    The index of a footprint (see `Footprint.index`) is updated when nodes are added to
+    or removed from its tree (with `append()`, `extend()`, `insert()`, `remove()` or
+    `remove_many()` of any node of the tree), so the queries take a time proportional
+    to the number of results, not to the size of the tree. The nodes are returned in
+    the order in which they were added.
+
+    Notes:
+        - The nodes are indexed by the layers and number they had when they were
+            added. Call `rebuild()` after changing them.
+        - The children of shapes (e.g. the line segments of a `PolygonLine`, which
+            are created again when it is moved) are not indexed, only the shapes.
+        - The children of the nodes which generate them (e.g. the pads of an
+            `ExposedPad`) are indexed when the index is queried, not when the nodes
+            are added, so that they are not generated early. A node is removed with
+            the very children that were indexed, even if it generates other ones
+            since.
+    """
+
+    def __init__(self, root: Node) -> None:
+        """Create an index of the nodes below a root node.
+
+        Args:
+            root: The root node of the tree (which is not indexed itself).
+        """
+
+        # Instance attributes:
+        self._root: Node
+        """The root node of the tree."""
+        self._entries: dict[int, _IndexEntry]
+        """How the nodes are indexed, by their ID."""
+        self._children: dict[int, dict[int, Node]]
+        """The indexed child nodes of the indexed nodes (by their ID), by the ID of the
+        parent node."""
+        self._unexpanded: dict[int, Node]
+        """The nodes with generated children whose children are not indexed yet, by
+        their ID."""
+        self._next_order: int
+        """The order of the next node which is added."""
+        self._by_type: dict[type, dict[int, Node]]
+        """The nodes by their (exact) type, then by their ID."""
+        self._by_layer: dict[str, dict[int, Node]]
+        """The nodes by layer, then by their ID."""
+        self._pads_by_number: dict[str, dict[int, Node]]
+        """The pads by number (as a string), then by their ID."""
+        self._type_info: dict[type, _TypeInfo]
+        """What the index needs to know about the node types, by type (`isinstance()`
+        is slow with abstract base classes)."""
+
+        self._type_info = {}
+
+        self._root = root
+        self.rebuild()
+
+    def rebuild(self) -> None:
+        """Index all the nodes of the tree again."""
+        self._entries = {}
+        self._children = {}
+        self._unexpanded = {}
+        self._next_order = 0
+        self._by_type = {}
+        self._by_layer = {}
+        self._pads_by_number = {}
+        for child in self._root.get_child_nodes():
+            self.add(child)
+
+    def _get_type_info(self, node_type: type[Node]) -> _TypeInfo:
+        """Return what the index needs to know about a node type."""
+        info = self._type_info.get(node_type)
+        if info is None:
+            info = _TypeInfo(
+                is_pad=issubclass(node_type, _PAD_TYPES),
+                is_shape=issubclass(node_type, NodeShape),
+                has_generated_children=(
+                    node_type.get_child_nodes is not Node.get_child_nodes
+                ),
+            )
+            self._type_info[node_type] = info
+        return info
+
+    @staticmethod
+    def _get_layers(node: Node) -> list[str]:
+        """Return the layers of a node (none if it has no layers)."""
+        layers: object = getattr(node, "layers", None)
+        if isinstance(layers, list | tuple):
+            return list(
+                dict.fromkeys(
+                    layer
+                    for layer in cast(Sequence[object], layers)
+                    if isinstance(layer, str)
+                )
+            )
+        layer = getattr(node, "layer", None)
+        return [layer] if isinstance(layer, str) else []
+
+    def _add_entry(
+        self, node: Node, order: tuple[int, ...], parent_key: int | None
+    ) -> _TypeInfo:
+        """Index a node (but not the nodes below it) and return its type info."""
+        info = self._get_type_info(type(node))
+        key = id(node)
+        layers = self._get_layers(node)
+        number = str(cast(Pad | ReferencedPad, node).number) if info.is_pad else None
+        self._entries[key] = _IndexEntry(order, layers, number, parent_key)
+        self._by_type.setdefault(type(node), {})[key] = node
+        for layer in layers:
+            self._by_layer.setdefault(layer, {})[key] = node
+        if number is not None:
+            self._pads_by_number.setdefault(number, {})[key] = node
+        if parent_key is not None:
+            self._children[parent_key][key] = node
+        if not info.is_shape:
+            self._children[key] = {}
+        return info
+
+    def add(self, node: Node) -> None:
+        """Add a node and the nodes below it to the index.
+
+        Args:
+            node: The node to add.
+        """
+        if id(node) in self._entries:
+            return
+        parent = node.get_parent()
+        parent_key = None
+        if parent is not None and id(parent) in self._children:
+            parent_key = id(parent)
+        todo: list[tuple[Node, int | None]] = [(node, parent_key)]
+        while todo:
+            n, parent_key = todo.pop()
+            key = id(n)
+            if key in self._entries:
+                continue
+            info = self._add_entry(n, (self._next_order,), parent_key)
+            self._next_order += 1
+            if info.is_shape:
+                continue
+            elif info.has_generated_children:
+                self._unexpanded[key] = n
+            else:
+                todo.extend((child, key) for child in reversed(n.get_child_nodes()))
+
+    def _expand(self) -> None:
+        """Index the children of the nodes which generate them, if not done yet."""
+        while self._unexpanded:
+            key, node = self._unexpanded.popitem()
+            order = self._entries[key].order
+            sub_order = 0
+            todo: list[tuple[Node, int]] = [
+                (child, key) for child in reversed(node.get_child_nodes())
+            ]
+            while todo:
+                n, parent_key = todo.pop()
+                if id(n) in self._entries:
+                    continue
+                info = self._add_entry(n, order + (sub_order,), parent_key)
+                sub_order += 1
+                if not info.is_shape:
+                    todo.extend(
+                        (child, id(n)) for child in reversed(n.get_child_nodes())
+                    )
+
+    def discard(self, node: Node) -> None:
+        """Remove a node and the nodes below it from the index, if they are in it.
+
+        The nodes below it are the ones which were indexed with it, whatever its child
+        nodes are now.
+
+        Args:
+            node: The node to remove.
+        """
+        entry = self._entries.get(id(node))
+        if entry is None:
+            return
+        if entry.parent_key is not None:
+            del self._children[entry.parent_key][id(node)]
+        todo = [node]
+        while todo:
+            n = todo.pop()
+            key = id(n)
+            _, layers, number, _ = self._entries.pop(key)
+            self._unexpanded.pop(key, None)
+            del self._by_type[type(n)][key]
+            for layer in layers:
+                del self._by_layer[layer][key]
+            if number is not None:
+                del self._pads_by_number[number][key]
+            children = self._children.pop(key, None)
+            if children is not None:
+                todo.extend(children.values())
+
+    def __len__(self) -> int:
+        """Return the number of nodes in the index."""
+        self._expand()
+        return len(self._entries)
+
+    def __contains__(self, node: object) -> bool:
+        """Return whether a node (this very object) is in the index."""
+        self._expand()
+        return id(node) in self._entries
+
+    def get_nodes(self, node_type: type[_T] | Any = Node) -> list[_T]:
+        """Return the nodes of a type.
+
+        Args:
+            node_type: The type of the nodes, a tuple or union of types.
+
+        Returns:
+            The nodes which are instances of the given type(s).
+        """
+        self._expand()
+        nodes: list[Any] = []
+        num_types = 0
+        for t, type_nodes in self._by_type.items():
+            if type_nodes and issubclass(t, node_type):
+                nodes.extend(type_nodes.values())
+                num_types += 1
+        if num_types > 1 or self._has_expanded_nodes(nodes):
+            nodes.sort(key=lambda n: self._entries[id(n)].order)
+        return nodes
+
+    def _has_expanded_nodes(self, nodes: list[Any]) -> bool:
+        """Return whether some of the nodes were indexed out of order (when the
+        children of a node which generates them were indexed)."""
+        return any(len(self._entries[id(n)].order) > 1 for n in nodes)
+
+    def get_nodes_on_layer(
+        self, layer: str, node_type: type[_T] | Any = Node
+    ) -> list[_T]:
+        """Return the nodes on a layer.
+
+        Args:
+            layer: The layer, e.g. `"F.SilkS"`. Wildcards are not expanded: the pads on
+                all copper layers are on the layer `"*.Cu"`.
+            node_type: The type of the nodes, a tuple or union of types.
+
+        Returns:
+            The nodes which are on the layer and are instances of the given type(s).
+        """
+        self._expand()
+        nodes: list[Any] = list(self._by_layer.get(layer, {}).values())
+        if node_type is not Node:
+            nodes = [n for n in nodes if isinstance(n, node_type)]
+        if self._has_expanded_nodes(nodes):
+            nodes.sort(key=lambda n: self._entries[id(n)].order)
+        return nodes
+
+    def get_pads(self, number: str | int | None = None) -> list[Pad | ReferencedPad]:
+        """Return the pads, or the pads with a given number.
+
+        Args:
+            number: The number of the pads (the numbers are compared as strings), or
+                `None` for all the pads.
+
+        Returns:
+            The pads.
+        """
+        if number is None:
+            return self.get_nodes(_PAD_TYPES)
+        self._expand()
+        nodes: list[Any] = list(self._pads_by_number.get(str(number), {}).values())
+        if self._has_expanded_nodes(nodes):
+            nodes.sort(key=lambda n: self._entries[id(n)].order)
+        return nodes
@@ -39,6 +39,7 @@ from .base import (
     ZoneFill,
 )
 from .Footprint import Footprint, FootprintType
+from .NodeIndex import NodeIndex
 from .NodeShape import NodeShape
 from .specialized import (
     ChamferedNativePad,
@@ -56,6 +57,7 @@ from .specialized import (
     Rotation,
     RoundRectangle,
     Stadium,
+    TransformNode,
     Translation,
     Trapezoid,
 )
@@ -84,6 +86,7 @@ __all__ = [
     "MultipleParentsError",
     "Node",
     "RecursionDetectedError",
+    "NodeIndex",
     "NodeShape",
     "ChamferedNativePad",
     "ChamferedPad",
@@ -100,6 +103,7 @@ __all__ = [
     "Rotation",
     "RoundRectangle",
     "Stadium",
+    "TransformNode",
     "Translation",
     "Trapezoid",
 ]
@@ -41,8 +41,7 @@ class CompoundPolygon(NodeShape, GeomCompoundPolygon):
         shape: (
             CompoundPolygon
             | GeomShape
-            | Sequence[Vec2DCompatible]
-            | Sequence[GeomPolygon | GeomLine | GeomArc]
+            | Sequence[Vec2DCompatible | GeomPolygon | GeomLine | GeomArc]
         ),
         layer: str = "F.SilkS",
         width: float | None = None,
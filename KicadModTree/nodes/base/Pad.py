@@ -77,6 +77,11 @@ class ReferencedPad(Node):
         """The shape of the referenced pad."""
         return self.reference_pad.shape
 
+    @property
+    def layers(self) -> list[str]:
+        """The layers of the referenced pad."""
+        return self.reference_pad.layers
+
     def bbox(self) -> BoundingBox:
         """The bounding box of the referenced pad."""
         if self.reference_pad.shape in [
@@ -15,10 +15,11 @@
 """Class definition for the rotation node."""
 
 from KicadModTree.nodes.Node import Node
-from kilibs.geom import BoundingBox, Vector2D
+from KicadModTree.nodes.specialized.TransformNode import TransformNode
+from kilibs.geom import Vector2D
 
 
-class Rotation(Node):
+class Rotation(TransformNode):
     """A rotation that is applied to every child node."""
 
     def __init__(self, angle: float = 0.0, origin: Vector2D = Vector2D.zero()) -> None:
@@ -40,27 +41,16 @@ class Rotation(Node):
         self.angle = angle
         self.origin = origin
 
-    def get_flattened_nodes(self) -> list[Node]:
-        """Return a list of the rotated copies of all child nodes from the node tree.
+    def transform(self, node: Node) -> Node:
+        """Rotate a node, in place.
+
+        Args:
+            node: The node to rotate.
 
         Returns:
-            The list of a rotated copy of all child nodes.
+            The rotated node.
         """
-        raw_nodes: list[Node] = []
-        transformed_nodes: list[Node] = []
-        for child in self._children:
-            raw_nodes.extend(child.get_flattened_nodes())
-        for n in raw_nodes:
-            transformed_nodes.append(n.rotated(angle=self.angle, origin=self.origin))
-        return transformed_nodes
-
-    def bbox(self) -> BoundingBox:
-        """Return the rotated bounding box of every child node."""
-        bbox = BoundingBox()
-        for child in self._children:
-            child_bbox = child.rotated(angle=self.angle, origin=self.origin).bbox()
-            bbox.include_bbox(child_bbox)
-        return bbox
+        return node.rotate(angle=self.angle, origin=self.origin)
 
     def __repr__(self) -> str:
         """The string representation of the rotation."""
@@ -0,0 +1,81 @@
+# kilibs is free software: you can redistribute it and/or modify it under the terms of
+# the GNU General Public License as published by the Free Software Foundation, either
+# version 3 of the License, or (at your option) any later version.
+#
+# kilibs is distributed in the hope that it will be useful, but WITHOUT ANY WARRANTY;
+# without even the implied warranty of MERCHANTABILITY or FITNESS FOR A PARTICULAR
+# PURPOSE. See the GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License along with kilibs.
+# If not, see < http://www.gnu.org/licenses/ >.
+#
+# (C) The KiCad Librarian Team
+
+"""Class definition for the base of the transform nodes."""
+
+from __future__ import annotations
+
+from abc import abstractmethod
+
+from KicadModTree.nodes.Node import Node
+from kilibs.geom import BoundingBox
+
+
+class TransformNode(Node):
+    """The base of the nodes that transform (e.g. rotate) every child node.
+
+    Nested transform nodes are flattened together: every node of the tree below the
+    outermost transform node is copied once, and the transforms of all the levels are
+    applied to this copy, from the innermost one to the outermost one. The result is
+    the same as transforming a copy at every level, without the intermediate copies.
+    """
+
+    @abstractmethod
+    def transform(self, node: Node) -> Node:
+        """Apply the transform of this node to another node, in place.
+
+        Args:
+            node: The node to transform.
+
+        Returns:
+            The transformed node.
+        """
+
+    def _get_untransformed_nodes(self) -> list[tuple[Node, list[TransformNode]]]:
+        """Return the flattened child nodes, before they are transformed.
+
+        Returns:
+            The flattened child nodes, each with the transform nodes to apply to it,
+            from the innermost one to this one.
+        """
+        nodes: list[tuple[Node, list[TransformNode]]] = []
+        for child in self._children:
+            if isinstance(child, TransformNode):
+                for node, transforms in child._get_untransformed_nodes():
+                    transforms.append(self)
+                    nodes.append((node, transforms))
+            else:
+                nodes.extend((node, [self]) for node in child.get_flattened_nodes())
+        return nodes
+
+    def get_flattened_nodes(self) -> list[Node]:
+        """Return a list of the transformed copies of all child nodes from the node
+        tree.
+
+        Returns:
+            The list of a transformed copy of all child nodes.
+        """
+        transformed_nodes: list[Node] = []
+        for node, transforms in self._get_untransformed_nodes():
+            node = node.copy()
+            for transform in transforms:
+                node = transform.transform(node)
+            transformed_nodes.append(node)
+        return transformed_nodes
+
+    def bbox(self) -> BoundingBox:
+        """Return the bounding box of the transformed child nodes."""
+        bbox = BoundingBox()
+        for node in self.get_flattened_nodes():
+            bbox.include_bbox(node.bbox())
+        return bbox
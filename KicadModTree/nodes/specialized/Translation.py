@@ -15,11 +15,12 @@
 """Class definition for the translation node."""
 
 from KicadModTree.nodes.Node import Node
+from KicadModTree.nodes.specialized.TransformNode import TransformNode
 from kilibs.geom.bounding_box import BoundingBox
 from kilibs.geom.vector import Vector2D
 
 
-class Translation(Node):
+class Translation(TransformNode):
     """A translation that is applied to every child node."""
 
     def __init__(self, x: float | Vector2D, y: float = 0.0) -> None:
@@ -40,19 +41,16 @@ class Translation(Node):
         else:
             self.offset = Vector2D.from_floats(x, y)
 
-    def get_flattened_nodes(self) -> list[Node]:
-        """Return a list of the translated copies of all child nodes from the node tree.
+    def transform(self, node: Node) -> Node:
+        """Translate a node, in place.
+
+        Args:
+            node: The node to translate.
 
         Returns:
-            The list of a translated copy of all child nodes.
+            The translated node.
         """
-        raw_nodes: list[Node] = []
-        transformed_nodes: list[Node] = []
-        for child in self._children:
-            raw_nodes.extend(child.get_flattened_nodes())
-        for n in raw_nodes:
-            transformed_nodes.append(n.translated(vector=self.offset))
-        return transformed_nodes
+        return node.translate(self.offset)
 
     def bbox(self) -> BoundingBox:
         """Return the translated bounding box of every child node."""
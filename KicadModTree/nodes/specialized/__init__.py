@@ -27,6 +27,7 @@ from .RingPad import RingPad
 from .Rotation import Rotation
 from .RoundRectangle import RoundRectangle
 from .Stadium import Stadium
+from .TransformNode import TransformNode
 from .Translation import Translation
 from .Trapezoid import Trapezoid
 
@@ -46,6 +47,7 @@ __all__ = [
     "Rotation",
     "RoundRectangle",
     "Stadium",
+    "TransformNode",
     "Translation",
     "Trapezoid",
 ]
@@ -16,7 +16,7 @@
 import functools
 import re
 from enum import Enum
-from typing import Any, cast
+from typing import Any, Callable, cast
 
 from KicadModTree.nodes.base.Arc import Arc
 from KicadModTree.nodes.base.Circle import Circle
@@ -52,6 +52,16 @@ _DEFAULT_WIDTH = 0.15
 _DEFAULT_WIDTH_POLYGON_PAD = 0.0
 """Default width of the outline of custom sized pads."""
 
+PAD_FAB_PROPERTY_SYMBOLS: dict[Pad.FabProperty, str] = {
+    Pad.FabProperty.BGA: "pad_prop_bga",
+    Pad.FabProperty.FIDUCIAL_GLOBAL: "pad_prop_pad_prop_heatsink",
+    Pad.FabProperty.FIDUCIAL_LOCAL: "pad_prop_fiducial_loc",
+    Pad.FabProperty.HEATSINK: "pad_prop_heatsink",
+    Pad.FabProperty.TESTPOINT: "pad_prop_testpoint",
+    Pad.FabProperty.CASTELLATED: "pad_prop_castellated",
+}
+"""The symbols of the pad fabrication properties in the file format."""
+
 
 class SerializerPriority:
     """A class to sort nodes according to their priorities."""
@@ -127,6 +137,34 @@ class SerializerPriority:
         "F.Fab": 35,
     }
 
+    _LAYER_PRIORITIES: dict[str, int] = {
+        **_LAYER_PRIORITY_MAP,
+        # inner layers: even numbers from 4
+        **{f"In{i}.Cu": (i + 1) * 2 for i in range(1, 31)},
+        # user layers from 39 onwards
+        **{f"User.{i}": 38 + i for i in range(1, 10)},
+    }
+    """The priorities of all the layers of KiCad, so that they are looked up
+    rather than matched."""
+
+    _PAD_SHAPE_PRIORITIES: dict[str, int] = {
+        shape: i
+        for i, shape in enumerate(
+            ["circle", "rect", "oval", "trapezoid", "roundrect", "custom"]
+        )
+    }
+    """The priorities of the pad shapes (other shapes come after these)."""
+
+    # The priorities of the most common nodes, as plain numbers for the sort keys
+    _TEXT_PRIORITY: int = _NodePriority.TEXT.value
+    _SHAPE_PRIORITY: int = _NodePriority.SHAPE.value
+    _PAD_PRIORITY: int = _NodePriority.PAD.value
+    _LINE_PRIORITY: int = _ShapePriority.LINE.value
+    _RECTANGLE_PRIORITY: int = _ShapePriority.RECTANGLE.value
+    _ARC_PRIORITY: int = _ShapePriority.ARC.value
+    _CIRCLE_PRIORITY: int = _ShapePriority.CIRCLE.value
+    _POLYGON_PRIORITY: int = _ShapePriority.POLYGON.value
+
     @staticmethod
     def sort_layers(layers: list[str]) -> list[str]:
         """Sort layers by their prorities in which they shall be serialized.
@@ -149,11 +187,7 @@ class SerializerPriority:
         Returns:
             A list of numbers corresponding to the sorted priorities of the given layers.
         """
-        priorities: list[int] = []
-        for layer in layers:
-            priorities.append(SerializerPriority.get_layer_priority(layer))
-        priorities.sort()
-        return priorities
+        return sorted(SerializerPriority.get_layer_priority(layer) for layer in layers)
 
     @staticmethod
     def get_layer_priority(layer: str) -> int:
@@ -167,40 +201,41 @@ class SerializerPriority:
         """
         # Approximate sorting order from PCB_IO_KICAD_SEXPR::formatLayers()
         try:
-            return SerializerPriority._LAYER_PRIORITY_MAP[layer]
+            return SerializerPriority._LAYER_PRIORITIES[layer]
         except KeyError:
-            # inner layers: even numbers from 4
+            # Layers beyond the ones in the table
             if m := re.match(r"^In(\d+)\.Cu$", layer):
                 return (int(m.group(1)) + 1) * 2
-            # user layers from 39 onwards
             if m := re.match(r"^User\.(\d)$", layer):
                 return 38 + int(m.group(1))
 
         raise ValueError(f"Unhandled layer for sorting: {layer}")
 
     @staticmethod
-    def get_sort_key_text(text: Text) -> list[Any]:
+    def get_sort_key_text(text: Text) -> tuple[Any, ...]:
         """Return the sort key of the text."""
-        return [
-            SerializerPriority._NodePriority.TEXT.value,
+        return (
+            SerializerPriority._TEXT_PRIORITY,
             SerializerPriority.get_layer_priority(text.layer),
-        ]
+        )
 
     @staticmethod
-    def get_sort_key_line(line: Line) -> list[Any]:
+    def get_sort_key_line(line: Line) -> tuple[Any, ...]:
         """Return the sort key of the line."""
-        return [
-            SerializerPriority._NodePriority.SHAPE.value,
+        start = line.start
+        end = line.end
+        return (
+            SerializerPriority._SHAPE_PRIORITY,
             SerializerPriority.get_layer_priority(line.layer),
-            SerializerPriority._ShapePriority.LINE.value,
-            round(line.start.x, 6),
-            round(line.start.y, 6),
-            round(line.end.x, 6),
-            round(line.end.y, 6),
-        ]
+            SerializerPriority._LINE_PRIORITY,
+            round(start.x, 6),
+            round(start.y, 6),
+            round(end.x, 6),
+            round(end.y, 6),
+        )
 
     @staticmethod
-    def get_sort_key_arc(arc: Arc) -> list[Any]:
+    def get_sort_key_arc(arc: Arc) -> tuple[Any, ...]:
         """Return the sort key of the arc."""
         start = arc.start
         end = arc.end
@@ -208,100 +243,97 @@ class SerializerPriority:
         # (and the one in _serialize_ArcPoints).
         if arc.angle < 0:
             start, end = end, start
-        return [
-            SerializerPriority._NodePriority.SHAPE.value,
+        center = arc.center
+        return (
+            SerializerPriority._SHAPE_PRIORITY,
             SerializerPriority.get_layer_priority(arc.layer),
-            SerializerPriority._ShapePriority.ARC.value,
+            SerializerPriority._ARC_PRIORITY,
             round(start.x, 6),
             round(start.y, 6),
             round(end.x, 6),
             round(end.y, 6),
-            round(arc.center.x, 6),
-            round(arc.center.y, 6),
-        ]
+            round(center.x, 6),
+            round(center.y, 6),
+        )
 
     @staticmethod
-    def get_sort_key_circle(circle: Circle) -> list[Any]:
+    def get_sort_key_circle(circle: Circle) -> tuple[Any, ...]:
         """Return the sort key of the circle."""
-        return [
-            SerializerPriority._NodePriority.SHAPE.value,
+        center = circle.center
+        return (
+            SerializerPriority._SHAPE_PRIORITY,
             SerializerPriority.get_layer_priority(circle.layer),
-            SerializerPriority._ShapePriority.CIRCLE.value,
-            round(circle.center.x, 6),
-            round(circle.center.y, 6),
+            SerializerPriority._CIRCLE_PRIORITY,
+            round(center.x, 6),
+            round(center.y, 6),
             round(circle.radius, 6),
-        ]
+        )
 
     @staticmethod
-    def get_sort_key_rectangle(rectangle: Rectangle) -> list[Any]:
+    def get_sort_key_rectangle(rectangle: Rectangle) -> tuple[Any, ...]:
         """Return the sort key of the rectangle."""
-        return [
-            SerializerPriority._NodePriority.SHAPE.value,
+        top_left = rectangle.top_left
+        bottom_right = rectangle.bottom_right
+        return (
+            SerializerPriority._SHAPE_PRIORITY,
             SerializerPriority.get_layer_priority(rectangle.layer),
-            SerializerPriority._ShapePriority.RECTANGLE.value,
-            round(rectangle.top_left.x, 6),
-            round(rectangle.top_left.y, 6),
-            round(rectangle.bottom_right.x, 6),
-            round(rectangle.bottom_right.y, 6),
-        ]
+            SerializerPriority._RECTANGLE_PRIORITY,
+            round(top_left.x, 6),
+            round(top_left.y, 6),
+            round(bottom_right.x, 6),
+            round(bottom_right.y, 6),
+        )
 
     @staticmethod
-    def get_sort_key_polygon(polygon: Polygon) -> list[Any]:
+    def get_sort_key_polygon(polygon: Polygon) -> tuple[Any, ...]:
         """Return the sort key of the polygon."""
-        return [
-            SerializerPriority._NodePriority.SHAPE.value,
+        points = polygon.points
+        return (
+            SerializerPriority._SHAPE_PRIORITY,
             SerializerPriority.get_layer_priority(polygon.layer),
-            SerializerPriority._ShapePriority.POLYGON.value,
-            len(polygon.points),
-        ] + [[round(pt.x, 6), round(pt.y, 6)] for pt in polygon.points]
+            SerializerPriority._POLYGON_PRIORITY,
+            len(points),
+            *[(round(pt.x, 6), round(pt.y, 6)) for pt in points],
+        )
 
     @staticmethod
-    def get_sort_key_compound_polygon(cpoly: CompoundPolygon) -> list[Any]:
+    def get_sort_key_compound_polygon(cpoly: CompoundPolygon) -> tuple[Any, ...]:
         """Return the sort key of the compound polygon."""
+        # The elements are computed once, and kept for the serialization
         points_and_arcs = cpoly.get_fp_poly_elements()
         keys: list[float] = []
         for point_or_arc in points_and_arcs:
             if isinstance(point_or_arc, Vector2D):
-                keys.extend([round(point_or_arc.x, 6), round(point_or_arc.y, 6)])
-            # else:
-            #     keys.extend(
-            #         [
-            #             round(point_or_arc.start.x, 6),
-            #             round(point_or_arc.start.y, 6),
-            #             round(point_or_arc.end.x, 6),
-            #             round(point_or_arc.end.y, 6),
-            #             round(point_or_arc.center.x, 6),
-            #             round(point_or_arc.center.y, 6),
-            #         ]
-            #     )
-        return [
-            SerializerPriority._NodePriority.SHAPE.value,
+                keys += (round(point_or_arc.x, 6), round(point_or_arc.y, 6))
+        return (
+            SerializerPriority._SHAPE_PRIORITY,
             SerializerPriority.get_layer_priority(cpoly.layer),
-            SerializerPriority._ShapePriority.POLYGON.value,
+            SerializerPriority._POLYGON_PRIORITY,
             len(points_and_arcs),
-            keys,
-        ]
+            tuple(keys),
+        )
 
     @staticmethod
-    def get_sort_key_zone(zone: Zone) -> list[Any]:
+    def get_sort_key_zone(zone: Zone) -> tuple[Any, ...]:
         """Return the sort key of the zone."""
-        return [
+        return (
             SerializerPriority._NodePriority.ZONE.value,
             zone.priority if zone.priority else 0,
-            [SerializerPriority.get_layer_priority(layer) for layer in zone.layers],
+            tuple(SerializerPriority.get_layer_priority(layer) for layer in zone.layers),
             len(zone.nodes.points),
-            [[round(pt.x, 6), round(pt.y, 6)] for pt in zone.nodes.points],
-        ]
+            tuple((round(pt.x, 6), round(pt.y, 6)) for pt in zone.nodes.points),
+        )
 
     @staticmethod
-    def _pad_num_key(n: str) -> list[tuple[int, str] | tuple[int, int]]:
+    @functools.lru_cache(maxsize=4096)
+    def _pad_num_key(n: str) -> tuple[tuple[int, str] | tuple[int, int], ...]:
         # We want to sort pads with multiple name components such that A2 comes
         # after A1 and before A10, and all the Ax come before all Bx.
         # Example sort order: "", "0", "1", "2", "10", "A", "A1", "A2", "A10",
         # "A100", "B", "B1"...
         # To achieve this, we split by name components such that digit sequences
-        # stay as individual tokens. We will later compare lists of tuples, with the
-        # list length being the component count.
+        # stay as individual tokens. We will later compare tuples of tuples, with
+        # the tuple length being the component count.
 
         # Split the strings into substrings containing digits and those containing
         # everything else. For example: 'a10.2' => ['a', '10', '.', '2']
@@ -309,43 +341,42 @@ class SerializerPriority:
         # To avoid comparing ints to strings, we create tuples with each item and
         # its category number. Ints sort before strings, so they are category 1, and
         # strings get category 2.
-        # For example: ['a', '10', '.', '2'] => [(2, 'a'), (1, 10), (2, '.'), (1, 2)]
-        return [
+        # For example: ['a', '10', '.', '2'] => ((2, 'a'), (1, 10), (2, '.'), (1, 2))
+        # (The keys are cached, as the same pad numbers come up over and over.)
+        return tuple(
             (1, int(substr)) if substr.isdigit() else (2, substr)
             for substr in substrings
-        ]
+        )
 
     @staticmethod
     def _pad_shape_key_func(shape: str) -> int:
-        shapes = ["circle", "rect", "oval", "trapezoid", "roundrect", "custom"]
-        try:
-            return shapes.index(shape)
-        except ValueError:
-            return 1000
+        return SerializerPriority._PAD_SHAPE_PRIORITIES.get(shape, 1000)
 
     @staticmethod
-    def get_sort_key_pad(pad: Pad) -> list[Any]:
+    def get_sort_key_pad(pad: Pad) -> tuple[Any, ...]:
         """Return the sort key of the pad."""
 
         # Approximate sorting order from FOOTPRINT::cmp_pads in KiCad's
         # pcbnew/footprint.cpp.
-        return [
-            SerializerPriority._NodePriority.PAD.value,
+        at = pad.at
+        size = pad.size
+        return (
+            SerializerPriority._PAD_PRIORITY,
             SerializerPriority._pad_num_key(str(pad.number)),
-            round(pad.at.x, 6),
-            round(pad.at.y, 6),
-            round(pad.size.x, 6),
-            round(pad.size.y, 6),
-            SerializerPriority._pad_shape_key_func(pad.shape),
+            round(at.x, 6),
+            round(at.y, 6),
+            round(size.x, 6),
+            round(size.y, 6),
+            SerializerPriority._PAD_SHAPE_PRIORITIES.get(pad.shape, 1000),
             # SerializerPriority.get_sorted_layer_priorities(pad.layers),
-        ]
+        )
 
     @staticmethod
-    def get_sort_key_referenced_pad(referenced_pad: ReferencedPad) -> list[Any]:
+    def get_sort_key_referenced_pad(referenced_pad: ReferencedPad) -> tuple[Any, ...]:
         """Return the sort key of the referenced pad."""
         ref_pad = referenced_pad.reference_pad
-        return [
-            SerializerPriority._NodePriority.PAD.value,
+        return (
+            SerializerPriority._PAD_PRIORITY,
             SerializerPriority._pad_num_key(str(referenced_pad.number)),
             round(referenced_pad.at.x, 6),
             round(referenced_pad.at.y, 6),
@@ -353,27 +384,27 @@ class SerializerPriority:
             round(ref_pad.size.y, 6),
             SerializerPriority._pad_shape_key_func(ref_pad.shape),
             # SerializerPriority.get_sorted_layer_priorities(ref_pad.layers),
-        ]
+        )
 
     @staticmethod
-    def get_sort_key_embedded_fonts(fonts: EmbeddedFonts) -> list[Any]:
+    def get_sort_key_embedded_fonts(fonts: EmbeddedFonts) -> tuple[Any, ...]:
         """Return the sort key of the embedded fonts."""
-        return [SerializerPriority._NodePriority.EMBEDDED_FONT.value]
+        return (SerializerPriority._NodePriority.EMBEDDED_FONT.value,)
 
     @staticmethod
-    def get_sort_key_group(group: Group) -> list[Any]:
+    def get_sort_key_group(group: Group) -> tuple[Any, ...]:
         """Return the sort key of the group."""
-        keys: list[Any] = [SerializerPriority._NodePriority.GROUP.value]
+        keys: tuple[Any, ...] = (SerializerPriority._NodePriority.GROUP.value,)
         if group.has_valid_timestamp():
-            keys += [group.get_timestamp()]
+            keys += (group.get_timestamp(),)
         if member_nodes := group.get_group_member_nodes():
-            keys += [len(member_nodes)]
+            keys += (len(member_nodes),)
         return keys
 
     @staticmethod
-    def get_sort_key_model(model: Model) -> list[Any]:
+    def get_sort_key_model(model: Model) -> tuple[Any, ...]:
         """Return the sort key of the embedded font."""
-        return [SerializerPriority._NodePriority.MODEL.value]
+        return (SerializerPriority._NodePriority.MODEL.value,)
 
 
 class Serializer:
@@ -399,6 +430,14 @@ class Serializer:
         """Convert the serializer's content to a string."""
         return "".join(self.content)
 
+    def pop_string(self) -> str:
+        """Convert the serializer's content to a string, and clear the content (to
+        serialize in chunks).
+        """
+        result = "".join(self.content)
+        self.content.clear()
+        return result
+
     def start_block(self, text: str) -> None:
         """Start a new block.
 
@@ -466,7 +505,7 @@ class Serializer:
         self.content.append(f"{self.indent}({designator}{''.join(symbol_list)})\n")
 
     @staticmethod
-    def _float_to_str(number: float) -> str:
+    def float_to_str(number: float) -> str:
         """Convert a float to a string.
 
         Args:
@@ -488,7 +527,7 @@ class Serializer:
             designator: The designator.
             f1: The float.
         """
-        s1 = Serializer._float_to_str(f1)
+        s1 = Serializer.float_to_str(f1)
         self.content.append(f"{self.indent}({designator} {s1})\n")
 
     def add_2_floats(self, designator: str, f1: float, f2: float) -> None:
@@ -499,8 +538,8 @@ class Serializer:
             f1: The first float.
             f2: The second float.
         """
-        s1 = Serializer._float_to_str(f1)
-        s2 = Serializer._float_to_str(f2)
+        s1 = Serializer.float_to_str(f1)
+        s2 = Serializer.float_to_str(f2)
         self.content.append(f"{self.indent}({designator} {s1} {s2})\n")
 
     def add_3_floats(self, designator: str, f1: float, f2: float, f3: float) -> None:
@@ -512,9 +551,9 @@ class Serializer:
             f2: The second float.
             f3: The third float.
         """
-        s1 = Serializer._float_to_str(f1)
-        s2 = Serializer._float_to_str(f2)
-        s3 = Serializer._float_to_str(f3)
+        s1 = Serializer.float_to_str(f1)
+        s2 = Serializer.float_to_str(f2)
+        s3 = Serializer.float_to_str(f3)
         self.content.append(f"{self.indent}({designator} {s1} {s2} {s3})\n")
 
     def add_int(self, designator: str, num: int) -> None:
@@ -554,7 +593,7 @@ class Serializer:
             width: The stroke width.
             style: The stroke style.
         """
-        ser = Serializer(self.indent)
+        ser = type(self)(self.indent)
         if width is None:
             width = _DEFAULT_LAYER_WIDTH.get(layer, _DEFAULT_WIDTH)
         ser.start_block("stroke")
@@ -668,10 +707,10 @@ class Serializer:
         """
         self.start_block("fp_line")
         # self.add_2_floats("start", line.start.x, line.start.y):
-        start_x = Serializer._float_to_str(line.start.x)
-        start_y = Serializer._float_to_str(line.start.y)
-        end_x = Serializer._float_to_str(line.end.x)
-        end_y = Serializer._float_to_str(line.end.y)
+        start_x = Serializer.float_to_str(line.start.x)
+        start_y = Serializer.float_to_str(line.start.y)
+        end_x = Serializer.float_to_str(line.end.x)
+        end_y = Serializer.float_to_str(line.end.y)
         self.content.append(
             f"{self.indent}(start {start_x} {start_y})\n"
             f"{self.indent}(end {end_x} {end_y})\n"
@@ -939,10 +978,7 @@ class Serializer:
 
         self._add_zone_fill(zone.fill)
         self.start_block("polygon")
-        self.start_block("pts")
-        for point in zone.nodes.points:
-            self.add_2_floats("xy", point.x, point.y)
-        self.end_block()
+        self._add_polygon_point_list(zone.nodes.points)
         self.end_block()
         self.end_block()
 
@@ -952,15 +988,7 @@ class Serializer:
         Args:
             fab_property: The fab property.
         """
-        mapping = {
-            Pad.FabProperty.BGA: "pad_prop_bga",
-            Pad.FabProperty.FIDUCIAL_GLOBAL: "pad_prop_pad_prop_heatsink",
-            Pad.FabProperty.FIDUCIAL_LOCAL: "pad_prop_fiducial_loc",
-            Pad.FabProperty.HEATSINK: "pad_prop_heatsink",
-            Pad.FabProperty.TESTPOINT: "pad_prop_testpoint",
-            Pad.FabProperty.CASTELLATED: "pad_prop_castellated",
-        }
-        self.add_symbol("property", mapping[fab_property])
+        self.add_symbol("property", PAD_FAB_PROPERTY_SYMBOLS[fab_property])
 
     def _add_pad_thermal_bridge_angle(self, pad: Pad) -> None:
         """Serialize the pad's thermal bridge angle.
@@ -1106,7 +1134,7 @@ class Serializer:
         Args:
             pad: The pad.
         """
-        ser = Serializer(self.indent)
+        ser = type(self)(self.indent)
         shape = pad.shape
         # Round rects decay to rectangles if the radius ratio is 0
         if shape == Pad.SHAPE_ROUNDRECT:
@@ -1272,3 +1300,330 @@ class Serializer:
         """
         if tstamp.is_timestamp_valid():
             self.add_string("tstamp", str(tstamp.get_timestamp()))
+
+
+class _FloatStrings(dict[float, str]):
+    """A memo of the serialized strings of floats.
+
+    Footprints use the same few coordinates and sizes over and over, so looking the
+    strings up is much faster than formatting them every time.
+    """
+
+    MAX_SIZE = 1 << 16
+    """The number of strings after which the memo is cleared."""
+
+    def __missing__(self, number: float) -> str:
+        result = Serializer.float_to_str(number)
+        if len(self) >= self.MAX_SIZE:
+            self.clear()
+        self[number] = result
+        return result
+
+
+_FLOAT_STRINGS = _FloatStrings()
+"""The memo of the serialized strings of floats, shared by all fast serializers."""
+
+_STROKE_STRINGS: dict[tuple[str, str, float | None, LineStyle], str] = {}
+"""The serialized strokes by indentation, layer, width and style."""
+
+
+class FastSerializer(Serializer):
+    """A serializer producing the same output as `Serializer`, faster.
+
+    Floats are formatted through a memo shared by all instances, point lists are
+    joined in one go, and the common nodes (lines, arcs, circles, rectangles,
+    polygons, texts and pads) are formatted with a single template per node instead
+    of a call per property.
+    """
+
+    def add_float(self, designator: str, f1: float) -> None:
+        """Add a float to the serializer.
+
+        Args:
+            designator: The designator.
+            f1: The float.
+        """
+        self.content.append(f"{self.indent}({designator} {_FLOAT_STRINGS[f1]})\n")
+
+    def add_2_floats(self, designator: str, f1: float, f2: float) -> None:
+        """Add two floats to the serializer.
+
+        Args:
+            designator: The designator.
+            f1: The first float.
+            f2: The second float.
+        """
+        f = _FLOAT_STRINGS
+        self.content.append(f"{self.indent}({designator} {f[f1]} {f[f2]})\n")
+
+    def add_3_floats(self, designator: str, f1: float, f2: float, f3: float) -> None:
+        """Add three floats to the serializer.
+
+        Args:
+            designator: The designator.
+            f1: The first float.
+            f2: The second float.
+            f3: The third float.
+        """
+        f = _FLOAT_STRINGS
+        self.content.append(f"{self.indent}({designator} {f[f1]} {f[f2]} {f[f3]})\n")
+
+    def _add_stroke(self, node: NodeShape) -> None:
+        """Serialize a stroke.
+
+        Args:
+            node: The node whose stroke is to be serialized.
+        """
+        self.content.append(self._stroke_string(self.indent, node))
+
+    @staticmethod
+    def _stroke_string(indent: str, node: NodeShape) -> str:
+        """Return the serialized stroke of a node, at the given indentation."""
+        key = (indent, node.layer, node.width, node.style)
+        try:
+            return _STROKE_STRINGS[key]
+        except KeyError:
+            pass
+        width = node.width
+        if width is None:
+            width = _DEFAULT_LAYER_WIDTH.get(node.layer, _DEFAULT_WIDTH)
+        result = (
+            f"{indent}(stroke\n"
+            f"{indent}\t(width {_FLOAT_STRINGS[width]})\n"
+            f"{indent}\t(type {node.style.value})\n"
+            f"{indent})\n"
+        )
+        _STROKE_STRINGS[key] = result
+        return result
+
+    @staticmethod
+    def _layer_string(indent: str, node: NodeShape) -> str:
+        """Return the serialized layer of a node, at the given indentation."""
+        layer = node.layer.replace('"', '\\"')
+        return f'{indent}(layer "{layer}")\n'
+
+    def _add_line_points(self, line: Line) -> None:
+        """Serialize the end points of a line.
+
+        Args:
+            line: The line.
+        """
+        f = _FLOAT_STRINGS
+        start, end = line.start, line.end
+        self.content.append(
+            f"{self.indent}(start {f[start.x]} {f[start.y]})\n"
+            f"{self.indent}(end {f[end.x]} {f[end.y]})\n"
+        )
+
+    def _add_arc_points_back_compatible(self, arc: Arc) -> None:
+        """Serialize the points of an arc, swapping the ends of negative arcs.
+
+        Args:
+            arc: The arc.
+        """
+        start = arc.start
+        end = arc.end
+        if arc.angle < 0:
+            start, end = end, start
+        self._append_arc_points(start, arc.mid, end)
+
+    def _add_arc_points(self, arc: Arc) -> None:
+        """Serialize the points of an arc.
+
+        Args:
+            arc: The arc.
+        """
+        self._append_arc_points(arc.start, arc.mid, arc.end)
+
+    def _append_arc_points(self, start: Vector2D, mid: Vector2D, end: Vector2D) -> None:
+        f = _FLOAT_STRINGS
+        self.content.append(
+            f"{self.indent}(start {f[start.x]} {f[start.y]})\n"
+            f"{self.indent}(mid {f[mid.x]} {f[mid.y]})\n"
+            f"{self.indent}(end {f[end.x]} {f[end.y]})\n"
+        )
+
+    def _add_circle_points(self, circle: Circle) -> None:
+        """Serialize the points of a circle.
+
+        Args:
+            circle: The circle.
+        """
+        f = _FLOAT_STRINGS
+        center = circle.center
+        self.content.append(
+            f"{self.indent}(center {f[center.x]} {f[center.y]})\n"
+            f"{self.indent}(end {f[center.x + circle.radius]} {f[center.y]})\n"
+        )
+
+    def _add_polygon_point_list(self, points: list[Vector2D]) -> None:
+        """Serialize the points of a polygon.
+
+        Args:
+            points: The points.
+        """
+        f = _FLOAT_STRINGS
+        indent = self.indent
+        inner = indent + "\t"
+        self.content.append(
+            f"{indent}(pts\n"
+            + "".join([f"{inner}(xy {f[p.x]} {f[p.y]})\n" for p in points])
+            + f"{indent})\n"
+        )
+
+    def _add_shape(
+        self,
+        block: str,
+        node: NodeShape,
+        add_points: Callable[[], None],
+        fill: bool,
+    ) -> None:
+        """Serialize a graphical shape.
+
+        Args:
+            block: The designator of the shape block.
+            node: The shape.
+            add_points: Serializes the points of the shape (at the inner indentation).
+            fill: Whether the fill type of the shape is serialized.
+        """
+        indent = self.indent
+        inner = indent + "\t"
+        self.content.append(f"{indent}({block}\n")
+        self.indent = inner
+        add_points()
+        self.indent = indent
+        fill_string = ""
+        if fill:
+            fill_string = f"{inner}(fill {'yes' if node.fill else 'no'})\n"
+        self.content.append(
+            self._stroke_string(inner, node)
+            + fill_string
+            + self._layer_string(inner, node)
+            + f"{indent})\n"
+        )
+
+    def add_line(self, line: Line) -> None:
+        """Serialize a line.
+
+        Args:
+            line: The line.
+        """
+        self._add_shape("fp_line", line, lambda: self._add_line_points(line), False)
+
+    def add_arc(self, arc: Arc) -> None:
+        """Serialize an arc.
+
+        Args:
+            arc: The arc.
+        """
+        self._add_shape(
+            "fp_arc", arc, lambda: self._add_arc_points_back_compatible(arc), False
+        )
+
+    def add_circle(self, circle: Circle) -> None:
+        """Serialize a circle.
+
+        Args:
+            circle: The circle.
+        """
+        self._add_shape(
+            "fp_circle", circle, lambda: self._add_circle_points(circle), True
+        )
+
+    def add_rectangle(self, rect: Rectangle) -> None:
+        """Serialize a rectangle.
+
+        Args:
+            rect: The rectangle.
+        """
+        if not rect.angle:
+            self._add_shape("fp_rect", rect, lambda: self._add_rect_points(rect), True)
+        else:
+            # Treat as a polygon
+            self._add_shape(
+                "fp_poly", rect, lambda: self._add_polygon_point_list(rect.points), True
+            )
+
+    def add_polygon(self, polygon: Polygon) -> None:
+        """Serialize a polygon.
+
+        Args:
+            polygon: The polygon
+        """
+        points = polygon.points
+        self._add_shape(
+            "fp_poly", polygon, lambda: self._add_polygon_point_list(points), True
+        )
+
+    def _add_text_base(self, text_base: Text | Property) -> None:
+        """Serialize a text base.
+
+        Args:
+            text_base: The text base.
+        """
+        f = _FLOAT_STRINGS
+        i = self.indent
+        at = text_base.at
+        size = text_base.size
+        rotation = 0.0 if not text_base.rotation else text_base.rotation
+        layer = text_base.layer.replace('"', '\\"')
+        hide = f"{i}(hide yes)\n" if text_base.hide else ""
+        just: list[str] = []
+        if text_base.mirror:
+            just.append("mirror")
+        if text_base.justify:
+            if isinstance(text_base.justify, list):
+                just.extend(text_base.justify)
+            else:
+                just.append(text_base.justify)
+        justify = f"{i}\t(justify {' '.join(just)})\n" if just else ""
+        self.content.append(
+            f"{i}(at {f[at.x]} {f[at.y]} {f[rotation]})\n"
+            f'{i}(layer "{layer}")\n'
+            f"{hide}"
+            f"{i}(effects\n"
+            f"{i}\t(font\n"
+            f"{i}\t\t(size {f[size.x]} {f[size.y]})\n"
+            f"{i}\t\t(thickness {f[text_base.thickness]})\n"
+            f"{i}\t)\n"
+            f"{justify}"
+            f"{i})\n"
+        )
+
+    def _add_pad_string(
+        self, number: str | int, at: Vector2D, rotation: float, pad: Pad
+    ) -> None:
+        """Serialize the pad and add the string to the pad instance for future reference.
+
+        Args:
+            number: The pad number.
+            at: The pad center position.
+            rotation: The pad rotation.
+            pad: The pad.
+        """
+        f = _FLOAT_STRINGS
+        indent = self.indent
+        inner = indent + "\t"
+        if pad.shape == Pad.SHAPE_ROUNDRECT and pad.radius_ratio == 0:
+            shape = Pad.SHAPE_RECT
+        else:
+            shape = pad.shape
+        rotation %= 360
+        if rotation:
+            at_string = f"{inner}(at {f[at.x]} {f[at.y]} {f[rotation]})\n"
+        else:
+            at_string = f"{inner}(at {f[at.x]} {f[at.y]})\n"
+        if not hasattr(pad, "partial_serialization_string"):
+            self.indent = inner
+            setattr(
+                pad,
+                "partial_serialization_string",
+                self._get_pad_string_second_part(pad),
+            )
+            self.indent = indent
+        self.content.append(
+            f'{indent}(pad "{str(number)}" {pad.type} {shape}\n'
+            + at_string
+            + getattr(pad, "partial_serialization_string")
+            + f"{indent})\n"
+        )
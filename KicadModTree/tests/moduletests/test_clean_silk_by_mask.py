@@ -1,4 +1,17 @@
-from KicadModTree import *
+from KicadModTree import (
+    Arc,
+    Circle,
+    Footprint,
+    FootprintType,
+    Line,
+    Pad,
+    Property,
+    RectLine,
+    RoundRadiusHandler,
+    Text,
+    Translation,
+    Vector2D,
+)
 from KicadModTree.tests.test_utils.fp_file_test import SerialisationTest
 
 
@@ -68,3 +81,18 @@ class TestCleanSilkByMask(SerialisationTest):
         kicad_mod.clean_silk_mask_overlap(silk_pad_clearance=0.0, silk_line_width=0.12)
 
         self.assert_serialises_as(kicad_mod, 'test_clean_silk_by_mask.test_clean_over_smd_rect.kicad_mod')
+
+    def test_clean_over_nested_pad(self):
+        # Nested pads are cut out from the last mask layer only (here F.Paste, which
+        # THT pads aren't on), so the silk is only cut over the drill
+        kicad_mod = Footprint("test", FootprintType.THT)
+        translation = Translation(Vector2D(0, 0))
+        translation.append(Pad(at=[0, 0], shape=Pad.SHAPE_CIRCLE, type=Pad.TYPE_THT,
+                               drill=1.0, size=[1.7, 1.7], layers=Pad.LAYERS_THT))
+        kicad_mod.append(translation)
+        kicad_mod.append(Line(start=[-3, 0], end=[3, 0], layer="F.SilkS", width=0.12))
+
+        kicad_mod.clean_silk_mask_overlap(silk_pad_clearance=0.1, silk_line_width=0.12)
+
+        lines = sorted((line.start.x, line.end.x) for line in kicad_mod if isinstance(line, Line))
+        assert lines == [(-3.0, -0.66), (0.66, 3.0)]
@@ -0,0 +1,126 @@
+from pathlib import Path
+
+import pytest
+
+from KicadModTree import (
+    Footprint,
+    FootprintType,
+    KicadFileHandler,
+    KicadFileReader,
+    Line,
+    Pad,
+    RoundRadiusHandler,
+    Vector2D,
+)
+from KicadModTree.KicadFileReader import parse_sexpr
+
+RESULTS_DIR = Path(__file__).parent / "results"
+
+
+def assert_sexpr_equal(a, b, tol=1.5e-6):
+    """Compare two s-expressions, with a tolerance on the numbers.
+
+    Arcs are written with their start, mid and end points, and the mid point is
+    computed again from the rounded start and end points when reading them back.
+    """
+    if isinstance(a, list):
+        assert isinstance(b, list) and len(a) == len(b), (a, b)
+        for x, y in zip(a, b):
+            assert_sexpr_equal(x, y, tol)
+        return
+    try:
+        assert float(a) == pytest.approx(float(b), abs=tol), (a, b)
+    except ValueError:
+        assert a == b
+
+
+def test_parse_sexpr():
+    expr = parse_sexpr('(footprint "A \\"B\\"" (at 1 -2.5)\n (tags "") yes)')
+    assert expr == ["footprint", '"A "B"', ["at", "1", "-2.5"], ["tags", '"'], "yes"]
+
+    for content in ["(a (b)", "(a))", "a"]:
+        with pytest.raises(ValueError):
+            parse_sexpr(content)
+
+
+@pytest.mark.parametrize(
+    "content, offset",
+    [('(a "b c)', 2), ('(a b) "c', 5), ('(a\n b "c\\")', 5)],
+)
+def test_parse_malformed_sexpr(content, offset):
+    # The content that isn't a token is not skipped
+    for data in [content, content.encode()]:
+        with pytest.raises(ValueError, match=f"after offset {offset}$"):
+            parse_sexpr(data)
+
+
+@pytest.mark.parametrize(
+    "path", sorted(RESULTS_DIR.glob("*.kicad_mod")), ids=lambda p: p.stem
+)
+def test_round_trip(path):
+    content = path.read_text()
+    fp = KicadFileReader(content).read()
+    assert_sexpr_equal(
+        parse_sexpr(KicadFileHandler(fp).serialize()), parse_sexpr(content)
+    )
+
+
+def test_read_footprint():
+    fp = Footprint("FP_1", FootprintType.SMD)
+    fp.description = "A description"
+    fp.tags = ["tag1", "tag2"]
+    fp.append(Line(start=[0, 0], end=[1, 1], layer="F.SilkS", width=0.12))
+    fp.append(
+        Pad(
+            number=1,
+            type=Pad.TYPE_SMT,
+            shape=Pad.SHAPE_ROUNDRECT,
+            at=[1, 2],
+            size=[1, 0.5],
+            layers=Pad.LAYERS_SMT,
+            round_radius_handler=RoundRadiusHandler(radius_ratio=0.25),
+        )
+    )
+
+    read_fp = KicadFileReader(KicadFileHandler(fp).serialize()).read()
+
+    assert read_fp.name == "FP_1"
+    assert read_fp.footprintType == FootprintType.SMD
+    assert read_fp.description == "A description"
+    assert read_fp.tags == ["tag1", "tag2"]
+    line = next(n for n in read_fp if isinstance(n, Line))
+    assert (line.start, line.end, line.layer) == (
+        Vector2D(0, 0),
+        Vector2D(1, 1),
+        "F.SilkS",
+    )
+    pad = next(n for n in read_fp if isinstance(n, Pad))
+    assert (pad.number, pad.at, pad.size) == ("1", Vector2D(1, 2), Vector2D(1, 0.5))
+
+
+def test_unsupported_elements():
+    content = '(footprint "FP_1" (layer "F.Cu") (group "" (members)) (fp_line (start 0 0) (end 1 1) (layer "F.SilkS")))'
+
+    with pytest.raises(ValueError):
+        KicadFileReader(content).read()
+
+    reader = KicadFileReader(content, strict=False)
+    fp = reader.read()
+    assert len([n for n in fp if isinstance(n, Line)]) == 1
+    assert [e[0] for e in reader.skipped_elements] == ["group"]
+
+
+@pytest.mark.parametrize("jobs, use_mmap", [(1, False), (2, True)])
+def test_read_library(tmp_path, jobs, use_mmap):
+    files = sorted(RESULTS_DIR.glob("*.kicad_mod"))[:4]
+    for path in files:
+        (tmp_path / path.name).write_text(path.read_text())
+
+    footprints = KicadFileReader.read_library(tmp_path, jobs=jobs, use_mmap=use_mmap)
+
+    assert list(footprints) == [path.stem for path in files]
+    for path in files:
+        expected = KicadFileReader.read_file(path)
+        assert KicadFileHandler(footprints[path.stem]).serialize() == (
+            KicadFileHandler(expected).serialize()
+        )
@@ -0,0 +1,116 @@
+import io
+import shutil
+import tarfile
+import zipfile
+
+import pytest
+
+from KicadModTree import (
+    Footprint,
+    FootprintArchive,
+    FootprintType,
+    FootprintWriter,
+    KicadArchiveLibrary,
+    KicadFileHandler,
+    KicadMemoryLibrary,
+    KicadPrettyLibrary,
+    Line,
+)
+
+
+def make_footprint(name):
+    fp = Footprint(name, FootprintType.SMD)
+    fp.append(Line(start=[0, 0], end=[1, 1], layer="F.SilkS"))
+    return fp
+
+
+def test_write_to_stream(tmp_path):
+    fp = make_footprint("FP_1")
+    # Enough nodes to be written in several chunks
+    for i in range(1000):
+        fp.append(Line(start=[0, i], end=[1, i], layer="F.Fab"))
+    expected = KicadFileHandler(fp).serialize()
+
+    text = io.StringIO()
+    KicadFileHandler(fp).write_to_stream(text)
+    assert text.getvalue() == expected
+
+    binary = io.BytesIO()
+    KicadFileHandler(fp).write_to_stream(binary)
+    assert binary.getvalue() == expected.encode("utf-8")
+
+    KicadFileHandler(fp).writeFile(tmp_path / "FP_1.kicad_mod")
+    assert (tmp_path / "FP_1.kicad_mod").read_text(encoding="utf-8") == expected
+
+
+def test_memory_library():
+    files = {}
+    KicadMemoryLibrary("Lib_A", files).save(make_footprint("FP_1"))
+    KicadMemoryLibrary("Lib_B.pretty", files).save(make_footprint("FP_2"))
+
+    assert sorted(files) == ["Lib_A.pretty/FP_1.kicad_mod", "Lib_B.pretty/FP_2.kicad_mod"]
+    assert files["Lib_A.pretty/FP_1.kicad_mod"] == KicadFileHandler(make_footprint("FP_1")).serialize()
+
+
+@pytest.mark.parametrize("archive_format", ["zip", "tar"])
+def test_archive_library(tmp_path, archive_format):
+    archive = FootprintArchive(tmp_path / f"fps.{archive_format}", archive_format)
+    KicadArchiveLibrary("Lib_A", archive).save(make_footprint("FP_1"))
+    KicadArchiveLibrary("Lib_B", archive).save(make_footprint("FP_2"))
+    archive.close()
+
+    expected = KicadFileHandler(make_footprint("FP_1")).serialize().encode("utf-8")
+
+    if archive_format == "zip":
+        with zipfile.ZipFile(archive.path) as zf:
+            assert zf.namelist() == ["Lib_A.pretty/FP_1.kicad_mod", "Lib_B.pretty/FP_2.kicad_mod"]
+            assert zf.read("Lib_A.pretty/FP_1.kicad_mod") == expected
+    else:
+        with tarfile.open(archive.path) as tf:
+            assert tf.getnames() == ["Lib_A.pretty/FP_1.kicad_mod", "Lib_B.pretty/FP_2.kicad_mod"]
+            assert tf.extractfile("Lib_A.pretty/FP_1.kicad_mod").read() == expected
+
+
+def test_archive_per_process(tmp_path):
+    archive = FootprintArchive.for_process(tmp_path, "zip")
+    try:
+        assert FootprintArchive.for_process(tmp_path, "zip") is archive
+    finally:
+        FootprintArchive.close_all()
+
+    assert zipfile.is_zipfile(archive.path)
+
+
+def test_background_writer(tmp_path):
+    writer = FootprintWriter(max_pending=2)
+    lib = KicadPrettyLibrary("Lib_A", output_dir=tmp_path, writer=writer)
+
+    for i in range(10):
+        lib.save(make_footprint(f"FP_{i}"))
+    writer.flush()
+
+    assert len(list(lib.path.glob("*.kicad_mod"))) == 10
+    expected = KicadFileHandler(make_footprint("FP_3")).serialize()
+    assert (lib.path / "FP_3.kicad_mod").read_text() == expected
+
+
+def test_background_writer_errors(tmp_path):
+    writer = FootprintWriter()
+    writer.write(tmp_path / "missing_dir" / "FP.kicad_mod", b"data")
+
+    with pytest.raises(FileNotFoundError):
+        writer.flush()
+
+    # Reported once
+    writer.flush()
+
+
+def test_library_dir_created_again(tmp_path):
+    lib = KicadPrettyLibrary("Lib_A", output_dir=tmp_path)
+    lib.save(make_footprint("FP_1"))
+    shutil.rmtree(lib.path)
+
+    # e.g. a later run in the same (long-lived) worker process
+    lib = KicadPrettyLibrary("Lib_A", output_dir=tmp_path)
+    lib.save(make_footprint("FP_1"))
+    assert (lib.path / "FP_1.kicad_mod").exists()
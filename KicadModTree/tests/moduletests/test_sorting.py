@@ -1,5 +1,7 @@
 from copy import deepcopy
 
+import pytest
+
 from KicadModTree import (
     Circle,
     Footprint,
@@ -9,6 +11,7 @@ from KicadModTree import (
     RectLine,
     Translation,
 )
+from KicadModTree.serializer import SerializerPriority
 from KicadModTree.tests.test_utils.fp_file_test import SerialisationTest
 from kilibs.geom import Vector2D
 
@@ -100,3 +103,20 @@ class TestSmallValueSerialisation(SerialisationTest):
         kicad_mod.append(Pad(number="2", **DEFAULT_PAD_KWARGS))
 
         self.assert_serialises_as(kicad_mod, "test_sort_pad_numbers.kicad_mod")
+
+
+def test_layer_priorities():
+    layers = ["User.2", "F.Fab", "In2.Cu", "B.Cu", "In40.Cu", "*.Cu", "In1.Cu", "F.Cu"]
+
+    assert SerializerPriority.sort_layers(layers) == [
+        "*.Cu",
+        "F.Cu",
+        "B.Cu",
+        "In1.Cu",
+        "In2.Cu",
+        "F.Fab",
+        "User.2",
+        "In40.Cu",
+    ]
+    with pytest.raises(ValueError):
+        SerializerPriority.get_layer_priority("Unknown.Layer")
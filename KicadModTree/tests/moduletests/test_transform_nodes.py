@@ -0,0 +1,58 @@
+import pytest
+
+from KicadModTree import Line, Pad, Rotation, Translation
+from kilibs.geom import Vector2D
+
+
+def make_nested_transforms():
+    line = Line(start=(0, 0), end=(1, 0), layer="F.SilkS")
+    pad = Pad(
+        number=1,
+        type=Pad.TYPE_SMT,
+        shape=Pad.SHAPE_RECT,
+        at=(1, 1),
+        size=(1, 0.5),
+        layers=Pad.LAYERS_SMT,
+    )
+    outer = Translation(10, 0)
+    rotation = Rotation(90, origin=Vector2D(1, 0))
+    inner = Translation(0, 2)
+    inner.append(line)
+    rotation.extend([inner, pad])
+    outer.append(rotation)
+    return outer, line, pad
+
+
+def test_nested_transforms():
+    outer, line, pad = make_nested_transforms()
+
+    flattened = outer.get_flattened_nodes()
+
+    # Each node is transformed by every level, innermost first
+    expected_line = line.translated(Vector2D(0, 2))
+    expected_line = expected_line.rotated(90, origin=Vector2D(1, 0))
+    expected_line = expected_line.translated(Vector2D(10, 0))
+    expected_pad = pad.rotated(90, origin=Vector2D(1, 0)).translated(Vector2D(10, 0))
+    assert [type(n) for n in flattened] == [Line, Pad]
+    assert (flattened[0].start, flattened[0].end) == (
+        expected_line.start,
+        expected_line.end,
+    )
+    assert flattened[1].at == expected_pad.at
+    assert flattened[1].rotation == expected_pad.rotation
+
+    # The nodes in the tree are not changed
+    assert (line.start, line.end) == (Vector2D(0, 0), Vector2D(1, 0))
+    assert pad.at == Vector2D(1, 1)
+
+
+def test_nested_transforms_bbox():
+    outer, _, _ = make_nested_transforms()
+
+    # The line goes from (9, -1) to (9, 0), the pad is rotated to a 0.5 x 1 pad at
+    # (10, 0)
+    bbox = outer.bbox()
+    assert bbox.left == pytest.approx(9)
+    assert bbox.top == pytest.approx(-1)
+    assert bbox.right == pytest.approx(10.25)
+    assert bbox.bottom == pytest.approx(0.5)
@@ -302,6 +302,35 @@ def testRemoveTraversed():
     assert len(gen1b.get_child_nodes()) == 0
 
 
+def testRemoveMany():
+    parent = Node()
+    gen1a = Node()
+    gen1b = Node()
+    gen1a1 = Node()
+    gen1a2 = Node()
+    gen1a2a = Node()
+
+    gen1a2.append(gen1a2a)
+    gen1a.extend([gen1a1, gen1a2])
+    parent.extend([gen1a, gen1b])
+
+    # Nodes which aren't in the tree are ignored
+    parent.remove_many([gen1a1, gen1a2a, gen1b, Node()])
+    assert parent.get_child_nodes() == [gen1a]
+    assert gen1a.get_child_nodes() == [gen1a2]
+    assert gen1a2.get_child_nodes() == []
+    for node in [gen1a1, gen1a2a, gen1b]:
+        assert node._parent is None
+    assert gen1a._parent is parent
+
+    # The removed nodes can be added again
+    gen1a.append(gen1a1)
+    assert gen1a.get_child_nodes() == [gen1a2, gen1a1]
+
+    parent.remove_many([])
+    assert parent.get_child_nodes() == [gen1a]
+
+
 def testIter():
     node = HelperNodeWithVirtualChildren(
         normal_children=[Node() for _ in range(3)],
@@ -319,3 +348,137 @@ def testIter():
         count += 1
     assert count == len(node.get_child_nodes())
     assert count == len(node)
+
+
+def testFingerprint():
+    from hashlib import sha256
+
+    from KicadModTree import Footprint, FootprintType, KicadFileHandler, Line, Translation
+
+    def make_footprint(offset):
+        fp = Footprint("test", FootprintType.SMD)
+        translation = Translation(offset, 0)
+        translation.append(Line(start=[0, 0], end=[1, 1], layer="F.SilkS"))
+        fp.append(translation)
+        # Enough nodes to be serialized in several chunks
+        for i in range(500):
+            fp.append(Line(start=[0, i], end=[1, i], layer="F.Fab"))
+        return fp, translation
+
+    fp, translation = make_footprint(1)
+    content = KicadFileHandler(fp).serialize()
+    assert fp.fingerprint() == sha256(content.encode("utf-8")).hexdigest()
+    assert fp.fingerprint() == make_footprint(1)[0].fingerprint()
+    assert fp.fingerprint() != make_footprint(2)[0].fingerprint()
+
+    # The fingerprint of a node is the one of its (transformed) content
+    line = Line(start=[1, 0], end=[2, 1], layer="F.SilkS")
+    assert translation.fingerprint() == line.fingerprint()
+    assert line.fingerprint() != Line(start=[1, 0], end=[2, 2], layer="F.SilkS").fingerprint()
+
+
+def testLazyTimestamp():
+    import uuid
+
+    node = Node()
+    assert not node.has_valid_timestamp()
+    assert node.get_timestamp() is None
+    # Nodes without timestamps don't create them
+    assert node._tstamp is None
+
+    seed = uuid.uuid4()
+    parent = Node()
+    parent.get_timestamp_class().set_timestamp_seed(seed)
+    parent.append(node)
+    assert node.get_timestamp_class().get_timestamp_seed() == seed
+    assert node.has_valid_timestamp()
+
+
+def testMemoizedHash():
+    from KicadModTree import Line, Pad, Vector2D
+
+    def make_pad():
+        return Pad(
+            number=1,
+            type=Pad.TYPE_SMT,
+            shape=Pad.SHAPE_RECT,
+            at=[1, 2],
+            size=[1, 1],
+            layers=Pad.LAYERS_SMT,
+        )
+
+    pad = make_pad()
+    h = hash(pad)
+    assert hash(pad) == h == hash(make_pad())
+
+    # Changes in place
+    pad.translate(Vector2D(1, 0))
+    assert hash(pad) != h
+    pad.translate(Vector2D(-1, 0))
+    assert hash(pad) == h
+    pad.rotate(90, origin=Vector2D(0, 0))
+    assert hash(pad) != h
+
+    # Assignments
+    pad = make_pad()
+    assert hash(pad) == h
+    pad.number = 2
+    assert hash(pad) != h
+    pad.number = 1
+    assert hash(pad) == h
+
+    # Copies are hashed on their own
+    copied = pad.copy()
+    copied.at = copied.at + Vector2D(1, 0)
+    assert hash(copied) != h
+    assert hash(pad) == h
+
+    # Nodes in the attributes
+    node = HelperTestChildNode()
+    node.line = Line(start=[0, 0], end=[1, 1], layer="F.SilkS")
+    h = hash(node)
+    node.line.translate(Vector2D(1, 0))
+    assert hash(node) != h
+
+    # The child nodes are not hashed
+    h = hash(node)
+    node.append(HelperTestChildNode())
+    assert hash(node) == h
+
+
+def testMemoizedHashInPlaceChanges():
+    from hashlib import sha1
+
+    from KicadModTree import Line, Pad, Vector2D
+
+    def memoized_hash(node):
+        return node._deterministic_hash().hexdigest()
+
+    def unmemoized_hash(node):
+        return sha1(repr(node.hashdict()).encode("utf-8")).hexdigest()
+
+    # Vectors changed in place
+    line = Line(start=[0, 0], end=[1, 1], layer="F.SilkS")
+    h = hash(line)
+    line.start += Vector2D(1, 0)
+    assert hash(line) != h
+    assert memoized_hash(line) == unmemoized_hash(line)
+    line.end.x = 0.0
+    assert memoized_hash(line) == unmemoized_hash(line)
+    line.end.x = -0.0
+    assert memoized_hash(line) == unmemoized_hash(line)
+
+    # Lists changed in place
+    pad = Pad(
+        number=1,
+        type=Pad.TYPE_SMT,
+        shape=Pad.SHAPE_RECT,
+        at=[1, 2],
+        size=[1, 1],
+        layers=["F.Cu"],
+    )
+    memoized_hash(pad)
+    pad.layers.append("B.Cu")
+    assert memoized_hash(pad) == unmemoized_hash(pad)
+    pad.at.y = 3
+    assert memoized_hash(pad) == unmemoized_hash(pad)
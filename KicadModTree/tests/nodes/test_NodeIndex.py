@@ -0,0 +1,158 @@
+import copy
+
+from KicadModTree import (
+    ChamferedPadGrid,
+    ExposedPad,
+    Footprint,
+    FootprintType,
+    Line,
+    Pad,
+    PadArray,
+    PolygonLine,
+    Property,
+    Translation,
+    Vector2D,
+)
+from KicadModTree.util.corner_handling import RoundRadiusHandler
+
+
+def make_pad(number, x=0):
+    return Pad(
+        number=number,
+        type=Pad.TYPE_SMT,
+        shape=Pad.SHAPE_RECT,
+        at=[x, 0],
+        size=[1, 1],
+        layers=Pad.LAYERS_SMT,
+    )
+
+
+def test_index_updates():
+    fp = Footprint("test", FootprintType.SMD)
+    silk = Line(start=[0, 0], end=[1, 0], layer="F.SilkS")
+    fab = Line(start=[0, 1], end=[1, 1], layer="F.Fab")
+    pad1 = make_pad(1)
+    translation = Translation(1, 0)
+    fp.extend([silk, translation])
+    # Nodes added below a node which is already in the footprint
+    translation.extend([fab, pad1])
+    pads = PadArray(
+        pincount=3,
+        initial=2,
+        spacing=[1, 0],
+        center=[0, 2],
+        size=1,
+        layers=["F.Cu"],
+        type=Pad.TYPE_SMT,
+        shape=Pad.SHAPE_RECT,
+    )
+    fp.append(pads)
+
+    index = fp.index
+    assert index.get_nodes(Line) == [silk, fab]
+    assert index.get_nodes_on_layer("F.SilkS") == [silk]
+    assert index.get_nodes_on_layer("F.Cu") == [pad1] + pads.get_pads()
+    assert index.get_pads() == [pad1] + pads.get_pads()
+    assert index.get_pads(3) == [pads.get_pad_with_name(3)]
+    assert index.get_pads("1") == [pad1]
+    assert translation in index and fp not in index
+
+    # The nodes below a removed node are removed too
+    fp.remove(translation)
+    assert fab not in index
+    assert index.get_pads(1) == []
+    assert index.get_nodes(Line) == [silk]
+
+    fp.remove_many([silk])
+    assert index.get_nodes_on_layer("F.SilkS") == []
+
+    # Changed nodes are indexed again with `rebuild()`
+    pads.get_pads()[0].number = 10
+    assert index.get_pads(10) == []
+    index.rebuild()
+    assert index.get_pads(10) == [pads.get_pads()[0]]
+
+
+def test_index_shapes():
+    fp = Footprint("test", FootprintType.SMD)
+    polygon = PolygonLine(shape=[[0, 0], [1, 0], [1, 1]], layer="F.SilkS")
+    fp.append(polygon)
+    fp.append(Property(name=Property.VALUE, text="test", at=[0, 2], layer="F.Fab"))
+
+    # The lines of the polygon are created again when it is moved, they are not
+    # indexed
+    assert fp.index.get_nodes_on_layer("F.SilkS") == [polygon]
+    assert fp.index.get_nodes(Line) == []
+    assert [type(n) for n in fp.index.get_nodes_on_layer("F.Fab")] == [Property]
+
+
+def test_index_generated_children():
+    fp = Footprint("test", FootprintType.SMD)
+    num_nodes = len(fp.index)
+    pad1 = make_pad(1)
+    # The pads of the grid are generated again by each `get_child_nodes()` call
+    grid = ChamferedPadGrid(
+        number=2,
+        type=Pad.TYPE_SMT,
+        center=Vector2D(0, 0),
+        size=Vector2D(1, 1),
+        layers=Pad.LAYERS_SMT,
+        chamfer_size=Vector2D(0.25, 0.25),
+        chamfer_selection=1,
+        pincount=[3, 4],
+        grid=Vector2D(1.5, 1.5),
+        round_radius_handler=RoundRadiusHandler(radius_ratio=0),
+    )
+    fp.append(grid)
+    fp.append(pad1)
+    assert len(fp.index.get_pads(2)) == 12
+    # The generated pads are ordered after their generating node
+    assert fp.index.get_pads()[-1] is pad1
+
+    # The pads which were indexed are removed, not the ones generated now
+    fp.remove(grid)
+    assert fp.index.get_pads() == [pad1]
+    assert len(fp.index) == num_nodes + 1
+
+    # The pads of an exposed pad are created lazily, and not by the index
+    epad = ExposedPad(
+        number=3,
+        at=Vector2D(0, 1),
+        size=Vector2D(2.1, 3),
+        mask_size=Vector2D(2.1, 2.1),
+        paste_layout=[2, 3],
+        round_radius_handler=RoundRadiusHandler(radius_ratio=0.25),
+        paste_radius_handler=RoundRadiusHandler(radius_ratio=0.25),
+    )
+    fp.append(epad)
+    assert epad.get_pads() == []
+    assert fp.index.get_pads(3) == [p for p in epad.get_pads() if p.number == 3]
+    assert len(fp.index.get_pads(3)) == 1
+    fp.remove(epad)
+    assert fp.index.get_pads() == [pad1]
+
+
+def test_index_copies():
+    fp = Footprint("test", FootprintType.SMD)
+    translation = Translation(1, 0)
+    translation.append(make_pad(1))
+    fp.extend([make_pad(2), translation])
+    fp.index.get_pads()
+
+    # Each copy has its own index, of its own nodes
+    fp_copy = copy.deepcopy(fp)
+    assert fp_copy.index is not fp.index
+    assert [p.number for p in fp_copy.index.get_pads()] == [2, 1]
+    assert all(
+        p in fp_copy.index and p not in fp.index for p in fp_copy.index.get_pads()
+    )
+    fp_copy.append(make_pad(3))
+    assert len(fp_copy.index.get_pads()) == 3
+    assert len(fp.index.get_pads()) == 2
+
+    shallow_copy = fp.copy()
+    assert shallow_copy.index is not fp.index
+    assert shallow_copy.index.get_pads() == fp.index.get_pads()
+
+    # The index is not part of the hash
+    assert "_node_index" not in fp.hashdict()
@@ -5,6 +5,7 @@ from pathlib import Path
 import pytest
 
 from KicadModTree.KicadFileHandler import KicadFileHandler
+from KicadModTree.serializer import FastSerializer, Serializer
 
 
 # When updating formats in a train of commits, this decorator can be used to mark all
@@ -15,10 +16,12 @@ class SerialisationTest:
 
     RESULTS_DIR_NAME = "results"  # Default directory, can be overridden by subclasses
 
-    @pytest.fixture(autouse=True)
+    # Every serializer engine must produce the golden files
+    @pytest.fixture(autouse=True, params=[FastSerializer, Serializer], ids=["fast", "reference"])
     def setup_fixtures(self, request):
         """Automatically injects `assert_serialises_as` into the class."""
 
+        request.cls.serializer_class = request.param
         request.cls.results_dir = os.path.join(os.path.dirname(request.fspath), self.RESULTS_DIR_NAME)
         request.cls.assert_serialises_as = self._assert_serialises_as
 
@@ -32,7 +35,7 @@ class SerialisationTest:
         :param kicad_mod: The kicad_mod to serialise
         :param expected: The expected serialised value
         """
-        file_handler = KicadFileHandler(kicad_mod)
+        file_handler = KicadFileHandler(kicad_mod, serializer_class=self.serializer_class)
 
         rendered = file_handler.serialize()
 
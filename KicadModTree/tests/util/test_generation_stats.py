@@ -0,0 +1,71 @@
+from KicadModTree import Footprint, FootprintType, KicadPrettyLibrary, Line, Node
+from KicadModTree.util import generation_stats
+
+
+def test_footprint_records(tmp_path, monkeypatch):
+    stats_file = tmp_path / "stats.jsonl"
+    monkeypatch.setenv(generation_stats.STATS_FILE_ENV_VAR, str(stats_file))
+
+    fp = Footprint("Test_FP", FootprintType.SMD)
+    fp.append(Line(start=[0, 0], end=[1, 1], layer="F.SilkS"))
+
+    try:
+        KicadPrettyLibrary("Test_Lib", output_dir=tmp_path).save(fp)
+        generation_stats.record("series", pkg_id="test")
+    finally:
+        generation_stats.close()
+
+    records = generation_stats.read_records(stats_file)
+
+    assert [r["type"] for r in records] == ["footprint", "series"]
+
+    fp_record = records[0]
+    assert fp_record["name"] == "Test_FP"
+    assert fp_record["library"] == "Test_Lib"
+    assert fp_record["nodes"] == generation_stats.count_nodes(fp)
+    assert fp_record["bytes"] == (tmp_path / "Test_Lib.pretty" / "Test_FP.kicad_mod").stat().st_size
+
+
+def test_disabled(tmp_path, monkeypatch):
+    monkeypatch.delenv(generation_stats.STATS_FILE_ENV_VAR, raising=False)
+
+    assert not generation_stats.enabled()
+    # No file to write to, so this does nothing
+    generation_stats.record("series", pkg_id="test")
+
+
+def test_count_nodes():
+    root = Node()
+    child = Node()
+    root.append(child)
+    child.append(Node())
+    root.append(Node())
+
+    assert generation_stats.count_nodes(root) == 4
+
+
+def test_write_if_changed(tmp_path, monkeypatch):
+    stats_file = tmp_path / "stats.jsonl"
+    monkeypatch.setenv(generation_stats.STATS_FILE_ENV_VAR, str(stats_file))
+
+    fp = Footprint("Test_FP", FootprintType.SMD)
+    fp.append(Line(start=[0, 0], end=[1, 1], layer="F.SilkS"))
+    lib = KicadPrettyLibrary("Test_Lib", output_dir=tmp_path, write_if_changed=True)
+    fp_file = lib.path / "Test_FP.kicad_mod"
+
+    try:
+        lib.save(fp)
+        mtime = fp_file.stat().st_mtime_ns
+        content = fp_file.read_bytes()
+
+        lib.save(fp)
+        assert fp_file.stat().st_mtime_ns == mtime
+
+        fp.append(Line(start=[0, 0], end=[2, 2], layer="F.SilkS"))
+        lib.save(fp)
+        assert fp_file.read_bytes() != content
+    finally:
+        generation_stats.close()
+
+    statuses = [r["status"] for r in generation_stats.read_records(stats_file)]
+    assert statuses == ["new", "unchanged", "written"]
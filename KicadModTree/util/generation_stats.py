@@ -0,0 +1,255 @@
+# kilibs is free software: you can redistribute it and/or modify it under the terms of
+# the GNU General Public License as published by the Free Software Foundation, either
+# version 3 of the License, or (at your option) any later version.
+#
+# kilibs is distributed in the hope that it will be useful, but WITHOUT ANY WARRANTY;
+# without even the implied warranty of MERCHANTABILITY or FITNESS FOR A PARTICULAR
+# PURPOSE. See the GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License along with kilibs.
+# If not, see < http://www.gnu.org/licenses/ >.
+#
+# (C) The KiCad Librarian Team
+
+"""Machine-readable generation statistics.
+
+If the `KICAD_FP_GENERATOR_STATS_FILE` environment variable is set, records of what
+was generated are appended to that file as JSON lines. This works across process
+boundaries (e.g. for generators run from `generate.sh` scripts), as every process
+appends its own lines.
+
+Each record has a ``type``:
+
+* ``footprint``: a footprint was saved (name, library, serialization time, bytes,
+  number of nodes in the tree, and whether the file was new, written or unchanged).
+* ``series``: a parameter set (e.g. an entry in a YAML file) was generated.
+* ``process``: the CPU time and peak RSS of a process (or of a job run in-process),
+  recorded when the process exits.
+"""
+
+from __future__ import annotations
+
+import atexit
+import json
+import os
+import sys
+import threading
+from typing import IO, Any, NotRequired, TypedDict, cast
+
+try:
+    import resource
+except ImportError:  # not available on Windows
+    resource = None  # type: ignore[assignment]
+
+from KicadModTree.nodes.Node import Node
+
+STATS_FILE_ENV_VAR: str = "KICAD_FP_GENERATOR_STATS_FILE"
+"""The environment variable with the path of the statistics file."""
+
+_stream: IO[str] | None = None
+"""The open statistics file of this process."""
+_stream_path: str | None = None
+"""The path of the open statistics file."""
+_lock = threading.Lock()
+"""Serializes the records of the threads of this process (e.g. footprint writers)."""
+
+
+class StatsRecord(TypedDict):
+    """A record of the statistics file (the keys present depend on the type)."""
+
+    type: str
+    """The type of the record ("footprint", "series" or "process")."""
+    pid: int
+    """The ID of the process which wrote the record."""
+    name: NotRequired[str]
+    """The name of the footprint."""
+    library: NotRequired[str]
+    """The name of the library of the footprint."""
+    serialize_time: NotRequired[float]
+    """The time in seconds it took to serialize the footprint."""
+    bytes: NotRequired[int]
+    """The size of the footprint file in bytes."""
+    nodes: NotRequired[int]
+    """The number of nodes in the footprint tree."""
+    status: NotRequired[str | None]
+    """What happened to the footprint file ("new", "written" or "unchanged")."""
+    pkg_id: NotRequired[str]
+    """The ID of the parameter set of the series."""
+    file: NotRequired[str]
+    """The parameter file of the series."""
+    cpu_time: NotRequired[float]
+    """The CPU time of the process in seconds."""
+    peak_rss: NotRequired[int]
+    """The peak resident set size of the process in bytes."""
+
+
+def stats_file() -> str | None:
+    """Return the path of the statistics file, or `None` if statistics are not
+    being recorded."""
+    return os.environ.get(STATS_FILE_ENV_VAR) or None
+
+
+def enabled() -> bool:
+    """Return `True` if statistics are being recorded."""
+    return stats_file() is not None
+
+
+def _get_stream() -> IO[str] | None:
+    global _stream, _stream_path
+
+    path = stats_file()
+
+    # The path can change within a process (e.g. a worker running many jobs)
+    if path != _stream_path:
+        close()
+
+        if path is not None:
+            _stream = open(path, "a", encoding="utf-8")
+            _stream_path = path
+
+            # Record the usage of processes that run the generators directly
+            if not _atexit_registered:
+                _register_atexit()
+
+    return _stream
+
+
+def close() -> None:
+    """Close the statistics file (it is reopened if more records are written)."""
+    global _stream, _stream_path
+
+    if _stream is not None:
+        _stream.close()
+
+    _stream = None
+    _stream_path = None
+
+
+def record(record_type: str, **data: Any) -> None:
+    """Append a record to the statistics file (if statistics are being recorded).
+
+    Args:
+        record_type: The type of the record (e.g. "footprint").
+        **data: The data of the record.
+    """
+    with _lock:
+        stream = _get_stream()
+
+        if stream is None:
+            return
+
+        # One write per line, so that lines of different processes don't interleave
+        stream.write(
+            json.dumps({"type": record_type, "pid": os.getpid(), **data}) + "\n"
+        )
+        stream.flush()
+
+
+def count_nodes(node: Node) -> int:
+    """Return the number of nodes in a tree (including the root node).
+
+    Args:
+        node: The root node of the tree.
+    """
+    count = 0
+    todo = [node]
+    while todo:
+        n = todo.pop()
+        count += 1
+        todo.extend(n.get_child_nodes())
+    return count
+
+
+def record_footprint(
+    name: str,
+    library: str,
+    serialize_time: float,
+    num_bytes: int,
+    num_nodes: int,
+    status: str | None = None,
+) -> None:
+    """Record that a footprint was saved.
+
+    Args:
+        name: The name of the footprint.
+        library: The name of the library.
+        serialize_time: The time in seconds it took to serialize the footprint.
+        num_bytes: The size of the footprint file in bytes.
+        num_nodes: The number of nodes in the footprint tree.
+        status: What happened to the file ("new", "written" or "unchanged"), if known.
+    """
+    record(
+        "footprint",
+        name=name,
+        library=library,
+        serialize_time=serialize_time,
+        bytes=num_bytes,
+        nodes=num_nodes,
+        status=status,
+    )
+
+
+def resource_usage() -> tuple[float, int] | None:
+    """Return the CPU time (in seconds) and the peak RSS (in bytes) of this process,
+    or `None` if this is not available on the platform."""
+    if resource is None:
+        return None
+
+    usage = resource.getrusage(resource.RUSAGE_SELF)
+
+    # ru_maxrss is in bytes on macOS, but in kilobytes elsewhere
+    rss_unit = 1 if sys.platform == "darwin" else 1024
+
+    return usage.ru_utime + usage.ru_stime, usage.ru_maxrss * rss_unit
+
+
+def record_process(cpu_time: float, peak_rss: int) -> None:
+    """Record the resource usage of a process (or a job in a process).
+
+    Args:
+        cpu_time: The CPU time in seconds.
+        peak_rss: The peak resident set size in bytes.
+    """
+    record("process", cpu_time=cpu_time, peak_rss=peak_rss)
+
+
+_atexit_registered: bool = False
+
+
+def _register_atexit() -> None:
+    global _atexit_registered
+    _atexit_registered = True
+
+    def _record_at_exit() -> None:
+        # Only if the file is still open: the generator runner closes it after each
+        # job that it runs in-process, and records the usage of the job itself.
+        if _stream is None:
+            return
+
+        usage = resource_usage()
+        if usage is not None:
+            record_process(*usage)
+        close()
+
+    atexit.register(_record_at_exit)
+
+
+def read_records(path: str | os.PathLike[str]) -> list[StatsRecord]:
+    """Read the records of a statistics file.
+
+    Lines that can't be parsed (e.g. from a process that died mid-write) are
+    skipped.
+
+    Args:
+        path: The path of the statistics file.
+    """
+    records: list[StatsRecord] = []
+
+    with open(path, "r", encoding="utf-8") as f:
+        for line in f:
+            try:
+                records.append(cast(StatsRecord, json.loads(line)))
+            except ValueError:
+                continue
+
+    return records
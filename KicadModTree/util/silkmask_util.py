@@ -13,16 +13,28 @@
 # (C) The KiCad Librarian Team
 
 import sys
+from collections.abc import Iterable
 
 from KicadModTree.nodes.base.Arc import Arc
 from KicadModTree.nodes.base.Circle import Circle
 from KicadModTree.nodes.base.Line import Line
 from KicadModTree.nodes.base.Pad import Pad
 from KicadModTree.nodes.base.Rectangle import Rectangle
+from KicadModTree.nodes.Footprint import Footprint
 from KicadModTree.nodes.Node import Node
 from KicadModTree.nodes.NodeShape import NodeShape
 
 
+def _with_wildcard_layers(layers: list[str]) -> list[str]:
+    """Return the layers and the wildcard layers matching them (e.g. `*.Mask` for
+    `F.Mask`)."""
+    return layers + [
+        "*.%s" % layer.split(".", maxsplit=1)[-1]
+        for layer in layers
+        if layer.startswith("F.") or layer.startswith("B.")
+    ]
+
+
 def _collect_nodes_as_geometric_shapes(
     node: Node,
     layer: str | list[str],
@@ -47,18 +59,34 @@ def _collect_nodes_as_geometric_shapes(
             supported).
         - Drills are (optionally) included as circles (other shapes not yet supported).
         - `silk_pad_clearance` is an additional offset around pads and holes.
+        - The nodes below the direct children of the node are selected from the last
+            layer only.
+        - For a footprint, the pads and shapes are taken from its index rather than by
+            walking the whole tree.
     """
     if isinstance(layer, list):
         layers = layer
     else:
         layers = [layer]
-    for layer in layers[:]:
-        if layer.startswith("F.") or layer.startswith("B."):
-            layers.append("*.%s" % layer.split(".", maxsplit=1)[-1])
+    # The layer of the recursive calls for the nodes below the direct children
+    layer = layers[-1]
+    layers = _with_wildcard_layers(layers)
     shapes: list[NodeShape] = []
-    for c in node:
+    nodes: Iterable[Node]
+    nested_layers = layers
+    if isinstance(node, Footprint):
+        # The children of the shapes (e.g. the lines of a PolygonLine) are not indexed,
+        # they are collected below
+        nodes = node.index.get_nodes(Pad | NodeShape)
+        # The indexed nodes below the direct children are selected as if they were
+        # collected by the recursive calls
+        nested_layers = _with_wildcard_layers([layer])
+    else:
+        nodes = node
+    for c in nodes:
+        c_layers = layers if c.get_parent() is node else nested_layers
         if isinstance(c, Pad):
-            if any(_ in c.layers for _ in layers):
+            if any(_ in c.layers for _ in c_layers):
                 if c.shape in (Pad.SHAPE_RECT, Pad.SHAPE_ROUNDRECT, Pad.SHAPE_OVAL):
                     shapes.append(
                         Rectangle(
@@ -83,7 +111,7 @@ def _collect_nodes_as_geometric_shapes(
                 shapes.append(
                     Circle(center=c.at, radius=c.drill[0] * 0.5 + silk_pad_clearance)
                 )
-        elif isinstance(c, Arc | Line | Circle) and c.layer in layers:
+        elif isinstance(c, Arc | Line | Circle) and c.layer in c_layers:
             shapes.append(c)
         else:
             shapes += _collect_nodes_as_geometric_shapes(
@@ -148,8 +176,7 @@ def clean_silk_over_mask(
         silk_pad_clearance=silk_pad_clearance + 0.5 * silk_line_width,
     )
     tidy_silk = _clean_silk_by_mask(silk_shapes, mask_shapes)
-    for node in silk_shapes:
-        footprint.remove(node, traverse=True)
+    footprint.remove_many(silk_shapes)
     for node in tidy_silk:
         footprint.append(node)
     return footprint
@@ -4,7 +4,9 @@ import os
 import argparse
 import logging
 import yaml
+from dataclasses import dataclass
 from math import sqrt
+from pathlib import Path
 from typing import List
 
 from KicadModTree import (
@@ -27,7 +29,11 @@ from KicadModTree.nodes.specialized.PadArray import (
     get_pad_radius_from_arrays,
 )
 
-from scripts.tools.footprint_generator import FootprintGenerator
+from scripts.tools.footprint_generator import (
+    FootprintGenerator,
+    FootprintGeneratorPlugin,
+    FootprintListing,
+)
 from scripts.tools.global_config_files.global_config import GlobalConfig
 from scripts.tools.footprint_text_fields import addTextFields
 from scripts.tools.ipc_pad_size_calculators import (
@@ -122,6 +128,24 @@ class NoLeadConfiguration:
         return self._spec_dictionary
 
 
+@dataclass
+class NoLeadVariant:
+    """
+    The names and pad parameters of a single footprint variant (e.g. with
+    or without thermal vias), which can be worked out without building it.
+    """
+    lib_name: str
+    fp_name: str
+    model_name: str
+    pincount_full: int
+    pincount: int
+    is_pull_back: bool
+    ipc_offsets: ipc_rules.Offsets
+    EP_size: Vector2D
+    EP_center: Vector2D | None
+    pad_details: dict
+
+
 class NoLeadGenerator(FootprintGenerator):
     def __init__(self, configuration, ipc_defs: ipc_rules.IpcRules, **kwargs):
         super().__init__(**kwargs)
@@ -301,7 +325,7 @@ class NoLeadGenerator(FootprintGenerator):
 
         return dimensions
 
-    def generateFootprint(self, device_params: dict, pkg_id: str, header_info: dict = None):
+    def __prepareDevice(self, device_params: dict, pkg_id: str):
         nolead_config = NoLeadConfiguration(device_params)
 
         device_dimensions = NoLeadGenerator.deviceDimensions(nolead_config, pkg_id)
@@ -317,13 +341,32 @@ class NoLeadGenerator(FootprintGenerator):
         if 'deleted_pins' in device_params and 'hidden_pins' in device_params:
             raise ValueError("A footprint may not have deleted pins and hidden pins.")
 
+        # The footprint variants, by whether they have thermal vias
+        thermal_via_variants = [False]
         if device_dimensions['has_EP'] and 'thermal_vias' in device_params:
-            self.__createFootprintVariant(nolead_config, device_dimensions, True)
+            thermal_via_variants.insert(0, True)
 
-        self.__createFootprintVariant(nolead_config, device_dimensions, False)
+        return nolead_config, device_dimensions, thermal_via_variants
 
-    def __createFootprintVariant(self, device_config: NoLeadConfiguration,
-                                 device_dimensions, with_thermal_vias):
+    def generateFootprint(self, device_params: dict, pkg_id: str, header_info: dict = None):
+        nolead_config, device_dimensions, thermal_via_variants = self.__prepareDevice(device_params, pkg_id)
+
+        for with_thermal_vias in thermal_via_variants:
+            self.__createFootprintVariant(nolead_config, device_dimensions, with_thermal_vias)
+
+    def list_footprints(self, device_params: dict, pkg_id: str, header_info: dict = None):
+        nolead_config, device_dimensions, thermal_via_variants = self.__prepareDevice(device_params, pkg_id)
+
+        for with_thermal_vias in thermal_via_variants:
+            variant = self.__variant(nolead_config, device_dimensions, with_thermal_vias)
+            yield FootprintListing(name=variant.fp_name, library=variant.lib_name, pkg_id=pkg_id)
+
+    def __variant(self, device_config: NoLeadConfiguration,
+                  device_dimensions, with_thermal_vias) -> NoLeadVariant:
+        """
+        Work out the names and the pad parameters of a footprint variant
+        (without building the footprint).
+        """
         # Pull out the old-style raw data
         device_params = device_config.spec_dictionary
 
@@ -391,6 +434,7 @@ class NoLeadGenerator(FootprintGenerator):
                         nx=device_params['num_pins_x'], ny=device_params['num_pins_y'])
 
             EP_size = Vector2D(0, 0)
+            EP_center = None
 
         if device_config.metadata.custom_name_format:
             name_format = device_config.metadata.custom_name_format
@@ -408,8 +452,6 @@ class NoLeadGenerator(FootprintGenerator):
         size_x = device_dimensions['body_size_x'].nominal
         size_y = device_dimensions['body_size_y'].nominal
 
-        fp_ast_evaluator = ast_evaluator.ASTevaluator()
-
         fp_name = name_format.format(
             man=device_config.metadata.manufacturer or "",
             mpn=device_config.metadata.part_number or "",
@@ -449,7 +491,40 @@ class NoLeadGenerator(FootprintGenerator):
             fp_name = prefix + fp_name
             fp_name_2 = prefix + fp_name_2
 
-        model_name = fp_name_2
+        return NoLeadVariant(
+            lib_name=lib_name,
+            fp_name=fp_name,
+            model_name=fp_name_2,
+            pincount_full=pincount_full,
+            pincount=pincount,
+            is_pull_back=is_pull_back,
+            ipc_offsets=ipc_offsets,
+            EP_size=EP_size,
+            EP_center=EP_center,
+            pad_details=pad_details,
+        )
+
+    def __createFootprintVariant(self, device_config: NoLeadConfiguration,
+                                 device_dimensions, with_thermal_vias):
+        # Pull out the old-style raw data
+        device_params = device_config.spec_dictionary
+
+        variant = self.__variant(device_config, device_dimensions, with_thermal_vias)
+        lib_name = variant.lib_name
+        fp_name = variant.fp_name
+        model_name = variant.model_name
+        pincount_full = variant.pincount_full
+        pincount = variant.pincount
+        is_pull_back = variant.is_pull_back
+        ipc_offsets = variant.ipc_offsets
+        EP_size = variant.EP_size
+        EP_center = variant.EP_center
+        pad_details = variant.pad_details
+
+        size_x = device_dimensions['body_size_x'].nominal
+        size_y = device_dimensions['body_size_y'].nominal
+
+        fp_ast_evaluator = ast_evaluator.ASTevaluator()
 
         kicad_mod = Footprint(fp_name, FootprintType.SMD)
         if "mask_margin" in device_params:
@@ -773,6 +848,28 @@ class NoLeadGenerator(FootprintGenerator):
         self.add_standard_3d_model_to_footprint(kicad_mod, lib_name, model_name)
         self.write_footprint(kicad_mod, lib_name)
 
+
+def _plugin_generator_kwargs() -> dict:
+    # Same as the command line defaults
+    with open(Path(__file__).parent.parent / 'package_config_KLCv3.yaml', 'r') as config_stream:
+        configuration = yaml.safe_load(config_stream)
+
+    return {
+        'configuration': configuration,
+        'ipc_defs': ipc_rules.IpcRules.from_file('ipc_7351b'),
+    }
+
+
+# In-process generator used by scripts/generator.py instead of generate.sh
+plugin = FootprintGeneratorPlugin(
+    name='Packages/Package_NoLead__DFN_QFN_LGA_SON',
+    generator_class=NoLeadGenerator,
+    base_path=Path(__file__).parent,
+    file_globs=['size_definitions/*.yaml', 'size_definitions/qfn/*.yaml'],
+    make_kwargs=_plugin_generator_kwargs,
+)
+
+
 if __name__ == "__main__":
     parser = argparse.ArgumentParser(description='use confing .yaml files to create footprints.')
     parser.add_argument('files', metavar='file', type=str, nargs='*',
@@ -7,11 +7,22 @@ It discovers generators in the `scripts` directory and runs them to generate foo
 """
 
 import abc
+import contextlib
+import cProfile
+import dataclasses
 import fnmatch
+import functools
+import glob
+import importlib.metadata
+import json
 import logging
 import os
+import pstats
+import shlex
+import shutil
 import subprocess
 import sys
+import tempfile
 import time
 import traceback
 from collections.abc import Generator
@@ -61,12 +72,30 @@ class FpGenerator(abc.ABC):
         pass
 
     @abc.abstractmethod
-    def generate(self) -> "FpGenerationResult":
+    def generate(self, output_dir: Path | None) -> "FpGenerationResult":
         """
         Run the generator, returning a FpGenerationResult.
         """
         pass
 
+    def get_jobs(self) -> list["FpGenerationJob"]:
+        """
+        Split the generator into units of work (e.g. one per YAML file or series)
+        that the runner can schedule independently across all cores.
+
+        The default is a single job that runs the whole generator.
+        """
+        return [FpGenerationJob(self, self.name)]
+
+    def list_footprints(self) -> list | None:
+        """
+        List the footprints the generator would produce (as FootprintListings),
+        without generating them.
+
+        Returns None if the generator can't list its footprints without running.
+        """
+        return None
+
     @property
     @abc.abstractmethod
     def name(self) -> str:
@@ -132,12 +161,159 @@ class FpGenerationResult:
     # Number of footprints generated (None = FpGenerator didn't say)
     num_fps: int | None
 
+    # Number of footprints by what happened to their files: "new", "written"
+    # or "unchanged" (empty = unknown)
+    num_fps_by_status: dict[str, int]
+
+    # Bytes of footprint files written (None = unknown)
+    num_bytes: int | None
+    # CPU time of the generator processes (None = unknown)
+    cpu_time: float | None
+    # Peak RSS of the generator processes in bytes (None = unknown)
+    peak_rss: int | None
+
+    # Time taken by each successful job of the generator
+    job_times: dict[str, float]
+
     def __init__(self, generator: FpGenerator):
         self.generator = generator
         self.success = False
+        self.exception = None
         self.time = 0
         self.num_series = None
         self.num_fps = None
+        self.num_fps_by_status = {}
+        self.num_bytes = None
+        self.cpu_time = None
+        self.peak_rss = None
+        self.job_times = {}
+
+    def merge(self, other: "FpGenerationResult"):
+        """
+        Fold the result of another job of the same generator into this one.
+
+        The merged result is only successful if all the jobs were, and the
+        first exception is kept.
+        """
+        self.success = self.success and other.success
+
+        if self.exception is None:
+            self.exception = other.exception
+
+        self.time = (self.time or 0) + (other.time or 0)
+
+        def _add(a, b):
+            if a is None:
+                return b
+            if b is None:
+                return a
+            return a + b
+
+        self.num_series = _add(self.num_series, other.num_series)
+        self.num_fps = _add(self.num_fps, other.num_fps)
+        self.num_bytes = _add(self.num_bytes, other.num_bytes)
+        self.cpu_time = _add(self.cpu_time, other.cpu_time)
+
+        for status, count in other.num_fps_by_status.items():
+            self.num_fps_by_status[status] = (
+                self.num_fps_by_status.get(status, 0) + count
+            )
+
+        if self.peak_rss is None or (other.peak_rss or 0) > self.peak_rss:
+            self.peak_rss = other.peak_rss
+
+        self.job_times.update(other.job_times)
+
+    def add_stats(self, records: list[dict]):
+        """
+        Fill in the statistics from the records of a stats file (see
+        KicadModTree.util.generation_stats).
+        """
+        if not records:
+            return
+
+        fp_records = [r for r in records if r["type"] == "footprint"]
+        series_records = [r for r in records if r["type"] == "series"]
+        process_records = [r for r in records if r["type"] == "process"]
+
+        # Generators that don't use KicadPrettyLibrary don't report anything
+        if fp_records:
+            self.num_fps = len(fp_records)
+            self.num_bytes = sum(
+                r["bytes"] for r in fp_records if r.get("status") != "unchanged"
+            )
+
+            for r in fp_records:
+                if r.get("status"):
+                    self.num_fps_by_status[r["status"]] = (
+                        self.num_fps_by_status.get(r["status"], 0) + 1
+                    )
+
+        # Only FootprintGenerators know about series
+        if series_records:
+            self.num_series = len(series_records)
+
+        if process_records:
+            self.cpu_time = sum(r["cpu_time"] for r in process_records)
+            self.peak_rss = max(r["peak_rss"] for r in process_records)
+
+    def to_dict(self) -> dict:
+        """
+        Get the result as JSON-compatible data (e.g. to merge the results of
+        shards run on different machines).
+        """
+        return {
+            "generator": self.generator.name,
+            "success": self.success,
+            "exception": str(self.exception) if self.exception else None,
+            "time": self.time,
+            "num_series": self.num_series,
+            "num_fps": self.num_fps,
+            "num_fps_by_status": self.num_fps_by_status,
+            "num_bytes": self.num_bytes,
+            "cpu_time": self.cpu_time,
+            "peak_rss": self.peak_rss,
+            "job_times": self.job_times,
+        }
+
+    @classmethod
+    def from_dict(cls, data: dict) -> "FpGenerationResult":
+        """
+        Recreate a result from the data of to_dict.
+        """
+        res = cls(FpRecordedGenerator(data["generator"]))
+        res.success = data["success"]
+        if data["exception"]:
+            res.exception = FpGenerator.GenerationError(data["exception"])
+        res.time = data["time"]
+        res.num_series = data["num_series"]
+        res.num_fps = data["num_fps"]
+        res.num_fps_by_status = data["num_fps_by_status"]
+        res.num_bytes = data["num_bytes"]
+        res.cpu_time = data["cpu_time"]
+        res.peak_rss = data["peak_rss"]
+        res.job_times = data["job_times"]
+        return res
+
+
+class FpGenerationJob:
+    """
+    A unit of work of a generator that can be scheduled independently of
+    the generator's other jobs.
+
+    The base job runs the whole generator.
+    """
+
+    generator: FpGenerator
+    # Unique and stable name of the job (for logging and scheduling)
+    name: str
+
+    def __init__(self, generator: FpGenerator, name: str):
+        self.generator = generator
+        self.name = name
+
+    def run(self, output_dir: Path | None) -> FpGenerationResult:
+        return self.generator.generate(output_dir)
 
 
 class FpGenerateShGenerator(FpGenerator):
@@ -167,6 +343,11 @@ class FpGenerateShGenerator(FpGenerator):
         logging.info("Running generate.sh: %s" % self.generate_sh)
 
         cmd = ["sh", "-c", self.generate_sh.absolute().as_posix()]
+        return self._run_command(cmd, output_dir, self.generate_sh)
+
+    def _run_command(
+        self, cmd: list[str], output_dir: Path | None, what
+    ) -> "FpGenerationResult":
         cwd = self.base_path
 
         env = os.environ.copy()
@@ -179,12 +360,10 @@ class FpGenerateShGenerator(FpGenerator):
             subprocess.run(cmd, check=True, cwd=cwd, env=env)
             res.success = True
         except subprocess.CalledProcessError as e:
-            res.exception = FpGenerator.GenerationError(
-                f"Failed to run {self.generate_sh}: {e}"
-            )
+            res.exception = FpGenerator.GenerationError(f"Failed to run {what}: {e}")
 
-        # Calculating these is tricky, as there may be existing FPs in the directory
-        # and generate.sh doesn't clear
+        # The runner fills in the counts from the stats file (the scripts can't
+        # report them back otherwise, and there may be existing FPs in the directory)
         res.num_fps = None
         res.num_series = None
         return res
@@ -194,6 +373,38 @@ class FpGenerateShGenerator(FpGenerator):
         rel = self.generate_sh.parent.relative_to(self.root_path)
         return rel.as_posix()
 
+    def get_jobs(self) -> list[FpGenerationJob]:
+        """
+        Split the generate.sh into one job per generator invocation, if the
+        script is simple enough to be understood (which they all are as of
+        2025). Otherwise, the whole script is one job.
+        """
+        with open(self.generate_sh, "r", encoding="utf-8") as f:
+            commands = _split_generate_sh(f.read(), self.base_path)
+
+        if not commands or len(commands) == 1:
+            return super().get_jobs()
+
+        return [self.CommandJob(self, command) for command in commands]
+
+    class CommandJob(FpGenerationJob):
+        """
+        A single command from a generate.sh script (usually one generator
+        invocation on one YAML file).
+        """
+
+        command: str
+
+        def __init__(self, generator: "FpGenerateShGenerator", command: str):
+            super().__init__(generator, f"{generator.name}: {command}")
+            self.command = command
+
+        def run(self, output_dir: Path | None) -> FpGenerationResult:
+            logging.info(f"Running {self.name}")
+
+            cmd = ["sh", "-c", f"set -e\n{self.command}"]
+            return self.generator._run_command(cmd, output_dir, self.command)
+
     class DiscoveryFactory(FpGenerator.DiscoveryFactory):
         """
         Class to discover and construct FpGenerateShGenerator instances
@@ -225,6 +436,506 @@ class FpGenerateShGenerator(FpGenerator):
                         yield Path(dirpath) / self.SH_NAME
 
 
+class FpPluginGenerator(FpGenerator):
+    """
+    A generator that runs a FootprintGenerator in-process (see FootprintGeneratorPlugin),
+    rather than shelling out to a generate.sh script, which usually then starts
+    a new Python interpreter for every definition file.
+
+    The runner's worker processes are long-lived and have the imports and the
+    global config pre-loaded, so jobs only pay for the actual generation.
+    """
+
+    # The entry point name (also the generator name)
+    entry_point_name: str
+    # The entry point value ("module:attribute" of the plugin)
+    entry_point_value: str
+    # Root path of scripts top level dir
+    root_path: Path
+
+    def __init__(self, root_path, entry_point_name: str, entry_point_value: str):
+        self.root_path = root_path
+        self.entry_point_name = entry_point_name
+        self.entry_point_value = entry_point_value
+
+    @property
+    def plugin(self):
+        return _load_plugin(self.entry_point_name, self.entry_point_value)
+
+    @property
+    def name(self):
+        return self.entry_point_name
+
+    @property
+    def base_path(self):
+        return self.plugin.base_path
+
+    def get_jobs(self) -> list[FpGenerationJob]:
+        """
+        One job per definition file.
+        """
+        return [self.FileJob(self, f) for f in self.plugin.target_files()]
+
+    def list_footprints(self) -> list:
+        listings = []
+
+        with contextlib.chdir(self.base_path):
+            for filepath in self.plugin.target_files():
+                listings += self.plugin.list_file(filepath, _get_global_config())
+
+        return listings
+
+    def generate(self, output_dir: Path | None) -> FpGenerationResult:
+        res = FpGenerationResult(self)
+        res.success = True
+
+        for filepath in self.plugin.target_files():
+            res.merge(self._generate_file(filepath, output_dir))
+
+        return res
+
+    def _generate_file(self, filepath: Path, output_dir: Path | None):
+        logging.info(f"Generating {self.name}: {filepath}")
+
+        # Like generate.sh, write next to the generator if there's no output dir
+        if output_dir is None:
+            output_dir = self.base_path
+
+        res = FpGenerationResult(self)
+
+        try:
+            with contextlib.chdir(self.base_path):
+                self.plugin.run_on_file(filepath, output_dir, _get_global_config())
+            res.success = True
+        except Exception:
+            # The traceback doesn't survive the trip back from the worker process
+            res.exception = FpGenerator.GenerationError(
+                f"Failed to generate {filepath}:\n{traceback.format_exc()}"
+            )
+
+        return res
+
+    class FileJob(FpGenerationJob):
+        """
+        Generate the footprints of a single definition file.
+        """
+
+        filepath: Path
+
+        def __init__(self, generator: "FpPluginGenerator", filepath: Path):
+            rel_path = filepath.relative_to(generator.base_path).as_posix()
+            super().__init__(generator, f"{generator.name}: {rel_path}")
+            self.filepath = filepath
+
+        def run(self, output_dir: Path | None) -> FpGenerationResult:
+            return self.generator._generate_file(self.filepath, output_dir)
+
+    class DiscoveryFactory(FpGenerator.DiscoveryFactory):
+        """
+        Class to discover FpPluginGenerators from the installed entry points.
+        """
+
+        root_path: Path
+
+        def __init__(self, root_path):
+            self.root_path = root_path
+
+        def discover(self):
+            from scripts.tools.footprint_generator import FootprintGeneratorPlugin
+
+            entry_points = importlib.metadata.entry_points(
+                group=FootprintGeneratorPlugin.ENTRY_POINT_GROUP
+            )
+
+            for ep in entry_points:
+                try:
+                    _load_plugin(ep.name, ep.value)
+                except Exception as e:
+                    logging.warning(f"Failed to load generator plugin {ep.name}: {e}")
+                    continue
+
+                yield FpPluginGenerator(self.root_path, ep.name, ep.value)
+
+
+# Directory to write the profiles of all generator processes and jobs to
+PROFILE_DIR_ENV_VAR = "KICAD_FP_GENERATOR_PROFILE_DIR"
+
+# Directory with the sitecustomize module that profiles the Python processes
+# started by generators (see --profile)
+_PROFILE_HOOK_DIR = Path(__file__).parent / "tools" / "profile_hook"
+
+# The code of interest in profiles
+_PROFILE_FILTER = r"(kilibs|KicadModTree|scripts/tools)/"
+
+
+def enable_profiling(profile_dir: Path):
+    """
+    Profile all the jobs, and all the Python processes that they start, into
+    the given directory (inherited through the environment).
+    """
+    profile_dir.mkdir(parents=True, exist_ok=True)
+    os.environ[PROFILE_DIR_ENV_VAR] = profile_dir.as_posix()
+
+    python_path = os.environ.get("PYTHONPATH")
+    os.environ["PYTHONPATH"] = os.pathsep.join(
+        p for p in [_PROFILE_HOOK_DIR.as_posix(), python_path] if p
+    )
+
+
+def print_profile_report(profile_dir: Path, top: int, sort: str):
+    """
+    Merge all the profiles in the directory into one (which is saved as
+    merged.prof for further analysis) and print the hottest library functions.
+    """
+    profiles = sorted(p for p in profile_dir.glob("*.prof") if p.name != "merged.prof")
+
+    if not profiles:
+        logging.warning(f"No profiles found in {profile_dir}")
+        return
+
+    stats = pstats.Stats(str(profiles[0]))
+    for profile in profiles[1:]:
+        stats.add(str(profile))
+
+    merged_file = profile_dir / "merged.prof"
+    stats.dump_stats(merged_file)
+
+    print(f"Profile of {len(profiles)} processes/jobs (merged into {merged_file}):")
+    stats.sort_stats(sort).print_stats(_PROFILE_FILTER, top)
+
+
+@functools.cache
+def _load_plugin(name: str, value: str):
+    """
+    Load (once per process) the FootprintGeneratorPlugin an entry point refers to.
+    """
+    from scripts.tools.footprint_generator import FootprintGeneratorPlugin
+
+    ep = importlib.metadata.EntryPoint(
+        name=name, value=value, group=FootprintGeneratorPlugin.ENTRY_POINT_GROUP
+    )
+    return ep.load()
+
+
+@functools.cache
+def _get_global_config():
+    """
+    Get the (default) global config of the in-process generators, loaded once
+    per process.
+    """
+    from scripts.tools.global_config_files import global_config as GC
+
+    return GC.DefaultGlobalConfig()
+
+
+def _warm_up_worker():
+    """
+    Pre-load the imports and the config that the in-process generators need, so
+    that the jobs don't pay for it.
+
+    This is called in the runner process before starting the pool (so forked workers
+    inherit it) and as the initializer of the workers (for spawned workers).
+    """
+    import KicadModTree  # NOQA
+    import kilibs.geom  # NOQA
+
+    _get_global_config()
+
+
+def _split_generate_sh(text: str, cwd: Path) -> list[str] | None:
+    """
+    Split the text of a generate.sh script into the individual commands it runs,
+    with loops and helper functions expanded.
+
+    Only the very restricted shell subset that the generate.sh scripts use is
+    understood: simple commands, `set` options, `name() { ... }` helper functions
+    taking positional arguments and `for var in globs; do ... done` loops. If
+    anything else is found, None is returned and the script should be run as a
+    whole.
+    """
+
+    def _tokens(line: str) -> list[str] | None:
+        try:
+            lex = shlex.shlex(line, posix=True, punctuation_chars=";&|()<>")
+            lex.whitespace_split = True
+            return list(lex)
+        except ValueError:
+            return None
+
+    def _substitute(line: str, variables: dict[str, str]) -> str | None:
+        for var, value in variables.items():
+            quoted = shlex.quote(value)
+            for form in (f'"${var}"', f'"${{{var}}}"', f"${{{var}}}", f"${var}"):
+                line = line.replace(form, quoted)
+        # Anything else that needs the shell to expand is not understood
+        if "$" in line:
+            return None
+        return line
+
+    def _is_simple(tokens: list[str]) -> bool:
+        operators = set(";&|()<>{}")
+        return bool(tokens) and not any(set(t) <= operators for t in tokens)
+
+    lines = []
+    for raw in text.splitlines():
+        tokens = _tokens(raw)
+        if tokens is None:
+            return None
+        # Blank or comment-only
+        if not tokens:
+            continue
+        lines.append((raw.strip(), tokens))
+
+    functions: dict[str, list[str]] = {}
+    commands: list[str] = []
+
+    def _expand(line: str, tokens: list[str], variables: dict[str, str]):
+        """
+        Expand a simple command line (maybe a helper function call).
+        """
+        if tokens[0] in functions:
+            args = {}
+            for i, arg in enumerate(tokens[1:]):
+                for var, value in variables.items():
+                    if arg in (f"${var}", f"${{{var}}}"):
+                        arg = value
+                if "$" in arg:
+                    return False
+                args[str(i + 1)] = arg
+            for i in range(len(tokens), 10):
+                args[str(i)] = ""
+
+            for body_line in functions[tokens[0]]:
+                expanded = _substitute(body_line, {**variables, **args})
+                if expanded is None:
+                    return False
+                commands.append(expanded)
+            return True
+
+        expanded = _substitute(line, variables)
+        if expanded is None:
+            return False
+        commands.append(expanded)
+        return True
+
+    i = 0
+    while i < len(lines):
+        line, tokens = lines[i]
+
+        if tokens[0] == "set":
+            i += 1
+            continue
+
+        # name() {
+        if tokens[1:] == ["(", ")", "{"] or tokens[1:] == ["()", "{"]:
+            body = []
+            i += 1
+            while i < len(lines) and lines[i][1] != ["}"]:
+                if not _is_simple(lines[i][1]) or lines[i][1][0] in functions:
+                    return None
+                body.append(lines[i][0])
+                i += 1
+            functions[tokens[0]] = body
+            i += 1
+            continue
+
+        # for var in words...; do / for var in words... NL do
+        if tokens[0] == "for":
+            if len(tokens) < 4 or tokens[2] != "in":
+                return None
+            var = tokens[1]
+            words = tokens[3:]
+            if words[-2:] == [";", "do"]:
+                words = words[:-2]
+            elif i + 1 < len(lines) and lines[i + 1][1] == ["do"]:
+                i += 1
+            else:
+                return None
+
+            values = []
+            for word in words:
+                if "$" in word:
+                    return None
+                matches = sorted(glob.glob(word, root_dir=cwd))
+                # Like the shell: an unmatched glob is passed through as-is
+                values += matches if matches else [word]
+
+            body = []
+            i += 1
+            while i < len(lines) and lines[i][1] != ["done"]:
+                if not _is_simple(lines[i][1]):
+                    return None
+                body.append(lines[i])
+                i += 1
+            if i == len(lines):
+                return None
+
+            for value in values:
+                for body_line, body_tokens in body:
+                    if not _expand(body_line, body_tokens, {var: value}):
+                        return None
+            i += 1
+            continue
+
+        if not _is_simple(tokens) or tokens[0] in ("if", "while", "cd", "export"):
+            return None
+
+        if not _expand(line, tokens, {}):
+            return None
+        i += 1
+
+    return commands
+
+
+def _skips_footprints() -> bool:
+    """
+    Do the jobs skip some of their footprints (because they are unchanged since the
+    last incremental run, or excluded by a package filter)?
+    """
+    from scripts.tools.footprint_generator import FootprintGenerator
+    from scripts.tools.generation_cache import GenerationCache
+
+    return GenerationCache.enabled() or FootprintGenerator.package_filter() is not None
+
+
+class TimingHistory:
+    """
+    The durations of the jobs in previous runs, used to start the longest
+    jobs first.
+
+    Jobs are handed out to the pool one at a time in order, so starting the
+    longest ones first (and leaving the short ones to fill in the gaps at the end)
+    keeps all the workers busy until the end of the run.
+    """
+
+    # Weight of the latest run in the recorded duration (the rest is the history),
+    # to smooth out noisy timings
+    SMOOTHING = 0.5
+
+    # Where the history is stored (None = not stored)
+    path: Path | None
+    # The expected duration of each job by job name
+    durations: dict[str, float]
+
+    def __init__(
+        self, path: Path | None = None, durations: dict[str, float] | None = None
+    ):
+        self.path = path
+        self.durations = durations if durations is not None else {}
+
+    @classmethod
+    def load(cls, path: Path) -> "TimingHistory":
+        """
+        Load the history from a file (an empty history if there is no valid one).
+        """
+        durations = {}
+
+        try:
+            with open(path, "r", encoding="utf-8") as f:
+                durations = json.load(f)["jobs"]
+        except FileNotFoundError:
+            logging.info(f"No timing history at {path}, starting a new one")
+        except (OSError, ValueError, KeyError, TypeError) as e:
+            logging.warning(f"Ignoring invalid timing history {path}: {e}")
+
+        return cls(path, durations)
+
+    def save(self):
+        """
+        Store the history (if it has a path).
+        """
+        if self.path is None:
+            return
+
+        tmp_path = self.path.with_name(self.path.name + ".tmp")
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump({"jobs": self.durations}, f, indent=1, sort_keys=True)
+        os.replace(tmp_path, self.path)
+
+    def estimate(self, job: FpGenerationJob) -> float | None:
+        """
+        The expected duration of a job, None if it never ran (successfully).
+        """
+        return self.durations.get(job.name)
+
+    def sort_key(self, job: FpGenerationJob):
+        """
+        Sort key for the longest-first order.
+
+        Jobs that never ran go first, as they could be anything (and they're
+        probably the ones being worked on).
+        """
+        duration = self.estimate(job)
+        if duration is None:
+            return (0, 0)
+        return (1, -duration)
+
+    def record(self, job_times: dict[str, float]):
+        """
+        Record the durations of the jobs of a run.
+        """
+        for name, duration in job_times.items():
+            previous = self.durations.get(name)
+            if previous is not None:
+                duration = self.SMOOTHING * duration + (1 - self.SMOOTHING) * previous
+            self.durations[name] = round(duration, 3)
+
+
+class FpRecordedGenerator(FpGenerator):
+    """
+    A generator that ran somewhere else (e.g. on another shard), and is only
+    known by its name and results.
+    """
+
+    def __init__(self, name: str):
+        self._name = name
+
+    @property
+    def name(self):
+        return self._name
+
+    def generate(self, output_dir: Path | None) -> FpGenerationResult:
+        raise FpGenerator.GenerationError(f"{self.name} can't be run from here")
+
+
+def shard_jobs(
+    jobs: list[FpGenerationJob], num_shards: int, history: TimingHistory
+) -> list[list[FpGenerationJob]]:
+    """
+    Split the jobs into shards of (approximately) equal total duration.
+
+    The assignment only depends on the job names and the timing history, so
+    every node of a sharded run gets the same split (as long as they all use the
+    same timing history). Jobs without history count as an average job.
+    """
+    known = [d for d in (history.estimate(j) for j in jobs) if d is not None]
+    default_weight = sum(known) / len(known) if known else 1.0
+
+    def _weight(job):
+        duration = history.estimate(job)
+        return duration if duration is not None else default_weight
+
+    shards: list[list[FpGenerationJob]] = [[] for _ in range(num_shards)]
+    loads = [0.0] * num_shards
+
+    # Greedy longest-first: each job goes to the least loaded shard
+    for job in sorted(jobs, key=lambda j: (-_weight(j), j.name)):
+        shard = min(range(num_shards), key=lambda i: (loads[i], i))
+        shards[shard].append(job)
+        loads[shard] += _weight(job)
+
+    return shards
+
+
+def merge_outputs(output_dirs: list[Path], dest: Path):
+    """
+    Merge the output directories of several (sharded) runs into one.
+    """
+    for output_dir in output_dirs:
+        logging.info(f"Merging outputs of {output_dir} into {dest}")
+        shutil.copytree(output_dir, dest, dirs_exist_ok=True)
+
+
 class GenerationFilter:
     """
     A filter that can be used to include or exclude libraries from generation.
@@ -286,48 +997,50 @@ class GeneratorRunner:
     _generators: list[FpGenerator]
     output_dir: Path | None
     separate_outputs: bool
+    # Split generators into smaller jobs (e.g. per YAML file)
+    split_jobs: bool
+    # Job durations of previous runs, for scheduling
+    timing_history: TimingHistory
+    # File to append the statistics records of all jobs to (None = don't keep them)
+    stats_file: Path | None
+    # Only run one shard of the jobs: (shard index, number of shards), index from 1
+    shard: tuple[int, int] | None
+    # The results of the last generate() call
+    results: list[FpGenerationResult]
 
     def __init__(self, root, output_dir: Path | None):
         self.root = root
         self.output_dir = output_dir
         self.separate_outputs = False
+        self.split_jobs = True
+        self.timing_history = TimingHistory()
+        self.stats_file = None
+        self.shard = None
+        self.results = []
 
         self._generators = []
         self._failures = []
 
+        # In-process generators come first, as they replace the generate.sh
+        # of the same directory (name)
         factories = [
+            FpPluginGenerator.DiscoveryFactory(root),
             FpGenerateShGenerator.DiscoveryFactory(root),
         ]
 
         with Timer("Generator discovery"):
             # Discover generators
+            names = set()
             for factory in factories:
-                self._generators += list(factory.discover())
+                for gen in factory.discover():
+                    if gen.name in names:
+                        logging.debug(f"Skipping replaced generator {gen.name}")
+                        continue
+                    names.add(gen.name)
+                    self._generators.append(gen)
 
             logging.info("Discovered %d generators" % len(self._generators))
 
-        # Prioritise generators that we know are slow
-        # This is a bit of a hack and the real answer is to break the generators
-        # up by series to keep all cores busy, but that needs generators to report
-        # which series they generate.
-        def _generator_sort_key(g):
-
-            prio_prefixes = [
-                "generator",  # the connector generator is slow
-                "Pin-Headers",
-                "Package_NoLead",
-                "Connector_PinSocket",
-                "Connector_Molex",
-            ]
-
-            for i, prefix in enumerate(prio_prefixes):
-                if g.name.startswith(prefix):
-                    return i
-            # everything else just goes in whatever order
-            return len(prio_prefixes)
-
-        self._generators.sort(key=_generator_sort_key)
-
     def generate(self, filter: GenerationFilter, jobs: int) -> bool:
         """
         Generate footprints included by the filter.
@@ -340,31 +1053,139 @@ class GeneratorRunner:
         for g in gens:
             logging.info(f"  - {g.name}")
 
-        def args_for_gen(g):
+        gen_jobs = self._get_jobs(gens)
+
+        if self.shard is not None:
+            index, num_shards = self.shard
+            shards = shard_jobs(gen_jobs, num_shards, self.timing_history)
+            in_shard = {job.name for job in shards[index - 1]}
+            # Keep the longest-first order within the shard
+            gen_jobs = [job for job in gen_jobs if job.name in in_shard]
+
+            logging.info(f"Running shard {index}/{num_shards}")
+
+        logging.info(f"Scheduling {len(gen_jobs)} jobs")
+
+        def args_for_job(job):
             gen_output_dir = self.output_dir
             # If we're not merging outputs (e.g. into kicad-footprints repo),
             # and not in-place, distribute the outputs into the same directory
             # structure as the generate.sh scripts themselves
             if self.separate_outputs and gen_output_dir:
-                rel_path = g.base_path.relative_to(self.root)
+                rel_path = job.generator.base_path.relative_to(self.root)
                 gen_output_dir /= rel_path
 
-            return (g, gen_output_dir)
+            return (job, gen_output_dir, self.stats_file)
 
-        results = []
+        job_results = []
 
-        if jobs == 1 or len(gens) == 1:
+        if jobs == 1 or len(gen_jobs) == 1:
             # In-process generation when single-threaded case for easier debugging
             # (generators may still shell out if they want, can't help that)
-            for g in gens:
-                result = self._do_generate(*args_for_gen(g))
-                results.append(result)
+            for job in gen_jobs:
+                result = self._do_generate(*args_for_job(job))
+                job_results.append(result)
         else:
             # Multiprocess jobs of 'None' means use the number of CPUs
             mp_jobs = jobs if jobs else None
 
-            with Pool(mp_jobs) as p:
-                results = p.starmap(self._do_generate, (args_for_gen(g) for g in gens))
+            if any(isinstance(g, FpPluginGenerator) for g in gens):
+                _warm_up_worker()
+                initializer = _warm_up_worker
+            else:
+                initializer = None
+
+            with Pool(mp_jobs, initializer=initializer) as p:
+                # Hand out one job at a time so that the pool stays busy until
+                # the very last job is done (starmap would pre-chunk the jobs).
+                job_results = list(
+                    p.imap_unordered(
+                        self._do_generate_args,
+                        (args_for_job(job) for job in gen_jobs),
+                        chunksize=1,
+                    )
+                )
+
+                # Let the workers exit cleanly (rather than being terminated),
+                # so that they finish any per-process outputs (e.g. archives)
+                p.close()
+                p.join()
+
+        results = self._merge_job_results(gens, job_results)
+
+        return self._report_results(results)
+
+    def merge_results(self, results_files: list[Path]) -> bool:
+        """
+        Merge and report the results of several (sharded) runs, as if they
+        were one run.
+        """
+        job_results = []
+
+        for results_file in results_files:
+            with open(results_file, "r", encoding="utf-8") as f:
+                job_results += [FpGenerationResult.from_dict(d) for d in json.load(f)]
+
+        # Keep the order of the first appearance of each generator
+        gens = list({r.generator.name: r.generator for r in job_results}.values())
+
+        return self._report_results(self._merge_job_results(gens, job_results))
+
+    def list_footprints(self, filter: GenerationFilter) -> bool:
+        """
+        Print the footprints that the generators included by the filter would
+        produce, without generating them (tab-separated: generator, library:name,
+        definition file and parameter set).
+        """
+        from scripts.tools.footprint_generator import FootprintGenerator
+
+        gens = list(filter.matching_generators(filter, self._generators))
+        gens.sort(key=lambda g: g.name)
+
+        success = True
+
+        for gen in gens:
+            try:
+                # Keep the listing clean of what generators print
+                with contextlib.redirect_stdout(sys.stderr):
+                    listings = gen.list_footprints()
+            except Exception:
+                logging.error(
+                    f"Failed to list the footprints of {gen.name}:\n{traceback.format_exc()}"
+                )
+                success = False
+                continue
+
+            if listings is None:
+                logging.warning(f"Can't list the footprints of {gen.name}")
+                continue
+
+            for listing in listings:
+                if listing.file is not None and gen.base_path is not None:
+                    rel_file = Path(listing.file).relative_to(gen.base_path)
+                    listing = dataclasses.replace(listing, file=rel_file.as_posix())
+
+                print(f"{gen.name}\t{FootprintGenerator.format_listing(listing)}")
+
+        return success
+
+    def save_results(self, results_file: Path):
+        """
+        Save the results of the last run, e.g. to merge them with the results
+        of other shards later.
+        """
+        with open(results_file, "w", encoding="utf-8") as f:
+            json.dump([r.to_dict() for r in self.results], f, indent=1)
+
+    def _report_results(self, results: list[FpGenerationResult]) -> bool:
+        self.results = results
+
+        # All the shards of a run must split the jobs with the same history, so
+        # sharded runs leave it to the merge of the results to update it
+        if self.shard is None:
+            for result in results:
+                self.timing_history.record(result.job_times)
+            self.timing_history.save()
 
         # Process results
 
@@ -377,27 +1198,155 @@ class GeneratorRunner:
 
         return all(r.success for r in results)
 
+    def _get_jobs(self, gens: list[FpGenerator]) -> list[FpGenerationJob]:
+        """
+        Get the jobs of the given generators, in the order they should be started.
+        """
+        gen_jobs = []
+
+        for g in gens:
+            if self.split_jobs:
+                gen_jobs += g.get_jobs()
+            else:
+                gen_jobs.append(FpGenerationJob(g, g.name))
+
+        # Longest first (the sort is stable, so jobs without history stay in
+        # the discovery order)
+        gen_jobs.sort(key=self.timing_history.sort_key)
+
+        return gen_jobs
+
     @staticmethod
-    def _do_generate(gen: FpGenerator, output_dir: Path | None) -> FpGenerationResult:
+    def _merge_job_results(
+        gens: list[FpGenerator], job_results: list[FpGenerationResult]
+    ) -> list[FpGenerationResult]:
+        """
+        Combine the results of all the jobs of each generator into one result
+        per generator.
+        """
+        merged: dict[str, FpGenerationResult] = {}
+
+        for job_result in job_results:
+            name = job_result.generator.name
+
+            if name not in merged:
+                merged[name] = job_result
+            else:
+                merged[name].merge(job_result)
+
+        # Keep the order of the generators
+        return [merged[g.name] for g in gens if g.name in merged]
+
+    @staticmethod
+    def _do_generate(
+        job: FpGenerationJob, output_dir: Path | None, stats_file: Path | None = None
+    ) -> FpGenerationResult:
+        from KicadModTree.util import generation_stats
+
+        # Collect the stats of the job (also from any processes it starts)
+        # in a file of its own
+        fd, job_stats_file = tempfile.mkstemp(prefix="kicad_fp_stats_", suffix=".jsonl")
+        os.close(fd)
+
+        prev_stats_file = os.environ.get(generation_stats.STATS_FILE_ENV_VAR)
+        os.environ[generation_stats.STATS_FILE_ENV_VAR] = job_stats_file
+        start_usage = generation_stats.resource_usage()
+
+        # Profile the part of the job that runs in this process (processes the
+        # job starts profile themselves through the profile hook)
+        profile_dir = os.environ.get(PROFILE_DIR_ENV_VAR)
+        profiler = None
+        if profile_dir and sys.getprofile() is None:
+            profiler = cProfile.Profile()
+            profiler.enable()
+
+        try:
+            with Timer(f"Generating {job.name}") as timer:
+                result = job.run(output_dir)
+                result.time = timer.duration
+        finally:
+            if profiler is not None:
+                profiler.disable()
+                fd, profile_file = tempfile.mkstemp(
+                    prefix="job-", suffix=".prof", dir=profile_dir
+                )
+                os.close(fd)
+                profiler.dump_stats(profile_file)
+
+            if prev_stats_file is None:
+                del os.environ[generation_stats.STATS_FILE_ENV_VAR]
+            else:
+                os.environ[generation_stats.STATS_FILE_ENV_VAR] = prev_stats_file
+
+            generation_stats.close()
+            records = generation_stats.read_records(job_stats_file)
+            os.remove(job_stats_file)
+
+        # If the job ran (partly) in this process, it has to be accounted for here,
+        # as this process doesn't exit at the end of the job
+        end_usage = generation_stats.resource_usage()
+        if start_usage and end_usage and any(r["pid"] == os.getpid() for r in records):
+            records.append(
+                {
+                    "type": "process",
+                    "pid": os.getpid(),
+                    "cpu_time": end_usage[0] - start_usage[0],
+                    "peak_rss": end_usage[1],
+                }
+            )
+
+        result.add_stats(records)
 
-        with Timer(f"Generating {gen.name}") as timer:
-            result = gen.generate(output_dir)
-            result.time = timer.duration
+        # Jobs that skip some of their footprints finish early, and would drag
+        # the timing history of their full runs down
+        if result.success and not _skips_footprints():
+            result.job_times = {job.name: result.time}
+
+        if stats_file is not None:
+            lines = [
+                json.dumps({**r, "generator": job.generator.name, "job": job.name})
+                for r in records
+            ]
+            # Single write, so that the jobs in other processes don't interleave
+            with open(stats_file, "a", encoding="utf-8") as f:
+                f.write("".join(line + "\n" for line in lines))
 
         return result
 
+    @staticmethod
+    def _do_generate_args(args) -> FpGenerationResult:
+        return GeneratorRunner._do_generate(*args)
+
     @staticmethod
     def _format_results(results):
         rows = []
 
+        def _mb(num_bytes):
+            return num_bytes / 1e6 if num_bytes is not None else "-"
+
+        def _or_dash(value):
+            return value if value is not None else "-"
+
+        def _statuses(by_status):
+            if not by_status:
+                return "-"
+            return "/".join(
+                str(by_status.get(status, 0))
+                for status in ["new", "written", "unchanged"]
+            )
+
         for result in results:
             rows.append(
                 (
                     result.generator.name,
                     "Success" if result.success else "Failure",
                     result.time,
-                    result.num_series if result.num_series else "-",
-                    result.num_fps if result.num_fps else "-",
+                    _or_dash(result.cpu_time),
+                    _or_dash(result.num_series),
+                    _or_dash(result.num_fps),
+                    _statuses(result.num_fps_by_status),
+                    _mb(result.num_bytes),
+                    _mb(result.peak_rss),
                 )
             )
 
@@ -408,20 +1357,42 @@ class GeneratorRunner:
 
         success = len([r for r in results if r.success])
 
-        total_series = sum(r.num_series for r in results if r.num_series)
-        total_fps = sum(r.num_fps for r in results if r.num_fps)
+        def _total(values):
+            values = [v for v in values if v is not None]
+            return sum(values) if values else None
+
+        peak_rss = [r.peak_rss for r in results if r.peak_rss is not None]
+
+        total_by_status = {}
+        for r in results:
+            for status, count in r.num_fps_by_status.items():
+                total_by_status[status] = total_by_status.get(status, 0) + count
 
         rows.append(
             (
                 "TOTAL",
                 f"{success}/{len(results)}",
                 sum(r.time for r in results),
-                total_series if total_series else "-",
-                total_fps if total_fps else "-",
+                _or_dash(_total(r.cpu_time for r in results)),
+                _or_dash(_total(r.num_series for r in results)),
+                _or_dash(_total(r.num_fps for r in results)),
+                _statuses(total_by_status),
+                _mb(_total(r.num_bytes for r in results)),
+                _mb(max(peak_rss) if peak_rss else None),
             )
         )
 
-        headers = ["Generator", "Result", "Time (s)", "Series", "Footprints"]
+        headers = [
+            "Generator",
+            "Result",
+            "Time (s)",
+            "CPU (s)",
+            "Series",
+            "Footprints",
+            "New/Written/Unchanged",
+            "Written (MB)",
+            "Peak RSS (MB)",
+        ]
 
         return tabulate.tabulate(rows, headers=headers, floatfmt=".2f")
 
@@ -482,12 +1453,29 @@ if __name__ == "__main__":
         default=[],
         help="Exclude generator library name or globs (default: none)",
     )
+    parser.add_argument(
+        "-p",
+        "--package",
+        type=str,
+        nargs="+",
+        default=[],
+        help="Only generate the parameter sets whose key, or the name (or "
+        "library:name) of one of whose footprints, matches one of these globs "
+        "(FootprintGenerator-based generators only)",
+    )
     parser.add_argument(
         "-L",
         "--list",
         action="store_true",
         help="List available generators and exit. Filter with --library.",
     )
+    parser.add_argument(
+        "--list-footprints",
+        action="store_true",
+        help="List the footprints (library:name, definition file and parameter set) "
+        "that the generators would produce, without generating them, and exit. "
+        "Filter with --library.",
+    )
     parser.add_argument(
         "-o",
         "--output-dir",
@@ -503,6 +1491,90 @@ if __name__ == "__main__":
     parser.add_argument(
         "-j", "--jobs", type=int, default=1, help="Number of jobs to run in parallel"
     )
+    parser.add_argument(
+        "--no-split",
+        action="store_true",
+        help="Run each generator as a single job, rather than splitting it into "
+        "smaller jobs (e.g. per YAML file)",
+    )
+    parser.add_argument(
+        "--timings-file",
+        type=Path,
+        default=Path(__file__).parent / ".generator_timings.json",
+        help="File to keep the job durations in, to start the longest jobs first "
+        "in later runs (default: %(default)s)",
+    )
+    parser.add_argument(
+        "--stats-file",
+        type=Path,
+        help="Append the statistics of every footprint and generator process to "
+        "this file (JSON lines)",
+    )
+    parser.add_argument(
+        "--write-if-changed",
+        action="store_true",
+        help="Don't rewrite footprint files whose content is unchanged (so they "
+        "keep their modification times)",
+    )
+    parser.add_argument(
+        "--output-archive",
+        choices=["tar", "zip"],
+        help="Write the footprints of FootprintGenerator-based generators into an "
+        "archive per process in the output directory, rather than .pretty directories",
+    )
+    parser.add_argument(
+        "--shard",
+        type=str,
+        help="Only run shard i of N (e.g. 2/4) of the jobs, balanced by the timing "
+        "history (all shards must use the same timings file)",
+    )
+    parser.add_argument(
+        "--results-file",
+        type=Path,
+        help="Save the results to this file (e.g. to merge the results of shards)",
+    )
+    parser.add_argument(
+        "--merge-results",
+        type=Path,
+        nargs="+",
+        help="Don't generate: merge and report the results files of several runs",
+    )
+    parser.add_argument(
+        "--merge-outputs",
+        type=Path,
+        nargs="+",
+        help="Don't generate: merge the output directories of several runs into "
+        "the output directory",
+    )
+    parser.add_argument(
+        "--profile",
+        action="store_true",
+        help="Profile the generators (including the Python processes started by "
+        "generate.sh scripts) and print the hottest library functions",
+    )
+    parser.add_argument(
+        "--profile-dir",
+        type=Path,
+        help="Directory for the profiles (default: a new temporary directory)",
+    )
+    parser.add_argument(
+        "--profile-sort",
+        default="tottime",
+        choices=["tottime", "cumulative", "ncalls"],
+        help="Order of the profile report (default: %(default)s)",
+    )
+    parser.add_argument(
+        "--profile-top",
+        type=int,
+        default=40,
+        help="Number of functions in the profile report (default: %(default)s)",
+    )
+    parser.add_argument(
+        "--incremental",
+        action="store_true",
+        help="Only regenerate footprints whose parameters, config or generator code "
+        "changed since the last run into the same output directory",
+    )
     parser.add_argument(
         "-v", "--verbose", action="count", default=0, help="Increase verbosity level"
     )
@@ -514,6 +1586,26 @@ if __name__ == "__main__":
     elif args.verbose > 1:
         logging.basicConfig(level=logging.DEBUG)
 
+    if args.incremental:
+        from scripts.tools.generation_cache import GenerationCache
+
+        # Inherited by the workers and the generate.sh scripts
+        os.environ[GenerationCache.ENV_VAR] = "1"
+
+    if args.write_if_changed:
+        from KicadModTree import KicadPrettyLibrary
+
+        # Inherited by the workers and the generate.sh scripts
+        os.environ[KicadPrettyLibrary.WRITE_IF_CHANGED_ENV_VAR] = "1"
+
+    if args.package:
+        # Inherited by the workers and the generate.sh scripts
+        os.environ["KICAD_FP_GENERATOR_PACKAGE_FILTER"] = json.dumps(args.package)
+
+    if args.output_archive:
+        # Inherited by the workers and the generate.sh scripts
+        os.environ["KICAD_FP_GENERATOR_OUTPUT_ARCHIVE"] = args.output_archive
+
     root_dir = os.path.dirname(os.path.abspath(__file__))
 
     # This has to be an absolute path because we run the generate.sh scripts
@@ -523,6 +1615,30 @@ if __name__ == "__main__":
     generator = GeneratorRunner(root_dir, output_dir)
 
     generator.separate_outputs = args.separate_outputs
+    generator.split_jobs = not args.no_split
+    generator.timing_history = TimingHistory.load(args.timings_file)
+    generator.stats_file = args.stats_file.absolute() if args.stats_file else None
+
+    if args.shard:
+        try:
+            index, num_shards = (int(x) for x in args.shard.split("/"))
+        except ValueError:
+            parser.error(f"Invalid shard (expected i/N): {args.shard}")
+        if not 1 <= index <= num_shards:
+            parser.error(f"Invalid shard index: {args.shard}")
+        generator.shard = (index, num_shards)
+
+    if args.merge_outputs or args.merge_results:
+        if args.merge_outputs:
+            if output_dir is None:
+                parser.error("--merge-outputs needs an output directory")
+            merge_outputs(args.merge_outputs, output_dir)
+
+        success = True
+        if args.merge_results:
+            success = generator.merge_results(args.merge_results)
+
+        sys.exit(0 if success else 2)
 
     filter = GenerationFilter(args.library, args.library_exclude)
 
@@ -533,8 +1649,23 @@ if __name__ == "__main__":
             print(g.name)
         sys.exit(0)
 
+    if args.list_footprints:
+        sys.exit(0 if generator.list_footprints(filter) else 2)
+
+    if args.profile:
+        profile_dir = args.profile_dir or Path(
+            tempfile.mkdtemp(prefix="kicad_fp_profile_")
+        )
+        enable_profiling(profile_dir.absolute())
+
     success = generator.generate(filter, jobs=args.jobs)
 
+    if args.profile:
+        print_profile_report(profile_dir, args.profile_top, args.profile_sort)
+
+    if args.results_file:
+        generator.save_results(args.results_file)
+
     ret_code = 0 if success else 2
 
     if ret_code != 0:
@@ -0,0 +1,93 @@
+import pytest
+
+from scripts.generator import (
+    FpGenerationJob,
+    FpGenerationResult,
+    FpGenerator,
+    FpRecordedGenerator,
+    GeneratorRunner,
+    TimingHistory,
+    shard_jobs,
+)
+from scripts.tools.footprint_generator import FootprintGenerator
+from scripts.tools.generation_cache import GenerationCache
+
+
+def make_jobs(n):
+    gen = FpRecordedGenerator("gen")
+    return [FpGenerationJob(gen, f"gen: job {i}") for i in range(n)]
+
+
+def test_shards_are_disjoint_and_complete():
+    jobs = make_jobs(20)
+    history = TimingHistory(durations={f"gen: job {i}": float(i) for i in range(0, 20, 2)})
+
+    shards = shard_jobs(jobs, 3, history)
+
+    names = [job.name for shard in shards for job in shard]
+    assert sorted(names) == sorted(job.name for job in jobs)
+
+
+def test_shards_are_deterministic():
+    history = TimingHistory(durations={"gen: job 3": 10.0, "gen: job 5": 2.0})
+
+    shards = shard_jobs(make_jobs(10), 4, history)
+    # Any order of the jobs gives the same assignment
+    shards_reversed = shard_jobs(list(reversed(make_jobs(10))), 4, history)
+
+    def _names(shards):
+        return [sorted(job.name for job in shard) for shard in shards]
+
+    assert _names(shards) == _names(shards_reversed)
+
+
+def test_shards_are_balanced():
+    history = TimingHistory(durations={"gen: job 0": 2.0, "gen: job 1": 4.0,
+                                       "gen: job 2": 2.0, "gen: job 3": 4.0})
+
+    shards = shard_jobs(make_jobs(4), 2, history)
+
+    loads = [sum(history.estimate(job) for job in shard) for shard in shards]
+    assert loads == [6.0, 6.0]
+
+
+class SucceedingGenerator(FpGenerator):
+    @property
+    def name(self):
+        return "gen"
+
+    def generate(self, output_dir):
+        result = FpGenerationResult(self)
+        result.success = True
+        return result
+
+
+def test_full_runs_are_timed(monkeypatch):
+    monkeypatch.delenv(GenerationCache.ENV_VAR, raising=False)
+    monkeypatch.delenv(FootprintGenerator.PACKAGE_FILTER_ENV_VAR, raising=False)
+    job = FpGenerationJob(SucceedingGenerator(), "gen: job")
+
+    result = GeneratorRunner._do_generate(job, None)
+
+    assert list(result.job_times) == ["gen: job"]
+
+
+@pytest.mark.parametrize(
+    "env_var, value",
+    [
+        (GenerationCache.ENV_VAR, "1"),
+        (FootprintGenerator.PACKAGE_FILTER_ENV_VAR, '["QFN-*"]'),
+    ],
+)
+def test_partial_runs_are_not_timed(monkeypatch, env_var, value):
+    monkeypatch.setenv(env_var, value)
+    job = FpGenerationJob(SucceedingGenerator(), "gen: job")
+
+    result = GeneratorRunner._do_generate(job, None)
+
+    # Cached or filtered jobs finish early, they don't count in the history
+    assert result.success
+    assert result.job_times == {}
+    history = TimingHistory(durations={"gen: job": 10.0})
+    history.record(result.job_times)
+    assert history.durations == {"gen: job": 10.0}
@@ -0,0 +1,68 @@
+from KicadModTree import KicadMemoryLibrary
+
+from scripts.Packages.Package_NoLead__DFN_QFN_LGA_SON.ipc_noLead_generator import plugin
+from scripts.tools.footprint_generator import FootprintGenerator, FootprintListing
+from scripts.tools.global_config_files.global_config import DefaultGlobalConfig
+
+
+class DummyGenerator(FootprintGenerator):
+
+    def generateFootprint(self, device_params: dict, pkg_id: str, header_info: dict = None):
+        raise AssertionError("Listing must not generate")
+
+
+def test_default_listing(tmp_path):
+    def_file = tmp_path / "defs.yaml"
+    def_file.write_text("defaults:\n  a: 1\npkg1:\n  inherit: defaults\npkg2:\n  b: 2\n")
+
+    listings = FootprintGenerator.list_file(DummyGenerator, def_file, DefaultGlobalConfig())
+
+    assert listings == [
+        FootprintListing(name=None, library=None, pkg_id="pkg1", file=def_file),
+        FootprintListing(name=None, library=None, pkg_id="pkg2", file=def_file),
+    ]
+
+
+def test_listing_matches_generated_footprints():
+    def_file = plugin.base_path / "size_definitions" / "MicroSiP.yaml"
+    global_config = DefaultGlobalConfig()
+
+    listings = plugin.list_file(def_file, global_config)
+
+    files = {}
+    generator = plugin.generator_class(output_dir=None, global_config=global_config,
+                                       **plugin.generator_kwargs())
+    generator.library_factory = lambda name: KicadMemoryLibrary(name, files)
+
+    cmd_file, header = FootprintGenerator.load_definition_file(def_file)
+    for pkg in cmd_file:
+        generator.generateFootprint(cmd_file[pkg], pkg_id=pkg, header_info=header)
+
+    listed = sorted(f"{listing.library}.pretty/{listing.name}.kicad_mod" for listing in listings)
+    assert listed == sorted(files)
+    assert {listing.pkg_id for listing in listings} == set(cmd_file)
+
+
+def test_package_filter_by_key(tmp_path, monkeypatch):
+    def_file = tmp_path / "defs.yaml"
+    def_file.write_text("pkg_a1:\n  a: 1\npkg_a2:\n  a: 2\npkg_b:\n  b: 2\n")
+    monkeypatch.setenv(FootprintGenerator.PACKAGE_FILTER_ENV_VAR, '["pkg_a*"]')
+
+    listings = FootprintGenerator.list_file(DummyGenerator, def_file, DefaultGlobalConfig())
+
+    assert [listing.pkg_id for listing in listings] == ["pkg_a1", "pkg_a2"]
+
+
+def test_package_filter_by_footprint_name(monkeypatch):
+    def_file = plugin.base_path / "size_definitions" / "MicroSiP.yaml"
+    all_listings = plugin.list_file(def_file, DefaultGlobalConfig())
+    name = all_listings[-1].name
+    library = all_listings[-1].library
+
+    for pattern in [name, f"{library}:{name}", f"*:{name}"]:
+        monkeypatch.setenv(FootprintGenerator.PACKAGE_FILTER_ENV_VAR, f'["{pattern}"]')
+        listings = plugin.list_file(def_file, DefaultGlobalConfig())
+
+        # All the footprints of the matching parameter set
+        assert name in [listing.name for listing in listings]
+        assert {listing.pkg_id for listing in listings} == {all_listings[-1].pkg_id}
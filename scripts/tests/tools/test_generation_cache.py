@@ -0,0 +1,68 @@
+from enum import Enum
+
+from scripts.tools.generation_cache import GenerationCache
+from scripts.tools.global_config_files.global_config import GlobalConfig, DefaultGlobalConfig
+
+
+class DummyGenerator:
+    pass
+
+
+class Density(Enum):
+    LEAST = "L"
+    MOST = "M"
+
+
+def make_cache(tmp_path, **kwargs):
+    def_file = tmp_path / "defs.yaml"
+    def_file.write_text("")
+    return GenerationCache(DummyGenerator, def_file, tmp_path / "out",
+                           DefaultGlobalConfig(), kwargs)
+
+
+def test_key_is_stable_and_depends_on_inputs(tmp_path):
+    kwargs = {"densities": {Density.LEAST: 0.1, Density.MOST: 0.5}}
+    params = {"size": [1, 2], "pads": {1: "a", "1": "b"}}
+
+    key = make_cache(tmp_path, **kwargs).key("pkg", params, None)
+
+    assert key is not None
+    assert key == make_cache(tmp_path, **kwargs).key("pkg", params, None)
+    assert key != make_cache(tmp_path, **kwargs).key("pkg2", params, None)
+    assert key != make_cache(tmp_path, **kwargs).key("pkg", {**params, "size": [1, 3]}, None)
+    assert key != make_cache(tmp_path, densities={}).key("pkg", params, None)
+
+
+def test_global_config_changes_key(tmp_path):
+    def_file = tmp_path / "defs.yaml"
+    data = DefaultGlobalConfig().data
+    changed = GlobalConfig({**data, "silk_line_width": 0.15})
+
+    key = GenerationCache(DummyGenerator, def_file, tmp_path,
+                          GlobalConfig(data), {}).key("pkg", {}, None)
+    changed_key = GenerationCache(DummyGenerator, def_file, tmp_path,
+                                  changed, {}).key("pkg", {}, None)
+
+    assert key != changed_key
+
+
+def test_up_to_date(tmp_path):
+    output = tmp_path / "out" / "Lib.pretty" / "fp.kicad_mod"
+    output.parent.mkdir(parents=True)
+    output.write_text("(footprint)")
+
+    cache = make_cache(tmp_path)
+    key = cache.key("pkg", {"a": 1}, None)
+    assert not cache.is_up_to_date("pkg", key)
+    cache.record("pkg", key, [output])
+    cache.save()
+
+    cache = make_cache(tmp_path)
+    assert cache.is_up_to_date("pkg", key)
+    assert not cache.is_up_to_date("pkg", cache.key("pkg", {"a": 2}, None))
+
+    # Modified or deleted outputs have to be regenerated
+    output.write_text("(footprint modified)")
+    assert not cache.is_up_to_date("pkg", key)
+    output.unlink()
+    assert not cache.is_up_to_date("pkg", key)
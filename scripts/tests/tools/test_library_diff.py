@@ -0,0 +1,103 @@
+from KicadModTree import Footprint, FootprintType, KicadFileHandler, Line, Pad, Property
+
+from scripts.tools.library_diff import DiffStatus, compare_trees, main
+
+
+def make_footprint(name, pad_x=0, pad_layers=Pad.LAYERS_SMT, silk_lines=1):
+    fp = Footprint(name, FootprintType.SMD)
+    fp.append(Property(name=Property.VALUE, text=name, at=[0, 2], layer="F.Fab"))
+    for i in range(silk_lines):
+        fp.append(Line(start=[-1, i], end=[1, i], layer="F.SilkS", width=0.12))
+    for number, x in [(1, -1), (2, pad_x + 1)]:
+        fp.append(
+            Pad(
+                number=number,
+                type=Pad.TYPE_SMT,
+                shape=Pad.SHAPE_RECT,
+                at=[x, 0],
+                size=[0.5, 0.5],
+                layers=pad_layers,
+            )
+        )
+    return fp
+
+
+def write_tree(root, footprints):
+    for lib, fp in footprints:
+        path = root / f"{lib}.pretty" / f"{fp.name}.kicad_mod"
+        path.parent.mkdir(parents=True, exist_ok=True)
+        path.write_text(KicadFileHandler(fp).serialize())
+
+
+def test_compare_trees(tmp_path):
+    ref = tmp_path / "ref"
+    new = tmp_path / "new"
+    write_tree(
+        ref,
+        [
+            ("Lib", make_footprint("Same")),
+            ("Lib", make_footprint("Reformatted")),
+            ("Lib", make_footprint("Changed")),
+            ("Lib", make_footprint("Removed")),
+        ],
+    )
+    write_tree(
+        new,
+        [
+            ("Lib", make_footprint("Same")),
+            ("Lib", make_footprint("Reformatted")),
+            (
+                "Lib",
+                make_footprint(
+                    "Changed", pad_x=0.5, pad_layers=["F.Cu", "F.Mask"], silk_lines=3
+                ),
+            ),
+            ("Other", make_footprint("Added")),
+        ],
+    )
+    path = new / "Lib.pretty" / "Reformatted.kicad_mod"
+    path.write_text(path.read_text().replace("\t", "  "))
+
+    results = {r.path: r for r in compare_trees(ref, new, jobs=2)}
+
+    assert {path: r.status for path, r in results.items()} == {
+        "Lib.pretty/Changed.kicad_mod": DiffStatus.CHANGED,
+        "Lib.pretty/Reformatted.kicad_mod": DiffStatus.EQUIVALENT,
+        "Lib.pretty/Removed.kicad_mod": DiffStatus.REMOVED,
+        "Lib.pretty/Same.kicad_mod": DiffStatus.IDENTICAL,
+        "Other.pretty/Added.kicad_mod": DiffStatus.ADDED,
+    }
+    assert results["Lib.pretty/Changed.kicad_mod"].changes == [
+        "pad 1: layers changed from "
+        '"F.Cu" "F.Mask" "F.Paste" to "F.Cu" "F.Mask"',
+        "pad 2: moved from (1 0) to (1.5 0)",
+        'pad 2: layers changed from "F.Cu" "F.Mask" "F.Paste" to "F.Cu" "F.Mask"',
+        "F.SilkS: 2 fp_line added",
+    ]
+
+    assert main([str(ref), str(ref), "-j", "1"]) == 0
+    assert main([str(ref), str(new), "-j", "1"]) == 1
+
+
+def test_compare_unsupported_elements(tmp_path):
+    ref = tmp_path / "ref"
+    new = tmp_path / "new"
+    write_tree(ref, [("Lib", make_footprint("Group"))])
+    write_tree(new, [("Lib", make_footprint("Group"))])
+    path = new / "Lib.pretty" / "Group.kicad_mod"
+    content = path.read_text().rstrip()
+    assert content.endswith(")")
+    unsupported = '(group "G1" (members))\n(fp_text_private "foo")\n'
+    path.write_text(content[:-1] + unsupported + ")\n")
+
+    results = compare_trees(ref, new, jobs=1)
+
+    assert [(r.status, r.changes) for r in results] == [
+        (
+            DiffStatus.CHANGED,
+            [
+                'unsupported element added: (group "G1" (members))',
+                'unsupported element added: (fp_text_private "foo")',
+            ],
+        )
+    ]
@@ -0,0 +1,99 @@
+from pathlib import Path
+
+import pytest
+
+from KicadModTree import Footprint, FootprintType, FootprintWriter, Line
+
+from scripts.tools.footprint_generator import FootprintGenerator
+from scripts.tools.global_config_files.global_config import DefaultGlobalConfig
+
+
+class LineGenerator(FootprintGenerator):
+
+    def generateFootprint(self, device_params: dict, pkg_id: str, header_info: dict = None):
+        if device_params.get('fail'):
+            raise ValueError(f"{pkg_id} failed")
+
+        fp = Footprint(pkg_id, FootprintType.SMD)
+        fp.append(Line(start=[0, 0], end=[device_params['length'], 0], layer="F.SilkS"))
+        self.write_footprint(fp, device_params.get('library', 'Test_Lib'))
+
+
+def write_defs(tmp_path, num_files=3, fail=()):
+    files = []
+    for i in range(num_files):
+        def_file = tmp_path / f"defs{i}.yaml"
+        lines = [f"FP_{i}_{j}:\n  length: {j + 1}\n  library: Lib_{j % 2}\n"
+                 + ("  fail: true\n" if (i, j) in fail else "")
+                 for j in range(5)]
+        def_file.write_text("".join(lines))
+        files.append(def_file)
+    return files
+
+
+def read_outputs(output_dir):
+    return {p.relative_to(output_dir).as_posix(): p.read_text()
+            for p in output_dir.rglob("*.kicad_mod")}
+
+
+def test_parallel_matches_serial(tmp_path):
+    files = write_defs(tmp_path)
+    config = DefaultGlobalConfig()
+
+    for f in files:
+        FootprintGenerator.run_on_file(LineGenerator, f, output_dir=tmp_path / "serial",
+                                       global_config=config)
+    FootprintGenerator.run_on_files_parallel(LineGenerator, files, 2,
+                                             output_dir=tmp_path / "parallel",
+                                             global_config=config)
+
+    serial = read_outputs(tmp_path / "serial")
+    assert len(serial) == 15
+    assert read_outputs(tmp_path / "parallel") == serial
+
+
+def test_parallel_raises_first_failure(tmp_path):
+    files = write_defs(tmp_path, fail=[(2, 0), (1, 3)])
+
+    with pytest.raises(RuntimeError, match="FP_1_3 failed"):
+        FootprintGenerator.run_on_files_parallel(LineGenerator, files, 2,
+                                                 output_dir=tmp_path / "out",
+                                                 global_config=DefaultGlobalConfig())
+
+
+def test_library_dirs_created_once(tmp_path, monkeypatch):
+    # mkdir calls itself again after creating missing parents
+    (tmp_path / "out").mkdir()
+    created = []
+    mkdir = Path.mkdir
+
+    def counting_mkdir(self, *args, **kwargs):
+        created.append(self.name)
+        return mkdir(self, *args, **kwargs)
+
+    monkeypatch.setattr(Path, "mkdir", counting_mkdir)
+    FootprintGenerator.run_on_file(LineGenerator, write_defs(tmp_path, num_files=1)[0],
+                                   output_dir=tmp_path / "out", global_config=DefaultGlobalConfig())
+
+    assert len(read_outputs(tmp_path / "out")) == 5
+    assert sorted(name for name in created if name.endswith(".pretty")) == ["Lib_0.pretty", "Lib_1.pretty"]
+
+
+class FailingWriteGenerator(FootprintGenerator):
+
+    def generateFootprint(self, device_params: dict, pkg_id: str, header_info: dict = None):
+        self.writer.write(self.output_path / "missing_dir" / f"{pkg_id}.kicad_mod", b"data")
+        raise ValueError(f"{pkg_id} failed")
+
+
+def test_failure_flushes_writes(tmp_path):
+    def_file = tmp_path / "defs.yaml"
+    def_file.write_text("FP_1:\n  length: 1\n")
+
+    # The error of the generator is raised, not the one of its queued write...
+    with pytest.raises(ValueError, match="FP_1 failed"):
+        FootprintGenerator.run_on_file(FailingWriteGenerator, def_file, output_dir=tmp_path / "out",
+                                       global_config=DefaultGlobalConfig())
+
+    # ...which isn't left to be raised by the next file
+    FootprintWriter.for_process().flush()
@@ -1,14 +1,44 @@
 from pathlib import Path
+import copy
 import os
 import yaml
 import argparse
+import dataclasses
+import fnmatch
+import json
 import logging
+import multiprocessing
+import traceback
 from importlib import resources
-from typing import Optional
+from typing import Callable, Iterator, Optional
 
-from KicadModTree import Footprint, KicadPrettyLibrary, Model
+from KicadModTree import (Footprint, FootprintArchive, FootprintWriter,
+                          KicadArchiveLibrary, KicadModLibrary, KicadPrettyLibrary,
+                          Model)
+from KicadModTree.util import generation_stats
 from scripts.tools.global_config_files import global_config as GC
-from kilibs.util import dict_tools
+from scripts.tools.generation_cache import GenerationCache
+from kilibs.util import yaml_cache
+
+
+@dataclasses.dataclass(frozen=True)
+class FootprintListing:
+    """
+    A footprint that a generator would produce, as listed without generating it
+    (see FootprintGenerator.list_footprints).
+    """
+
+    # The footprint name (None if the generator can't tell without generating)
+    name: str | None
+
+    # The library name (None if the generator can't tell without generating)
+    library: str | None
+
+    # The key of the parameter set in the definition file
+    pkg_id: str
+
+    # The definition file
+    file: Path | None = None
 
 
 class FootprintGenerator:
@@ -19,17 +49,68 @@ class FootprintGenerator:
     # The global config (e.g. KLC settings)
     global_config: GC.GlobalConfig
 
+    # The files written by write_footprint
+    written_files: list[Path]
+
+    # If set, makes the libraries to write the footprints to (by library name),
+    # e.g. to keep them in memory
+    library_factory: Callable[[str], KicadModLibrary] | None
+
+    # If set, footprint files are written in the background by this writer,
+    # which has to be flushed before the files are used
+    writer: FootprintWriter | None
+
+    # The .pretty libraries made by make_library, by library name (so that the
+    # directory of each library is only created once)
+    _pretty_libraries: dict[str, KicadPrettyLibrary]
+
+    # Set to an archive format ("zip" or "tar") to write the footprints into an
+    # archive per process, rather than into .pretty directories
+    OUTPUT_ARCHIVE_ENV_VAR = "KICAD_FP_GENERATOR_OUTPUT_ARCHIVE"
+
+    # Set to a JSON list of globs to only generate the parameter sets whose key,
+    # or the name (or "library:name") of one of whose footprints, matches one
+    PACKAGE_FILTER_ENV_VAR = "KICAD_FP_GENERATOR_PACKAGE_FILTER"
+
     def __init__(self, output_dir: Path | None, global_config: GC.GlobalConfig):
         self.output_path = output_dir
         self.global_config = global_config
+        self.written_files = []
+        self.library_factory = None
+        self.writer = None
+        self._pretty_libraries = {}
+
+    def make_library(self, library_name: str) -> KicadModLibrary:
+        """
+        Get the library to write the footprints of the given library to.
+        """
+        if self.library_factory is not None:
+            return self.library_factory(library_name)
+
+        archive_format = os.environ.get(self.OUTPUT_ARCHIVE_ENV_VAR)
+        if archive_format:
+            output_dir = KicadPrettyLibrary.resolve_output_dir(self.output_path)
+            archive = FootprintArchive.for_process(output_dir, archive_format)
+            return KicadArchiveLibrary(library_name, archive)
+
+        library = self._pretty_libraries.get(library_name)
+        if library is None or library.writer is not self.writer:
+            library = KicadPrettyLibrary(library_name, output_dir=self.output_path,
+                                         writer=self.writer)
+            self._pretty_libraries[library_name] = library
+        return library
 
     def write_footprint(self, kicad_mod: Footprint, library_name: str):
 
         # This is the point in future where the FootprintGenerator can dispatch
         # to the IPC API instead of writing to disk ourselves.
-        output_library = KicadPrettyLibrary(library_name, output_dir=self.output_path)
+        output_library = self.make_library(library_name)
         output_library.save(kicad_mod)
 
+        # Only files can be tracked for incremental generation
+        if isinstance(output_library, KicadPrettyLibrary):
+            self.written_files.append(output_library.path / f"{kicad_mod.name}.kicad_mod")
+
     def get_standard_3d_model_path(self, library_name: str, model_name: str) -> str:
         """
         Get the path of the the "usual" 3D model (with the global config path)
@@ -52,6 +133,49 @@ class FootprintGenerator:
             filename=self.get_standard_3d_model_path(library_name, model_name),
         ))
 
+    def list_footprints(self, device_params: dict, pkg_id: str,
+                        header_info: dict | None = None) -> Iterator[FootprintListing]:
+        """
+        List the footprints that generateFootprint would produce for a parameter
+        set, without building or writing them.
+
+        Generators override this to compute their names and libraries (which
+        must be cheap: no node trees or geometry). By default, the parameter set
+        is listed with an unknown name and library.
+        """
+        yield FootprintListing(name=None, library=None, pkg_id=pkg_id)
+
+    @classmethod
+    def package_filter(cls) -> list[str] | None:
+        """
+        Get the package filter globs (None if all packages are generated).
+        """
+        value = os.environ.get(cls.PACKAGE_FILTER_ENV_VAR)
+        return json.loads(value) if value else None
+
+    def is_selected(self, device_params: dict, pkg_id: str, header_info: dict | None,
+                    patterns: list[str] | None) -> bool:
+        """
+        Check if a parameter set matches the package filter, by its key or by
+        the footprints it produces (see list_footprints).
+        """
+        if patterns is None:
+            return True
+
+        def _matches(name):
+            return any(fnmatch.fnmatch(name, pat) for pat in patterns)
+
+        if _matches(pkg_id):
+            return True
+
+        # Listing must not change the parameters the footprints are generated from
+        listings = self.list_footprints(copy.deepcopy(device_params), pkg_id, header_info)
+        return any(
+            listing.name is not None
+            and (_matches(listing.name) or _matches(f"{listing.library}:{listing.name}"))
+            for listing in listings
+        )
+
     @classmethod
     def add_standard_arguments(
         self,
@@ -76,11 +200,46 @@ class FootprintGenerator:
             help="the config file defining how the footprint will look like. (KLC)",
         )
 
+        parser.add_argument('--incremental', action='store_true',
+                            help='Skip footprints whose parameters, config and generator code '
+                                 'did not change since they were last generated')
+
+        parser.add_argument('--write-if-changed', action='store_true',
+                            help='Do not rewrite footprint files whose content is unchanged')
+
+        parser.add_argument('--output-archive', choices=sorted(FootprintArchive.FORMATS),
+                            help='Write the footprints into an archive in the output directory, '
+                                 'rather than into .pretty directories')
+
+        parser.add_argument('-j', '--jobs', type=int, default=1,
+                            help='Number of processes to generate the footprints with '
+                                 '(0 for one per CPU, default: 1)')
+
+        parser.add_argument('--package', nargs='+', metavar='GLOB',
+                            help='Only generate the parameter sets whose key, or the name '
+                                 '(or library:name) of one of whose footprints, matches a glob')
+
+        parser.add_argument('--list-footprints', action='store_true',
+                            help='Only list the footprints (library, name and definition) '
+                                 'that would be generated, without generating them')
+
         parser.add_argument('-v', '--verbose', action='count', default=0,
                             help='Set debug level, use -vv for more debug.')
 
         args = parser.parse_args()
 
+        if args.write_if_changed:
+            os.environ[KicadPrettyLibrary.WRITE_IF_CHANGED_ENV_VAR] = "1"
+
+        if args.output_archive:
+            os.environ[FootprintGenerator.OUTPUT_ARCHIVE_ENV_VAR] = args.output_archive
+
+        if args.incremental:
+            os.environ[GenerationCache.ENV_VAR] = "1"
+
+        if args.package:
+            os.environ[FootprintGenerator.PACKAGE_FILTER_ENV_VAR] = json.dumps(args.package)
+
         if args.verbose == 1:
             logging.basicConfig(level=logging.INFO)
         elif args.verbose > 1:
@@ -98,55 +257,433 @@ class FootprintGenerator:
     @classmethod
     def run_on_files(self, generator, args: argparse.Namespace,
                      file_autofind_dir: str='.', **kwargs):
+        target_files = self.find_target_files(args.files, file_autofind_dir)
+
+        if getattr(args, 'list_footprints', False):
+            for filepath in target_files:
+                for listing in self.list_file(generator, filepath,
+                                              global_config=args.global_config,
+                                              **kwargs):
+                    print(self.format_listing(listing))
+            return
+
+        jobs = getattr(args, 'jobs', 1)
+        if jobs != 1:
+            self.run_on_files_parallel(generator, target_files, jobs,
+                                       output_dir=args.output_dir,
+                                       global_config=args.global_config,
+                                       **kwargs)
+            return
+
+        for filepath in target_files:
+            self.run_on_file(generator, filepath,
+                             output_dir=args.output_dir,
+                             global_config=args.global_config,
+                             **kwargs)
+
+    @staticmethod
+    def find_target_files(files: list[str], file_autofind_dir: str = '.') -> list[Path]:
+        """
+        Get the definition files to run on from the given list of files and
+        directories. If no files are given, find all YAML files in the autofind
+        directory recursively.
+        """
         target_files = []
 
-        # If no files are given, find all YAML files in the current
-        # directory recursively
-        if not args.files:
+        if not files:
             logging.info(f"No files given, searching for .yaml files in {file_autofind_dir}")
             target_files = list(Path(file_autofind_dir).rglob('*.yaml'))
 
-        for filepath in args.files:
+        for filepath in files:
             if os.path.isdir(filepath):
                 target_files += list(Path(filepath).rglob('*.yaml'))
             else:
                 target_files += [filepath]
 
-        for filepath in target_files:
-            generator_instance = generator(output_dir=args.output_dir,
-                                           global_config=args.global_config,
-                                           **kwargs)
-
-            cmd_file = None
-            with open(filepath, 'r', encoding="utf-8") as command_stream:
-                try:
-                    if yaml.__with_libyaml__:
-                        loader = yaml.CSafeLoader
-                    else:
-                        loader = yaml.SafeLoader
-                    cmd_file = yaml.load(command_stream, Loader=loader)
-                except yaml.YAMLError as exc:
-                    print(exc)
-
-            # Skip empty/comment-only files
-            if cmd_file is None:
+        return target_files
+
+    @staticmethod
+    def load_definition_file(filepath) -> tuple[dict | None, dict | None]:
+        """
+        Load a YAML definition file, resolving the 'inherit' entries.
+
+        Returns the package definitions (None for empty/comment-only files) and
+        the file header (None if the file doesn't have one).
+        """
+        cmd_file = None
+        try:
+            # Parsed and inherited once, and then cached across runs
+            cmd_file = yaml_cache.load_yaml(filepath, inherit=True)
+        except yaml.YAMLError as exc:
+            print(exc)
+
+        # Skip empty/comment-only files
+        if cmd_file is None:
+            return None, None
+
+        # The def file header, if there is one
+        header = cmd_file.pop('FileHeader', None)
+
+        return cmd_file, header
+
+    @staticmethod
+    def is_concrete_package(pkg: str) -> bool:
+        """
+        Return False for "virtual" definitions that are only used as bases for
+        "concrete" definitions.
+        """
+        return not pkg.startswith("defaults")
+
+    @staticmethod
+    def format_listing(listing: FootprintListing) -> str:
+        """
+        Format a listing as a tab-separated line: "library:name", then the
+        definition file and the parameter set ("?" for what isn't known).
+        """
+        lib_id = f"{listing.library or '?'}:{listing.name or '?'}"
+        return f"{lib_id}\t{listing.file}\t{listing.pkg_id}"
+
+    @classmethod
+    def list_file(cls, generator, filepath, global_config: GC.GlobalConfig,
+                  **kwargs) -> list[FootprintListing]:
+        """
+        List the footprints that would be generated from a single definition
+        file, without generating them (see list_footprints).
+        """
+        cmd_file, header = cls.load_definition_file(filepath)
+
+        if cmd_file is None:
+            return []
+
+        generator_instance = generator(output_dir=None, global_config=global_config,
+                                       **kwargs)
+        patterns = cls.package_filter()
+
+        listings = []
+        for pkg in cmd_file:
+            if not cls.is_concrete_package(pkg):
                 continue
 
-            dict_tools.dictInherit(cmd_file)
+            if not generator_instance.is_selected(cmd_file[pkg], pkg, header, patterns):
+                continue
+
+            for listing in generator_instance.list_footprints(cmd_file[pkg], pkg_id=pkg,
+                                                              header_info=header):
+                listings.append(dataclasses.replace(listing, file=Path(filepath)))
+
+        return listings
+
+    @classmethod
+    def run_on_file(cls, generator, filepath, output_dir: Path | None,
+                    global_config: GC.GlobalConfig, **kwargs):
+        """
+        Generate all the footprints defined in a single definition file.
+        """
+        cmd_file, header = cls.load_definition_file(filepath)
+
+        if cmd_file is None:
+            return
+
+        cache = None
+        if GenerationCache.enabled():
+            cache = GenerationCache(generator, filepath, output_dir, global_config, kwargs)
 
-            # The def file header, if there is one
-            try:
-                header = cmd_file.pop('FileHeader')
-            except KeyError:
-                header = None
+        # Write the files while the next footprints are built
+        writer = FootprintWriter.for_process()
 
+        def make_generator():
+            instance = generator(output_dir=output_dir, global_config=global_config,
+                                 **kwargs)
+            instance.writer = writer
+            return instance
+
+        generator_instance = None
+        patterns = cls.package_filter()
+
+        try:
             for pkg in cmd_file:
-                # Skip "virtual" definitions that are only used as bases for
-                # "concrete" definitions
-                if pkg.startswith("defaults"):
+                if not cls.is_concrete_package(pkg):
                     continue
 
+                if patterns is not None:
+                    if generator_instance is None:
+                        generator_instance = make_generator()
+
+                    if not generator_instance.is_selected(cmd_file[pkg], pkg, header, patterns):
+                        logging.debug("Skipping filtered out parameter set {}".format(pkg))
+                        if cache is not None:
+                            cache.keep(pkg)
+                        continue
+
+                key = None
+                if cache is not None:
+                    key = cache.key(pkg, cmd_file[pkg], header)
+                    if cache.is_up_to_date(pkg, key):
+                        logging.info("Skipping unchanged parameter set {}".format(pkg))
+                        cache.keep(pkg)
+                        continue
+
+                # Only construct the generator if there's something to generate
+                if generator_instance is None:
+                    generator_instance = make_generator()
+
                 logging.info("Generating part for parameter set {}".format(pkg))
+                generator_instance.written_files = []
                 generator_instance.generateFootprint(cmd_file[pkg],
                                                      pkg_id=pkg,
                                                      header_info=header)
+
+                if cache is not None:
+                    # The files have to be there to be recorded
+                    writer.flush()
+                    cache.record(pkg, key, generator_instance.written_files)
+
+                generation_stats.record("series", pkg_id=pkg, file=str(filepath))
+
+            # Raises the errors of the writes
+            writer.flush()
+        except BaseException:
+            _flush_after_failure(writer, filepath)
+            raise
+        finally:
+            if cache is not None:
+                cache.save()
+
+    @classmethod
+    def run_on_files_parallel(cls, generator, target_files: list, jobs: int,
+                              output_dir: Path | None, global_config: GC.GlobalConfig,
+                              **kwargs):
+        """
+        Generate all the footprints defined in the given definition files, with
+        the parameter sets spread over a pool of worker processes.
+
+        The definition files are loaded (and inherited) once, and handed to the
+        workers together with the global config when they start. The results
+        are handled in the order of the parameter sets, so the first failing
+        one (in file order) is raised, whatever the number of processes.
+
+        :param jobs: the number of worker processes (0 for one per CPU)
+        """
+        definitions = []
+        caches = []
+        tasks = []
+        keys = []
+
+        patterns = cls.package_filter()
+        filter_instance = None
+        if patterns is not None:
+            # Only used to list the footprints of the parameter sets
+            filter_instance = generator(output_dir=output_dir, global_config=global_config,
+                                        **kwargs)
+
+        try:
+            for filepath in target_files:
+                cmd_file, header = cls.load_definition_file(filepath)
+
+                if cmd_file is None:
+                    continue
+
+                cache = None
+                if GenerationCache.enabled():
+                    cache = GenerationCache(generator, filepath, output_dir, global_config, kwargs)
+
+                file_index = len(definitions)
+                definitions.append((filepath, cmd_file, header))
+                caches.append(cache)
+
+                for pkg in cmd_file:
+                    if not cls.is_concrete_package(pkg):
+                        continue
+
+                    if (filter_instance is not None
+                            and not filter_instance.is_selected(cmd_file[pkg], pkg, header, patterns)):
+                        logging.debug("Skipping filtered out parameter set {}".format(pkg))
+                        if cache is not None:
+                            cache.keep(pkg)
+                        continue
+
+                    key = None
+                    if cache is not None:
+                        # Before generating, as generators may modify the parameters
+                        key = cache.key(pkg, cmd_file[pkg], header)
+                        if cache.is_up_to_date(pkg, key):
+                            logging.info("Skipping unchanged parameter set {}".format(pkg))
+                            cache.keep(pkg)
+                            continue
+
+                    tasks.append((file_index, pkg))
+                    keys.append(key)
+
+            if not tasks:
+                return
+
+            pool = multiprocessing.Pool(
+                jobs or None,
+                initializer=_init_worker,
+                initargs=(generator, output_dir, global_config, kwargs, definitions),
+            )
+
+            with pool:
+                results = pool.imap(_generate_in_worker, tasks)
+
+                for (file_index, pkg), key, (written_files, error) in zip(tasks, keys, results):
+                    if error is not None:
+                        raise RuntimeError("Failed to generate {} from {}:\n{}".format(
+                            pkg, definitions[file_index][0], error))
+
+                    if caches[file_index] is not None:
+                        caches[file_index].record(pkg, key, written_files)
+
+                pool.close()
+                pool.join()
+        finally:
+            for cache in caches:
+                if cache is not None:
+                    cache.save()
+
+
+# The state of a worker process of FootprintGenerator.run_on_files_parallel
+_worker_state: dict = {}
+
+
+def _init_worker(generator, output_dir, global_config, kwargs, definitions):
+    _worker_state.update(
+        generator=generator,
+        output_dir=output_dir,
+        global_config=global_config,
+        kwargs=kwargs,
+        definitions=definitions,
+        # The generator instance of each definition file, as in run_on_file
+        instances={},
+    )
+
+
+def _flush_after_failure(writer: FootprintWriter, what) -> None:
+    """
+    Wait for the queued writes after a failure, so that their errors are not
+    raised by the next flush (and blamed on another definition). Their errors
+    are only logged: the failure is the error that is raised.
+    """
+    try:
+        writer.flush()
+    except Exception as e:
+        logging.error("Writing the footprints of {} failed too: {}".format(what, e))
+
+
+def _generate_in_worker(task) -> tuple[list[Path], str | None]:
+    """
+    Generate a single parameter set, returning the written files, and the
+    traceback if it failed.
+    """
+    file_index, pkg = task
+    filepath, cmd_file, header = _worker_state['definitions'][file_index]
+
+    try:
+        instances = _worker_state['instances']
+        if file_index not in instances:
+            instances[file_index] = _worker_state['generator'](
+                output_dir=_worker_state['output_dir'],
+                global_config=_worker_state['global_config'],
+                **_worker_state['kwargs'])
+            instances[file_index].writer = FootprintWriter.for_process()
+
+        generator_instance = instances[file_index]
+
+        logging.info("Generating part for parameter set {}".format(pkg))
+        generator_instance.written_files = []
+        generator_instance.generateFootprint(cmd_file[pkg],
+                                             pkg_id=pkg,
+                                             header_info=header)
+
+        # The files have to be there when the task is done
+        generator_instance.writer.flush()
+
+        generation_stats.record("series", pkg_id=pkg, file=str(filepath))
+    except Exception:
+        _flush_after_failure(FootprintWriter.for_process(), pkg)
+        # The traceback doesn't survive the trip back to the parent process
+        return [], traceback.format_exc()
+
+    return generator_instance.written_files, None
+
+
+class FootprintGeneratorPlugin:
+    """
+    Describes a FootprintGenerator that the top-level runner (scripts/generator.py)
+    can discover and run in its own (long-lived) worker processes, rather than
+    through a generate.sh script that starts a new Python interpreter for every
+    definition file.
+
+    Plugins are registered as entry points in the ENTRY_POINT_GROUP group, which
+    refer to an instance of this class.
+    """
+
+    ENTRY_POINT_GROUP = "kicad_footprint_generator.generators"
+
+    # The name of the generator (the path of the generator directory relative to
+    # the scripts directory, like for generate.sh generators)
+    name: str
+
+    # The FootprintGenerator subclass that generates the footprints
+    generator_class: type[FootprintGenerator]
+
+    # The generator directory: the file globs are relative to this, and the
+    # generator is run with this as the working directory
+    base_path: Path
+
+    # Globs of the definition files to run the generator on
+    file_globs: list[str]
+
+    def __init__(self, name: str, generator_class: type[FootprintGenerator],
+                 base_path: Path, file_globs: list[str],
+                 make_kwargs: Callable[[], dict] | None = None):
+        """
+        :param make_kwargs: function returning the extra constructor arguments of
+                            the generator class (e.g. the series configuration)
+        """
+        self.name = name
+        self.generator_class = generator_class
+        self.base_path = base_path
+        self.file_globs = file_globs
+        self._make_kwargs = make_kwargs
+        self._kwargs = None
+
+    def target_files(self) -> list[Path]:
+        """
+        The definition files to run the generator on.
+        """
+        target_files = []
+        for pattern in self.file_globs:
+            target_files += sorted(self.base_path.glob(pattern))
+        return target_files
+
+    def generator_kwargs(self) -> dict:
+        """
+        Get the extra constructor arguments of the generator class.
+
+        These are only loaded once per process, but each call gets its own copy
+        so that generators can't leak state from one file to the next.
+        """
+        if self._kwargs is None:
+            self._kwargs = self._make_kwargs() if self._make_kwargs else {}
+        return copy.deepcopy(self._kwargs)
+
+    def list_file(self, filepath: Path,
+                  global_config: GC.GlobalConfig) -> list[FootprintListing]:
+        """
+        List the footprints defined in a single definition file, without
+        generating them.
+        """
+        return FootprintGenerator.list_file(self.generator_class, filepath,
+                                            global_config=global_config,
+                                            **self.generator_kwargs())
+
+    def run_on_file(self, filepath: Path, output_dir: Path | None,
+                    global_config: GC.GlobalConfig):
+        """
+        Generate all the footprints defined in a single definition file.
+        """
+        FootprintGenerator.run_on_file(self.generator_class, filepath,
+                                       output_dir=output_dir,
+                                       global_config=global_config,
+                                       **self.generator_kwargs())
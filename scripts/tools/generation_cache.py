@@ -0,0 +1,351 @@
+"""
+Incremental generation support for FootprintGenerators.
+
+Each generated parameter set (i.e. footprint definition) is keyed on a hash of:
+
+ - the resolved parameters (after inheritance), the package ID and the file header
+ - the global config
+ - the extra arguments of the generator (e.g. the series configuration)
+ - the source of the generator module, and of the modules it imports (including
+   the KicadModTree, kilibs and scripts/tools libraries)
+
+If the key of a parameter set is the same as the last time it was generated, and
+the files it wrote are still there (and untouched), the generator is not run at
+all for it.
+
+The keys and the written files are recorded in a manifest per definition file,
+in the CACHE_DIR_NAME directory of the output directory.
+"""
+
+import ast
+import enum
+import functools
+import hashlib
+import importlib.util
+import inspect
+import json
+import logging
+import os
+from pathlib import Path
+
+from KicadModTree import KicadPrettyLibrary
+
+# The top level of the repository
+_ROOT = Path(__file__).resolve().parents[2]
+
+# The shared libraries, which are hashed as a whole rather than followed import
+# by import
+_LIBRARY_DIRS = [
+    _ROOT / "KicadModTree",
+    _ROOT / "src" / "kilibs",
+    _ROOT / "scripts" / "tools",
+]
+
+
+def _canonical(obj, _active: set | None = None):
+    """
+    Turn some data into a JSON-compatible form, in a stable way (i.e. not
+    depending on memory addresses or the key types of dictionaries).
+
+    Raises ValueError for reference cycles.
+    """
+    if obj is None or isinstance(obj, (bool, int, float, str)):
+        return obj
+    if isinstance(obj, enum.Enum):
+        return f"{type(obj).__qualname__}.{obj.name}"
+    if isinstance(obj, Path):
+        return obj.as_posix()
+    if callable(obj) and hasattr(obj, "__qualname__"):
+        # Functions and classes: their code is covered by the source hash
+        return f"{obj.__module__}.{obj.__qualname__}"
+
+    if _active is None:
+        _active = set()
+    if id(obj) in _active:
+        raise ValueError(f"Reference cycle through {type(obj).__qualname__}")
+    _active.add(id(obj))
+
+    if isinstance(obj, dict):
+        items = [(_key_str(k), _canonical(v, _active)) for k, v in obj.items()]
+        result = dict(sorted(items))
+    elif isinstance(obj, (list, tuple)):
+        result = [_canonical(v, _active) for v in obj]
+    elif isinstance(obj, (set, frozenset)):
+        result = sorted(json.dumps(_canonical(v, _active)) for v in obj)
+    elif hasattr(obj, "__dict__"):
+        result = {"__type__": type(obj).__qualname__, **_canonical(vars(obj), _active)}
+    else:
+        result = repr(obj)
+
+    _active.remove(id(obj))
+    return result
+
+
+def _key_str(key) -> str:
+    if isinstance(key, str):
+        return key
+    # Keep e.g. 1 and "1" apart
+    return f"{type(key).__qualname__}:{json.dumps(_canonical(key))}"
+
+
+def _hash_data(data) -> str:
+    """
+    Hash some data (see _canonical).
+    """
+    text = json.dumps(_canonical(data), sort_keys=True)
+    return hashlib.sha256(text.encode("utf-8")).hexdigest()
+
+
+def _rel_path(path: Path) -> str:
+    """
+    The path relative to the repository, if it's in there, so that the keys
+    don't depend on where the repository is checked out.
+    """
+    try:
+        return path.relative_to(_ROOT).as_posix()
+    except ValueError:
+        return path.as_posix()
+
+
+def _is_library_file(path: Path) -> bool:
+    return any(path.is_relative_to(d) for d in _LIBRARY_DIRS)
+
+
+@functools.cache
+def _library_sources_hash() -> str:
+    """
+    Hash of all the sources of the shared libraries.
+    """
+    h = hashlib.sha256()
+    for lib_dir in _LIBRARY_DIRS:
+        for path in sorted(lib_dir.rglob("*.py")):
+            h.update(_rel_path(path).encode("utf-8"))
+            h.update(path.read_bytes())
+    return h.hexdigest()
+
+
+def _find_module_file(name: str) -> Path | None:
+    try:
+        spec = importlib.util.find_spec(name)
+    except (ImportError, ValueError, AttributeError):
+        return None
+
+    if spec is None or not spec.origin or not spec.origin.endswith(".py"):
+        return None
+
+    return Path(spec.origin).resolve()
+
+
+@functools.cache
+def _imported_files(path: Path) -> frozenset[Path]:
+    """
+    Find the (non-library) files of the repository that a source file imports.
+    """
+    tree = ast.parse(path.read_bytes(), filename=str(path))
+
+    names = []
+    for node in ast.walk(tree):
+        if isinstance(node, ast.Import):
+            names += [alias.name for alias in node.names]
+        elif isinstance(node, ast.ImportFrom):
+            if node.level == 0:
+                names.append(node.module)
+                names += [f"{node.module}.{alias.name}" for alias in node.names]
+            else:
+                # Relative imports: only from the same package is used here
+                base = path.parent
+                for part in (node.module or "").split("."):
+                    if part:
+                        base = base / part
+                for candidate in [base.with_suffix(".py"), base / "__init__.py"]:
+                    if candidate.is_file():
+                        names.append(candidate)
+
+    files = set()
+    for name in names:
+        if isinstance(name, Path):
+            module_file = name.resolve()
+        else:
+            module_file = _find_module_file(name)
+
+        if (
+            module_file is not None
+            and module_file.is_relative_to(_ROOT)
+            and not _is_library_file(module_file)
+        ):
+            files.add(module_file)
+
+    return frozenset(files)
+
+
+@functools.cache
+def _sources_hash(source_file: Path) -> str:
+    """
+    Hash of the sources a generator module depends on.
+    """
+    files = set()
+    todo = [source_file]
+    while todo:
+        path = todo.pop()
+        if path in files:
+            continue
+        files.add(path)
+        todo += _imported_files(path)
+
+    h = hashlib.sha256(_library_sources_hash().encode("utf-8"))
+    for path in sorted(files):
+        h.update(_rel_path(path).encode("utf-8"))
+        h.update(path.read_bytes())
+    return h.hexdigest()
+
+
+class GenerationCache:
+    """
+    The incremental generation state of a single definition file.
+    """
+
+    # Set (to anything but "0") to enable incremental generation
+    ENV_VAR = "KICAD_FP_GENERATOR_INCREMENTAL"
+
+    # The directory of the manifests, in the output directory
+    CACHE_DIR_NAME = ".kicad_fp_cache"
+
+    # Where the footprints are written to
+    output_dir: Path
+
+    # The manifest file of the definition file
+    manifest_path: Path
+
+    @classmethod
+    def enabled(cls) -> bool:
+        """
+        Is incremental generation enabled?
+        """
+        return os.environ.get(cls.ENV_VAR, "") not in ("", "0")
+
+    def __init__(self, generator_class: type, def_file: Path, output_dir: Path | None,
+                 global_config, generator_kwargs: dict):
+        """
+        :param generator_class: the FootprintGenerator subclass
+        :param def_file: the definition file being generated
+        :param output_dir: the output directory the generator was given (if any)
+        :param global_config: the global config the generator was given
+        :param generator_kwargs: the extra arguments the generator was given
+        """
+        source_file = Path(inspect.getsourcefile(generator_class)).resolve()
+        def_file = Path(def_file).resolve()
+
+        try:
+            self._common_key = _hash_data({
+                "generator": generator_class.__qualname__,
+                "sources": _sources_hash(source_file),
+                "global_config": global_config.data,
+                "kwargs": generator_kwargs,
+            })
+        except ValueError as e:
+            logging.warning(f"Can't cache the generation of {def_file}: {e}")
+            self._common_key = None
+
+        self.output_dir = KicadPrettyLibrary.resolve_output_dir(output_dir).absolute()
+
+        manifest_id = _hash_data([
+            _rel_path(source_file), generator_class.__qualname__, _rel_path(def_file)
+        ])
+        self.manifest_path = self.output_dir / self.CACHE_DIR_NAME / f"{manifest_id[:32]}.json"
+
+        self._old_entries = self._load()
+        self._entries = {}
+
+    def _load(self) -> dict:
+        try:
+            with open(self.manifest_path, "r", encoding="utf-8") as f:
+                return json.load(f)
+        except FileNotFoundError:
+            return {}
+        except (OSError, ValueError) as e:
+            logging.warning(f"Ignoring unreadable cache manifest {self.manifest_path}: {e}")
+            return {}
+
+    def _output_states(self, paths: list[Path]) -> dict | None:
+        """
+        The recorded state of the output files (None if any are missing).
+        """
+        states = {}
+        for path in paths:
+            path = path.absolute()
+            try:
+                stat = path.stat()
+            except FileNotFoundError:
+                return None
+
+            try:
+                name = path.relative_to(self.output_dir).as_posix()
+            except ValueError:
+                name = path.as_posix()
+
+            states[name] = [stat.st_size, stat.st_mtime_ns]
+        return states
+
+    def key(self, pkg_id: str, params: dict, header: dict | None) -> str | None:
+        """
+        Get the key of a parameter set, or None if it can't be cached.
+
+        This has to be called before generating, as generators may modify the
+        parameters.
+        """
+        if self._common_key is None:
+            return None
+
+        try:
+            return _hash_data([self._common_key, pkg_id, params, header])
+        except ValueError as e:
+            logging.warning(f"Can't cache the generation of {pkg_id}: {e}")
+            return None
+
+    def is_up_to_date(self, pkg_id: str, key: str | None) -> bool:
+        """
+        Check if the parameter set was already generated with the same key, and
+        the outputs weren't touched since.
+        """
+        entry = self._old_entries.get(pkg_id)
+
+        if key is None or entry is None or entry["key"] != key:
+            return False
+
+        paths = [self.output_dir / name for name in entry["outputs"]]
+        return self._output_states(paths) == entry["outputs"]
+
+    def keep(self, pkg_id: str):
+        """
+        Keep the previous entry (if any) of a parameter set that isn't generated
+        (because it's up to date, or filtered out).
+        """
+        if pkg_id in self._old_entries:
+            self._entries[pkg_id] = self._old_entries[pkg_id]
+
+    def record(self, pkg_id: str, key: str | None, written_files: list[Path]):
+        """
+        Record the files written when generating a parameter set.
+        """
+        # Generators that don't write through the FootprintGenerator can't be
+        # tracked, so they just always run
+        if key is None or not written_files:
+            return
+
+        outputs = self._output_states(written_files)
+        if outputs is not None:
+            self._entries[pkg_id] = {"key": key, "outputs": outputs}
+
+    def save(self):
+        """
+        Write the manifest (replacing the previous one atomically).
+        """
+        if not self._entries and not self._old_entries:
+            return
+
+        self.manifest_path.parent.mkdir(parents=True, exist_ok=True)
+
+        tmp_path = self.manifest_path.with_name(f"{self.manifest_path.name}.{os.getpid()}.tmp")
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump(self._entries, f, indent=1, sort_keys=True)
+        os.replace(tmp_path, self.manifest_path)
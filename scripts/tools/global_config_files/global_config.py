@@ -119,12 +119,17 @@ class GlobalConfig:
 
     handsoldering_suffix: str
 
+    # The raw data the config was initialised from
+    data: dict
+
     def __init__(self, data: dict):
         """
         Initialise from some dictonary of data (likely a
         config_KLC YAML or similar)
         """
 
+        self.data = data
+
         self.courtyard_line_width = float(data["courtyard_line_width"])
         self.courtyard_grid = float(data["courtyard_grid"])
 
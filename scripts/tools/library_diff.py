@@ -0,0 +1,400 @@
+"""
+Semantic comparison of two trees of footprint libraries.
+
+Rather than a text diff, the footprints are read back into nodes, and the
+differences are reported in terms of footprint elements: pads that moved or
+changed layers, silkscreen lines that were added, properties with another value,
+and so on. The elements are compared in the canonical order of the serializer
+(see SerializerPriority), each in its canonical (re-serialized) form, so that
+formatting-only differences (e.g. the last digit of a recomputed arc mid point)
+are not reported. The elements that can't be read into nodes (e.g. groups) are
+compared as they are in the files.
+
+Files with the same content are not read at all, and the footprints are compared
+in parallel on all cores:
+
+    python3 -m scripts.tools.library_diff REFERENCE_DIR NEW_DIR
+
+The exit status is 0 if the trees are equivalent, 1 otherwise (like diff).
+"""
+
+import argparse
+import enum
+import multiprocessing
+import os
+import sys
+from collections import Counter
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Any
+
+from KicadModTree import Footprint, KicadFileHandler, KicadFileReader, Pad
+from KicadModTree.KicadFileReader import SExpr, parse_sexpr
+
+
+class DiffStatus(enum.Enum):
+    """The result of comparing a footprint file."""
+
+    IDENTICAL = "identical"
+    """The files have the same content."""
+    EQUIVALENT = "equivalent"
+    """The files differ, but the footprints don't."""
+    CHANGED = "changed"
+    """The footprints differ."""
+    ADDED = "added"
+    """The footprint is only in the new tree."""
+    REMOVED = "removed"
+    """The footprint is only in the reference tree."""
+    ERROR = "error"
+    """One of the files couldn't be read."""
+
+
+@dataclass
+class FootprintDiff:
+    """The differences of a footprint between the two trees."""
+
+    path: str
+    """The path of the footprint file, relative to the roots of the trees."""
+    status: DiffStatus
+    """The result of the comparison."""
+    changes: list[str] = field(default_factory=list)
+    """The description of the differences (or of the error)."""
+
+
+def find_footprints(root: Path) -> dict[str, Path]:
+    """Find the footprint files of a tree, by their relative (POSIX) path."""
+    return {
+        path.relative_to(root).as_posix(): path
+        for path in sorted(root.rglob("*.kicad_mod"))
+    }
+
+
+_POSITIONAL_NAMES: dict[str, list[str]] = {
+    "property": ["name", "value"],
+    "pad": ["number", "type", "shape"],
+}
+"""The names of the positional values of the elements, for the reports."""
+
+
+def _format(expr: SExpr | str) -> str:
+    """Format (a part of) an s-expression on a single line."""
+    if isinstance(expr, list):
+        return "(" + " ".join(_format(e) for e in expr) + ")"
+    if expr.startswith('"'):
+        # Strings are parsed without their closing quote
+        return expr + '"'
+    return expr
+
+
+def _element_values(expr: SExpr) -> dict[str, str]:
+    """The formatted values of the children of an element, by their name."""
+    positional_names = _POSITIONAL_NAMES.get(expr[0], [])
+    values: dict[str, str] = {}
+    for i, child in enumerate(expr[1:]):
+        if isinstance(child, list):
+            values[child[0]] = " ".join(_format(c) for c in child[1:])
+        else:
+            name = positional_names[i] if i < len(positional_names) else f"#{i + 1}"
+            values[name] = _format(child)
+    return values
+
+
+def _compare_elements(label: str, ref: str, new: str) -> list[str]:
+    """Describe the differences between the children of two serialized elements."""
+    if ref == new:
+        return []
+    ref_values = _element_values(parse_sexpr(ref))
+    new_values = _element_values(parse_sexpr(new))
+    changes: list[str] = []
+    for name in _merged_keys(ref_values, new_values):
+        ref_value = ref_values.get(name)
+        new_value = new_values.get(name)
+        if ref_value == new_value:
+            continue
+        if ref_value is None:
+            changes.append(f"{label}: {name} added ({new_value})")
+        elif new_value is None:
+            changes.append(f"{label}: {name} removed ({ref_value})")
+        elif name == "at":
+            changes.append(f"{label}: moved from ({ref_value}) to ({new_value})")
+        else:
+            changes.append(f"{label}: {name} changed from {ref_value} to {new_value}")
+    return changes
+
+
+def _layer(expr: SExpr) -> str:
+    """The layer(s) of an element, for the reports."""
+    for child in expr[1:]:
+        if isinstance(child, list) and child[0] in ("layer", "layers"):
+            return ",".join(c.removeprefix('"') for c in child[1:])
+    return "-"
+
+
+def _unmatched(items: list[str], others: list[str]) -> list[str]:
+    """The serialized elements which are not in the other elements (as many times),
+    in their order.
+    """
+    remaining = Counter(others)
+    result = []
+    for item in items:
+        if remaining[item] > 0:
+            remaining[item] -= 1
+        else:
+            result.append(item)
+    return result
+
+
+def _merged_keys(a: dict[str, Any], b: dict[str, Any]) -> list[str]:
+    """The keys of two dictionaries, in the order of the first one, then the other."""
+    return list(a) + [key for key in b if key not in a]
+
+
+@dataclass
+class _FootprintElements:
+    """The serialized elements of a footprint, in their canonical form.
+
+    Only the elements which differ are parsed again, to describe the differences.
+    """
+
+    header: str = ""
+    """The footprint element, with only the footprint attributes (description,
+    tags, ...)."""
+    properties: dict[str, str] = field(default_factory=dict)
+    """The properties by name."""
+    pads: dict[str, list[str]] = field(default_factory=dict)
+    """The pads by number, in the canonical order."""
+    others: list[str] = field(default_factory=list)
+    """The other elements, in the canonical order."""
+
+
+def _footprint_elements(fp: Footprint) -> _FootprintElements:
+    """Split a footprint in its serialized elements."""
+    handler = KicadFileHandler(fp)
+    elements = _FootprintElements()
+
+    for node in handler.property_nodes:
+        elements.properties[node.name] = handler.serialize_node(node)
+    for node in handler.nodes:
+        text = handler.serialize_node(node)
+        if isinstance(node, Pad):
+            elements.pads.setdefault(str(node.number), []).append(text)
+        else:
+            elements.others.append(text)
+
+    # The footprint without its nodes
+    handler.property_nodes = []
+    handler.nodes = []
+    elements.header = handler.serialize()
+
+    return elements
+
+
+def compare_footprints(
+    ref: Footprint, new: Footprint, details: bool = False
+) -> list[str]:
+    """Describe the differences between two footprints.
+
+    Args:
+        ref: The reference footprint.
+        new: The new footprint.
+        details: Also list every added and removed graphic element, rather than
+            only counting them.
+
+    Returns:
+        The differences, or an empty list if the footprints are the same.
+    """
+    ref_elements = _footprint_elements(ref)
+    new_elements = _footprint_elements(new)
+    if ref_elements == new_elements:
+        return []
+
+    changes = _compare_elements("footprint", ref_elements.header, new_elements.header)
+
+    for name in _merged_keys(ref_elements.properties, new_elements.properties):
+        ref_prop = ref_elements.properties.get(name)
+        new_prop = new_elements.properties.get(name)
+        if ref_prop is None:
+            changes.append(f"property {name} added")
+        elif new_prop is None:
+            changes.append(f"property {name} removed")
+        else:
+            changes += _compare_elements(f"property {name}", ref_prop, new_prop)
+
+    for number in _merged_keys(ref_elements.pads, new_elements.pads):
+        ref_pads = ref_elements.pads.get(number, [])
+        new_pads = new_elements.pads.get(number, [])
+        # Pads with the same number are paired in the canonical order, leaving out
+        # the unchanged ones
+        ref_pads, new_pads = (
+            _unmatched(ref_pads, new_pads),
+            _unmatched(new_pads, ref_pads),
+        )
+        label = f"pad {number}" if number else "unnumbered pad"
+        for ref_pad, new_pad in zip(ref_pads, new_pads):
+            changes += _compare_elements(label, ref_pad, new_pad)
+        for what, pads in [
+            ("removed", ref_pads[len(new_pads) :]),
+            ("added", new_pads[len(ref_pads) :]),
+        ]:
+            for pad in pads:
+                at = _element_values(parse_sexpr(pad))["at"]
+                changes.append(f"{label} {what} at ({at})")
+
+    counts: dict[tuple[str, str], Counter[str]] = {}
+    listed: list[str] = []
+    for what, sign, texts in [
+        ("removed", "-", _unmatched(ref_elements.others, new_elements.others)),
+        ("added", "+", _unmatched(new_elements.others, ref_elements.others)),
+    ]:
+        for text in texts:
+            expr = parse_sexpr(text)
+            counts.setdefault((_layer(expr), expr[0]), Counter())[what] += 1
+            if details:
+                listed.append(f"  {sign} {_format(expr)}")
+    for (layer, kind), count in counts.items():
+        for what in ("added", "removed"):
+            if count[what]:
+                changes.append(f"{layer}: {count[what]} {kind} {what}")
+    changes += listed
+
+    return changes
+
+
+def _compare_skipped_elements(ref: list[SExpr], new: list[SExpr]) -> list[str]:
+    """Describe the differences between the elements that the reader skipped (e.g.
+    groups), which are compared as they are in the files.
+    """
+    ref_texts = [_format(expr) for expr in ref]
+    new_texts = [_format(expr) for expr in new]
+    return [
+        f"unsupported element {what}: {text}"
+        for what, texts in [
+            ("removed", _unmatched(ref_texts, new_texts)),
+            ("added", _unmatched(new_texts, ref_texts)),
+        ]
+        for text in texts
+    ]
+
+
+def compare_files(
+    path: str, ref: Path, new: Path, details: bool = False
+) -> FootprintDiff:
+    """Compare two footprint files.
+
+    Args:
+        path: The path of the footprint file, relative to the roots of the trees.
+        ref: The reference file.
+        new: The new file.
+        details: See `compare_footprints`.
+    """
+    ref_content = ref.read_bytes()
+    new_content = new.read_bytes()
+    if ref_content == new_content:
+        return FootprintDiff(path, DiffStatus.IDENTICAL)
+
+    ref_reader = KicadFileReader(ref_content, strict=False)
+    new_reader = KicadFileReader(new_content, strict=False)
+    try:
+        ref_fp = ref_reader.read()
+        new_fp = new_reader.read()
+    except ValueError as e:
+        return FootprintDiff(path, DiffStatus.ERROR, [str(e)])
+
+    changes = compare_footprints(ref_fp, new_fp, details)
+    changes += _compare_skipped_elements(
+        ref_reader.skipped_elements, new_reader.skipped_elements
+    )
+    if not changes:
+        return FootprintDiff(path, DiffStatus.EQUIVALENT)
+    return FootprintDiff(path, DiffStatus.CHANGED, changes)
+
+
+def _compare_task(args: tuple[str, Path, Path, bool]) -> FootprintDiff:
+    return compare_files(*args)
+
+
+def compare_trees(
+    ref_root: Path, new_root: Path, jobs: int = 0, details: bool = False
+) -> list[FootprintDiff]:
+    """Compare the footprint files of two trees.
+
+    Args:
+        ref_root: The root of the reference tree.
+        new_root: The root of the new tree.
+        jobs: The number of processes to compare the footprints in (0 for one per
+            CPU).
+        details: See `compare_footprints`.
+
+    Returns:
+        The result for every footprint file in either tree, in the order of the
+        paths.
+    """
+    ref_files = find_footprints(ref_root)
+    new_files = find_footprints(new_root)
+
+    results = [
+        FootprintDiff(path, DiffStatus.REMOVED)
+        for path in ref_files
+        if path not in new_files
+    ]
+    results += [
+        FootprintDiff(path, DiffStatus.ADDED)
+        for path in new_files
+        if path not in ref_files
+    ]
+
+    args = [
+        (path, ref_files[path], new_files[path], details)
+        for path in ref_files
+        if path in new_files
+    ]
+    if jobs == 0:
+        jobs = os.cpu_count() or 1
+    jobs = min(jobs, len(args))
+    if jobs <= 1:
+        results += [_compare_task(a) for a in args]
+    else:
+        with multiprocessing.Pool(jobs) as pool:
+            results += pool.map(_compare_task, args, chunksize=16)
+
+    return sorted(results, key=lambda result: result.path)
+
+
+def main(argv: list[str] | None = None) -> int:
+    parser = argparse.ArgumentParser(
+        description="Compare the footprints of two library trees, element by element."
+    )
+    parser.add_argument("reference", type=Path, help="The reference tree.")
+    parser.add_argument("new", type=Path, help="The new tree.")
+    parser.add_argument(
+        "-j",
+        "--jobs",
+        type=int,
+        default=0,
+        help="The number of processes (default: one per CPU).",
+    )
+    parser.add_argument(
+        "-v",
+        "--verbose",
+        action="store_true",
+        help="List every added and removed graphic element.",
+    )
+    args = parser.parse_args(argv)
+
+    results = compare_trees(args.reference, args.new, args.jobs, args.verbose)
+
+    for result in results:
+        if result.status in (DiffStatus.IDENTICAL, DiffStatus.EQUIVALENT):
+            continue
+        print(f"{result.path}: {result.status.value}")
+        for change in result.changes:
+            print(f"  {change}")
+
+    counts = Counter(result.status for result in results)
+    print(", ".join(f"{counts[status]} {status.value}" for status in DiffStatus))
+
+    return 0 if counts.keys() <= {DiffStatus.IDENTICAL, DiffStatus.EQUIVALENT} else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
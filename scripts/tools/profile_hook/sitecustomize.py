@@ -0,0 +1,55 @@
+"""
+Profiling hook for the --profile option of scripts/generator.py.
+
+The generator runner puts this directory first on the PYTHONPATH of the
+generators it runs, so every Python interpreter they start (e.g. from a
+generate.sh script) imports this module at startup. If the
+KICAD_FP_GENERATOR_PROFILE_DIR environment variable is set, the whole process is
+run under cProfile, and the profile is written to that directory at exit.
+
+This directory must not contain anything else, as it is importable by the
+generators.
+"""
+
+import os
+import sys
+
+PROFILE_DIR_ENV_VAR = "KICAD_FP_GENERATOR_PROFILE_DIR"
+
+
+def _start_profiling(profile_dir: str):
+    import atexit
+    import cProfile
+
+    profiler = cProfile.Profile()
+
+    def _dump_profile():
+        profiler.disable()
+        profiler.dump_stats(os.path.join(profile_dir, f"process-{os.getpid()}.prof"))
+
+    atexit.register(_dump_profile)
+    profiler.enable()
+
+
+def _chain_sitecustomize():
+    """
+    This module shadows any other sitecustomize module, so run that one too.
+    """
+    import importlib.machinery
+    import importlib.util
+
+    hook_dir = os.path.dirname(os.path.abspath(__file__))
+
+    # Don't leak the hook into the generators' imports
+    sys.path[:] = [p for p in sys.path if os.path.abspath(p or os.curdir) != hook_dir]
+
+    spec = importlib.machinery.PathFinder.find_spec("sitecustomize", sys.path)
+    if spec is not None and spec.loader is not None:
+        module = importlib.util.module_from_spec(spec)
+        spec.loader.exec_module(module)
+
+
+_chain_sitecustomize()
+
+if os.environ.get(PROFILE_DIR_ENV_VAR):
+    _start_profiling(os.environ[PROFILE_DIR_ENV_VAR])
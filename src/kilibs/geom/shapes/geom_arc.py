@@ -650,8 +650,9 @@ class GeomArc(GeomShapeOpen):
             cross = v1.x * v2.y - v1.y * v2.x
             return cross < 0
 
-        # Determine if the arc is clockwise
-        cw = _midpoint_is_cw_from(center, p1, p2)
+        # Determine if the arc is clockwise (from the original points, as the
+        # rotated ones can be in the opposite order)
+        cw = _midpoint_is_cw_from(center, self._start, mid)
 
         # Compute sweep angle
         if cw:
@@ -33,11 +33,7 @@ class GeomCompoundPolygon(GeomShapeClosed):
 
     def __init__(
         self,
-        shape: (
-            GeomShape
-            | Sequence[Vec2DCompatible]
-            | Sequence[GeomPolygon | GeomLine | GeomArc]
-        ),
+        shape: GeomShape | Sequence[Vec2DCompatible | GeomPolygon | GeomLine | GeomArc],
         serialize_as_fp_poly: bool = True,
         close: bool = True,
     ) -> None:
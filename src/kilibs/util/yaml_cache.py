@@ -0,0 +1,143 @@
+# kilibs is free software: you can redistribute it and/or modify it under the terms of
+# the GNU General Public License as published by the Free Software Foundation, either
+# version 3 of the License, or (at your option) any later version.
+#
+# kilibs is distributed in the hope that it will be useful, but WITHOUT ANY WARRANTY;
+# without even the implied warranty of MERCHANTABILITY or FITNESS FOR A PARTICULAR
+# PURPOSE. See the GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License along with kilibs.
+# If not, see < http://www.gnu.org/licenses/ >.
+#
+# (C) The KiCad Librarian Team
+
+"""Persistent cache of parsed YAML files.
+
+Parsing large YAML files (and resolving their 'inherit' entries) takes much longer
+than unpickling the result, so the ready-to-use data is stored in a cache directory,
+keyed by the path of the file, the way it was loaded and a hash of its content. The
+cache is shared by all processes and runs.
+
+When a file is cached again (because its content changed), the entries of its
+previous contents are deleted, so the cache holds at most one entry per file and way
+of loading it. The entries of files that no longer exist are not deleted, but the
+cache directory can be deleted at any time.
+
+The cache directory is the `KICAD_FP_GENERATOR_YAML_CACHE_DIR` environment variable
+if it is set, or a directory in the user cache directory otherwise. Setting
+`KICAD_FP_GENERATOR_NO_YAML_CACHE` (to anything but "0") disables the cache.
+"""
+
+from __future__ import annotations
+
+import hashlib
+import logging
+import os
+import pickle
+from pathlib import Path
+from typing import Any, cast
+
+import yaml
+
+from kilibs.util import dict_tools
+
+CACHE_DIR_ENV_VAR: str = "KICAD_FP_GENERATOR_YAML_CACHE_DIR"
+"""The environment variable with the cache directory."""
+DISABLE_ENV_VAR: str = "KICAD_FP_GENERATOR_NO_YAML_CACHE"
+"""The environment variable that disables the cache."""
+
+_CACHE_VERSION: int = 2
+"""Bumped when the way the files are loaded changes, to invalidate the cache."""
+
+
+def cache_dir() -> Path | None:
+    """Return the cache directory, or `None` if the cache is disabled."""
+    if os.environ.get(DISABLE_ENV_VAR, "0") != "0":
+        return None
+
+    path = os.environ.get(CACHE_DIR_ENV_VAR)
+    if path:
+        return Path(path)
+
+    base = os.environ.get("XDG_CACHE_HOME") or Path.home() / ".cache"
+    return Path(base) / "kicad-footprint-generator" / "yaml"
+
+
+def _default_loader() -> type:
+    if yaml.__with_libyaml__:
+        return yaml.CSafeLoader
+    return yaml.SafeLoader
+
+
+def _parse(content: bytes, loader: type, inherit: bool) -> Any:
+    data: Any = yaml.load(content, Loader=loader)
+    if inherit and isinstance(data, dict):
+        dict_tools.dictInherit(cast(dict[str, Any], data))
+    return cast(Any, data)
+
+
+def load_yaml(
+    path: str | os.PathLike[str], loader: type | None = None, inherit: bool = False
+) -> Any:
+    """Load a YAML file, through the cache.
+
+    Each call returns a new copy of the data, which the caller is free to modify.
+
+    Args:
+        path: The path of the YAML file.
+        loader: The YAML loader class (default: the (C)SafeLoader). The C and Python
+            versions of a loader share cache entries.
+        inherit: Resolve the 'inherit' entries of the top level dictionary (see
+            `dict_tools.dictInherit`).
+
+    Raises:
+        yaml.YAMLError: If the file can't be parsed.
+    """
+    if loader is None:
+        loader = _default_loader()
+
+    with open(path, "rb") as f:
+        content = f.read()
+
+    directory = cache_dir()
+    if directory is None:
+        return _parse(content, loader, inherit)
+
+    # The entries of a file (loaded in a way) share a prefix, so the stale ones can be
+    # found and deleted
+    loader_name = loader.__name__.removeprefix("C")
+    file_key = f"{Path(path).resolve()}:{loader_name}:{inherit}"
+    prefix = hashlib.sha256(file_key.encode()).hexdigest()[:16]
+    h = hashlib.sha256(content)
+    h.update(f"{_CACHE_VERSION}:{yaml.__version__}".encode())
+    entry = directory / f"{prefix}-{h.hexdigest()}.pickle"
+
+    try:
+        with open(entry, "rb") as f:
+            return pickle.load(f)
+    except FileNotFoundError:
+        pass
+    except Exception as e:
+        logging.debug(f"Ignoring unreadable YAML cache entry {entry}: {e}")
+
+    data = _parse(content, loader, inherit)
+
+    try:
+        directory.mkdir(parents=True, exist_ok=True)
+        tmp_path = entry.with_name(f"{entry.name}.{os.getpid()}.tmp")
+        with open(tmp_path, "wb") as f:
+            pickle.dump(data, f, protocol=pickle.HIGHEST_PROTOCOL)
+        # Atomic, so that other processes never see a partial entry
+        os.replace(tmp_path, entry)
+    except (OSError, pickle.PicklingError) as e:
+        logging.debug(f"Can't write YAML cache entry {entry}: {e}")
+        return data
+
+    for stale in directory.glob(f"{prefix}-*.pickle"):
+        if stale != entry:
+            try:
+                stale.unlink(missing_ok=True)
+            except OSError as e:
+                logging.debug(f"Can't delete stale YAML cache entry {stale}: {e}")
+
+    return data
@@ -75,6 +75,9 @@ def test_constructors(rel: float = TOL_MM) -> None:
     arcs.append(GeomArc(center=centers[0], start=POINTS[0], end=POINTS[2]))
     # Test the constructor using 3 points specifying "long_way" = False:
     arcs.append(GeomArc(start=POINTS[0], mid=POINTS[3], end=POINTS[2], long_way=False))
+    # Test the direction of 3-point arcs whose mid and end points are aligned:
+    arc = GeomArc(start=(0, -1), mid=(sqrt(3) / 2, -0.5), end=(sqrt(3) / 2, 0.5))
+    assert arc.angle == pytest.approx(120)
     # Test the a copy of itself:
     arcs.append(arcs[0].copy())
     # Test that all GeomArcs are equal:
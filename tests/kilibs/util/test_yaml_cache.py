@@ -0,0 +1,99 @@
+# KiLibs is free software: you can redistribute it and/or
+# modify it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# KiLibs is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with kicad-footprint-generator. If not, see < http://www.gnu.org/licenses/ >.
+#
+# (C) The KiCad Librarian Team
+
+import yaml
+
+import pytest
+
+from kilibs.util import yaml_cache
+
+DEFS = """
+base:
+  size: {x: 1, y: 2}
+  pins: 4
+child:
+  inherit: base
+  size: {y: 3}
+"""
+
+
+@pytest.fixture
+def cache_dir(tmp_path, monkeypatch):
+    cache_dir = tmp_path / "cache"
+    monkeypatch.setenv(yaml_cache.CACHE_DIR_ENV_VAR, str(cache_dir))
+    monkeypatch.delenv(yaml_cache.DISABLE_ENV_VAR, raising=False)
+    return cache_dir
+
+
+def test_load_inherited(tmp_path, cache_dir):
+    path = tmp_path / "defs.yaml"
+    path.write_text(DEFS)
+
+    expected = {
+        "base": {"size": {"x": 1, "y": 2}, "pins": 4},
+        "child": {"size": {"x": 1, "y": 3}, "pins": 4},
+    }
+
+    assert yaml_cache.load_yaml(path, inherit=True) == expected
+    assert len(list(cache_dir.glob("*.pickle"))) == 1
+
+    # From the cache, as a new copy
+    data = yaml_cache.load_yaml(path, inherit=True)
+    assert data == expected
+    data["child"]["pins"] = 5
+    assert yaml_cache.load_yaml(path, inherit=True) == expected
+
+    # Loading differently is a different entry
+    assert yaml_cache.load_yaml(path)["child"]["inherit"] == "base"
+    assert len(list(cache_dir.glob("*.pickle"))) == 2
+
+
+def test_content_change(tmp_path, cache_dir):
+    path = tmp_path / "defs.yaml"
+    path.write_text("a: 1\n")
+    assert yaml_cache.load_yaml(path) == {"a": 1}
+
+    path.write_text("a: 2\n")
+    assert yaml_cache.load_yaml(path) == {"a": 2}
+
+    # The entry of the previous content is deleted
+    assert len(list(cache_dir.glob("*.pickle"))) == 1
+
+    # Other files keep their entries
+    other_path = tmp_path / "other.yaml"
+    other_path.write_text("a: 1\n")
+    assert yaml_cache.load_yaml(other_path) == {"a": 1}
+    assert yaml_cache.load_yaml(path) == {"a": 2}
+    assert len(list(cache_dir.glob("*.pickle"))) == 2
+
+
+def test_disabled(tmp_path, cache_dir, monkeypatch):
+    monkeypatch.setenv(yaml_cache.DISABLE_ENV_VAR, "1")
+
+    path = tmp_path / "defs.yaml"
+    path.write_text("a: 1\n")
+
+    assert yaml_cache.load_yaml(path) == {"a": 1}
+    assert not cache_dir.exists()
+
+
+def test_errors_are_not_cached(tmp_path, cache_dir):
+    path = tmp_path / "defs.yaml"
+    path.write_text("a: [1\n")
+
+    with pytest.raises(yaml.YAMLError):
+        yaml_cache.load_yaml(path)
+
+    assert not cache_dir.exists()